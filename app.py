@@ -1,13 +1,24 @@
 from __future__ import annotations
 
 import base64
+import copy
 import hashlib
+import hmac
 import json
 import os
 import re
 import html
+import atexit
 import secrets
 import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Iterable, List, Optional
 
@@ -18,7 +29,14 @@ from cryptography.fernet import Fernet, InvalidToken
 from functools import wraps
 from urllib.parse import urlparse, urljoin
 
-from flask import Flask, abort, flash, redirect, render_template, request, session, url_for
+try:  # ``fcntl`` ir tikai POSIX sistēmās; Windows izstrādes vidē starpprocesu slēdzis netiek lietots.
+    import fcntl
+except ImportError:  # pragma: no cover - atkarīgs no vides
+    fcntl = None
+
+from observability_test_env import IpRateLimiter
+from flask import Flask, abort, flash, jsonify, redirect, render_template, request, session, url_for
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "data.db")
@@ -139,10 +157,80 @@ COMPILED_TOPIC_PATTERNS = {
 }
 
 ALLOWED_SAVE_TAGS = {"later", "important"}
+# Cik ierakstu rādām vienā lapā. Kursora lapošana nozīmē, ka atmiņa un
+# renderēšanas laiks ir atkarīgs no šī skaitļa, nevis no tabulas izmēra.
+PAGE_SIZE = 30
 LOGIN_MAX_FAILURES = 5
 LOGIN_LOCKOUT_SECONDS = 60
-LOGIN_ATTEMPTS: Dict[str, int] = {}
-LOGIN_LOCKED_UNTIL: Dict[str, datetime] = {}
+# Paroļu jaukšana notiek atsevišķā pavedienu kopā; pārējie pieprasījumi, kas
+# neietilpst rindā, saņem ātru atbildi "mēģini vēlreiz".
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.environ.get("PASSWORD_HASH_QUEUE_LIMIT", "16"))
+# Jaunu paroļu parametri. Ieraksti ar citiem parametriem tiek pārjaukti pēc veiksmīgas pieteikšanās.
+PASSWORD_HASH_PARAMS: Dict[str, Any] = {"algorithm": "scrypt", "n": 2**14, "r": 8, "p": 1}
+# Ierakstiem bez ``password_params`` (izveidoti pirms parametru glabāšanas).
+LEGACY_PASSWORD_HASH_PARAMS: Dict[str, Any] = {"algorithm": "pbkdf2_sha256", "iterations": 200_000}
+# Cik reizes mēģināt pārrakstīt lietotāja ierakstu, ja cits process to paralēli mainīja.
+USER_STORE_WRITE_RETRIES = 5
+PASSWORD_HASHING_BUSY_MESSAGE = "Serveris pašlaik ir noslogots. Mēģini vēlreiz pēc brīža."
+# Pieteikšanās ierobežojumi no IP adreses: ne vairāk kā tik mēģinājumu slīdošā logā.
+LOGIN_IP_MAX_ATTEMPTS = int(os.environ.get("LOGIN_IP_MAX_ATTEMPTS", "30"))
+LOGIN_IP_WINDOW_SECONDS = int(os.environ.get("LOGIN_IP_WINDOW_SECONDS", "60"))
+# Neveiksmīgie mēģinājumi e-pastam tiek aizmirsti pēc tik sekundēm bez jauniem.
+LOGIN_FAILURE_TTL_SECONDS = 900
+LOGIN_THROTTLE_MAX_KEYS = int(os.environ.get("LOGIN_THROTTLE_MAX_KEYS", "100000"))
+LOGIN_THROTTLE_SWEEP_EVERY = 256
+# Vispārējs pieprasījumu limits vienai IP adresei procesā (``0`` izslēdz).
+# Izslēgts pēc noklusējuma: skaitītājs ir katrā procesā atsevišķs (ar N procesiem
+# faktiskais limits ir N×), un aiz starpniekservera bez ``TRUSTED_PROXY_COUNT``
+# visiem klientiem ir viena adrese.
+REQUEST_RATE_LIMIT = int(os.environ.get("REQUEST_RATE_LIMIT", "0"))
+REQUEST_RATE_WINDOW_SECONDS = 60
+REQUEST_RATE_MAX_KEYS = int(os.environ.get("REQUEST_RATE_MAX_KEYS", "100000"))
+TRUSTED_PROXY_COUNT = int(os.environ.get("TRUSTED_PROXY_COUNT", "0"))
+INTERNAL_STATS_TOKEN = os.environ.get("INTERNAL_STATS_TOKEN", "")
+PROFILE_CACHE_TTL_SECONDS = 30
+USER_STATE_CACHE_TTL_SECONDS = 300
+# Atšifrēto lietotāju ierakstu kešs (``SecureUserStore``); derīgumu nosaka ieraksta ``version``.
+USER_RECORD_CACHE_MAX_ENTRIES = int(os.environ.get("USER_RECORD_CACHE_MAX_ENTRIES", "4096"))
+# Skatījumi un meklējumi tiek rakstīti datubāzē ar nobīdi: avārijas gadījumā var
+# pazust ne vairāk kā pēdējo ACTIVITY_FLUSH_SECONDS sekunžu notikumi.
+ACTIVITY_FLUSH_SECONDS = float(os.environ.get("ACTIVITY_FLUSH_SECONDS", "2"))
+ACTIVITY_BATCH_SIZE = 200
+ACTIVITY_MAX_PENDING = 10_000
+# Katram lietotājam glabājam tikai tik daudz pēdējo atšķirīgo meklējumu.
+SEARCH_HISTORY_PER_USER = 100
+# "Karstais" logs: jaunāki raksti paliek ``articles`` tabulā, vecāki tiek pārvietoti
+# mēneša arhīva tabulās ``articles_archive_YYYYMM``.
+ARTICLE_RETENTION_DAYS = int(os.environ.get("ARTICLE_RETENTION_DAYS", "90"))
+ARTICLE_MAINTENANCE_SECONDS = 3600
+ARTICLE_MAINTENANCE_THREAD = os.environ.get("ARTICLE_MAINTENANCE_THREAD", "1") != "0"
+# Lietotāju darbību žurnāls (``SecureUserStore``) tiek sapludināts ierakstos fonā ik pēc tik sekundēm.
+USER_JOURNAL_COMPACT_SECONDS = float(os.environ.get("USER_JOURNAL_COMPACT_SECONDS", "30"))
+# Lietotāja ierakstā glabāto pēdējo skatīto rakstu skaits (vecākie tiek izmesti).
+USER_VIEWED_HISTORY_LIMIT = int(os.environ.get("USER_VIEWED_HISTORY_LIMIT", "1000"))
+INCREMENTAL_VACUUM_PAGES = 2000
+# Skatos ``article_feed``/``all_articles`` pieejamās kolonnas. ``published_at`` ir ISO teksts
+# attēlošanai, kas aprēķināts no glabātā ``published_ts`` (sekundes kopš epohas, UTC).
+ARTICLE_COLUMNS = "id, title, summary, source, published_ts, published_at, url, topic, location, image_url"
+# Kopīgais ziņu/salīdzinājuma rezultātu kešs (skat. ``ResultCache``). Filtri ar
+# ``days`` slīd laikā, tāpēc to ieraksti papildus novecojas ik pēc loga.
+RESULT_CACHE_MAX_ENTRIES = 512
+RESULT_CACHE_WINDOW_SECONDS = 60
+# Procesa kolonnu indekss pēdējo dienu rakstiem (skat. ``HotArticleIndex``); 0 to izslēdz.
+HOT_INDEX_DAYS = int(os.environ.get("HOT_INDEX_DAYS", "7"))
+# ``topic_buckets`` rollup granularitāte sekundēs.
+TOPIC_BUCKET_SECONDS = 3600
+# Salīdzinājuma skatā katram avotam rādām tikai tik jaunākos rakstus.
+COMPARE_ARTICLES_PER_SOURCE = 6
+# Avotu saraksts filtram tiek atjaunots pēc katras ielādes; TTL vajadzīgs tikai tad,
+# ja ielādi veic cits process.
+SOURCES_CACHE_TTL_SECONDS = 600
+# ``sources.last_seen_at`` tiek atjaunots tikai pēc jauniem rakstiem vai, ja tas ir vecāks par šo
+# intervālu, lai katra sākumlapas ielāde nerakstītu datubāzē.
+SOURCE_LAST_SEEN_REFRESH_SECONDS = 3600
+# Glabāšanas tabulu (``articles`` un arhīvu) fiziskās kolonnas.
+ARTICLE_STORAGE_COLUMNS = "id, title, summary, source_id, topic_id, published_ts, url, url_fp, location, image_url"
 
 app = Flask(__name__)
 _secret_key = os.environ.get("SECRET_KEY")
@@ -156,11 +244,239 @@ app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(hours=1)
 app.config["MAX_CONTENT_LENGTH"] = 1024 * 1024
 
 
+def trust_proxies(count: int) -> None:
+    """Ņem klienta adresi no ``X-Forwarded-For``, ko pievienojuši ``count`` uzticami starpniekserveri.
+
+    Bez tā aiz reverse proxy ``request.remote_addr`` ir starpniekservera adrese,
+    un IP ierobežojumi (pieprasījumu limits, pieteikšanās) skartu visus klientus kopā.
+    Klienta paša sūtītā galvene netiek ņemta vērā, jo tiek lasīti tikai pēdējie ``count`` ieraksti.
+    """
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=count)
+
+
+if TRUSTED_PROXY_COUNT:
+    trust_proxies(TRUSTED_PROXY_COUNT)
+
+
+class TTLCache:
+    """Neliels, pavedienu drošs procesa kešs ar derīguma termiņu un LRU izmešanu."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._items: "OrderedDict[Any, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return default
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def pop(self, key: Any) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+class ResultCache:
+    """LRU kešs vaicājumu rezultātiem, kas nemainās starp ielādēm.
+
+    Ierakstiem nav TTL: atslēgā ir ielādes paaudze (``ingestion_generation``),
+    tāpēc pēc jaunas ielādes vecie ieraksti vairs netiek atrasti un pamazām
+    izstumti. Skaitītāji pieejami ar ``stats()``.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._items: OrderedDict[Any, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def set(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._items),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+profile_cache = TTLCache(PROFILE_CACHE_TTL_SECONDS)
+user_state_cache = TTLCache(USER_STATE_CACHE_TTL_SECONDS)
+sources_cache = TTLCache(SOURCES_CACHE_TTL_SECONDS, max_entries=1)
+result_cache = ResultCache(RESULT_CACHE_MAX_ENTRIES)
+request_rate_limiter = IpRateLimiter(
+    max_attempts=REQUEST_RATE_LIMIT,
+    window_seconds=REQUEST_RATE_WINDOW_SECONDS,
+    max_keys=REQUEST_RATE_MAX_KEYS,
+)
+
+
+def reset_process_caches() -> None:
+    """Iztīra procesa kešus (piem., pēc datubāzes nomaiņas testos)."""
+    profile_cache.clear()
+    user_state_cache.clear()
+    sources_cache.clear()
+    result_cache.clear()
+    request_rate_limiter.clear()
+    invalidate_hot_index()
+
+
+class PasswordHashingBusy(RuntimeError):
+    """Paroļu jaukšanas rinda ir pilna; pieprasījums jāatkārto vēlāk."""
+
+
+class PasswordHasher:
+    """Ierobežots pavedienu kopums paroļu jaukšanai.
+
+    Vienlaikus tiek jaukts ne vairāk kā ``workers`` paroles, vēl ``queue_limit``
+    gaida rindā; pārējie izsaukumi uzreiz saņem ``PasswordHashingBusy``.
+    PBKDF2 un scrypt atlaiž GIL, tāpēc pieteikšanās vilnis neaizņem visus
+    procesa pavedienus un parastās lapas turpina apkalpot.
+    """
+
+    def __init__(self, workers: int, queue_limit: int) -> None:
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def run(self, func, *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise PasswordHashingBusy()
+            self._pending += 1
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future.result()
+
+    def _done(self, _future: Any) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT)
+
+
 class SecureUserStore:
-    def __init__(self, data_file: str, key_file: str) -> None:
+    """Šifrēta lietotāju glabātuve: katrs lietotājs ir atsevišķi šifrēta SQLite rinda.
+
+    Rindas atslēga ir e-pasta HMAC (pats e-pasts datubāzē atklātā veidā nav),
+    ``record`` ir Fernet šifrēts JSON. Pieteikšanās atšifrē un pārraksta vienu
+    rindu, nevis visu lietotāju failu.
+
+    Darbības (skatījumi, saglabāšana, ignorēšana) netiek rakstītas ierakstā
+    uzreiz: katra ir atsevišķi šifrēts notikums žurnālā
+    ``secure_activity_journal`` (viens INSERT, bez lasīšanas), tāpēc paralēli
+    procesi nepārraksta cits cita izmaiņas. ``compact_activity_journal``
+    fonā sapludina žurnālu ierakstos; lasīšana pielieto vēl nesapludināto
+    žurnāla asti.
+
+    Atšifrētie ieraksti tiek kešoti procesā (``record_cache``, ierobežots LRU)
+    kopā ar rindas ``version`` un pēdējo pielietoto žurnāla ``seq``. Katrs
+    ieraksts palielina ``version``, tāpēc arī cita procesa izmaiņas kešu
+    padara nederīgu; jauni žurnāla notikumi tiek atšifrēti tikai pēc kārtas.
+
+    Darbību kolekcijas atmiņā ir sakārtotas kopas (``dict`` ar ``None``
+    vērtībām), tāpēc pievienošana un dzēšana ir O(1). Glabājot rakstu ID
+    saraksti tiek kārtoti un delta kodēti, skatījumu vēsture paliek laika
+    secībā un tiek apgriezta līdz ``USER_VIEWED_HISTORY_LIMIT``. Ārpus klases
+    (``_read``, ``authenticate``) kolekcijas vienmēr ir saraksti.
+
+    ``username_key`` ir normalizētā lietotājvārda HMAC ar unikālu indeksu, lai
+    ``username_exists`` būtu viens indeksa uzmeklējums; ja kolonna vai indekss
+    trūkst, tie tiek atjaunoti no ierakstiem, atverot glabātuvi.
+
+    Paroles tiek jauktas ``password_hasher`` pavedienos ar ierakstā glabātajiem
+    ``password_params``; ja tie atšķiras no ``PASSWORD_HASH_PARAMS``, parole
+    tiek pārjaukta pēc veiksmīgas pieteikšanās.
+
+    Vairāki procesi drīkst lietot vienu glabātuvi: datubāze ir WAL režīmā
+    (lasītāji negaida rakstītāju), inicializācija un atslēgas faila izveide
+    notiek zem ``fcntl`` slēdža (``<db_file>.lock``), faili tiek rakstīti
+    atomiski (pagaidu fails + ``fsync`` + ``os.replace``), bet ieraksta
+    pārrakstīšana pārbauda ``version`` un atkārto mēģinājumu, ja cits process
+    to paspēja mainīt.
+
+    Vecais viena faila formāts (``data_file``) tiek vienreiz pārnests pirmajā
+    izmantošanas reizē un pārdēvēts par ``*.migrated``.
+    """
+
+    def __init__(self, data_file: str, key_file: str, db_file: Optional[str] = None) -> None:
         self.data_file = data_file
         self.key_file = key_file
-        self.fernet = Fernet(self._load_or_create_key())
+        self.db_file = db_file or os.path.splitext(data_file)[0] + ".db"
+        self.lock_file = self.db_file + ".lock"
+        key = self._load_or_create_key()
+        self.fernet = Fernet(key)
+        self._index_key = hashlib.sha256(b"secure-user-index:" + key).digest()
+        self._ready = False
+        self._ready_lock = threading.Lock()
+        self.record_cache = ResultCache(USER_RECORD_CACHE_MAX_ENTRIES)
 
     def _load_or_create_key(self) -> bytes:
         env_key = os.environ.get("USER_DATA_KEY")
@@ -171,61 +487,399 @@ class SecureUserStore:
         if os.path.exists(self.key_file):
             with open(self.key_file, "rb") as file:
                 return file.read().strip()
-
-        key = Fernet.generate_key()
-        with open(self.key_file, "wb") as file:
-            file.write(key)
+        with self._process_lock():
+            # Atkārtota pārbaude zem slēdža: paralēli startējošs process var būt atslēgu jau izveidojis.
+            if os.path.exists(self.key_file):
+                with open(self.key_file, "rb") as file:
+                    return file.read().strip()
+            key = Fernet.generate_key()
+            self._atomic_write(self.key_file, key)
         return key
 
-    def _read(self) -> Dict[str, Dict[str, Any]]:
+    @contextmanager
+    def _process_lock(self):
+        """Ekskluzīvs padomdevējs slēdzis starp procesiem (bez ``fcntl`` netiek lietots)."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_file, "a+b") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes) -> None:
+        """Ieraksta failu tā, ka lasītājs redz vai nu veco, vai pilnu jauno saturu."""
+        directory = os.path.dirname(os.path.abspath(path))
+        temp_path = f"{path}.{os.getpid()}.{secrets.token_hex(4)}.tmp"
+        try:
+            with open(temp_path, "wb") as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        if hasattr(os, "O_DIRECTORY"):
+            directory_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(directory_fd)
+            finally:
+                os.close(directory_fd)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Savienojums ar tiešu transakciju vadību (``BEGIN IMMEDIATE`` lasīšanai-rakstīšanai)."""
+        if not self._ready:
+            with self._ready_lock:
+                if not self._ready:
+                    with self._process_lock():
+                        self._init_storage()
+                    self._ready = True
+        conn = sqlite3.connect(self.db_file, isolation_level=None, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_storage(self) -> None:
+        conn = sqlite3.connect(self.db_file, isolation_level=None, timeout=10)
+        try:
+            # WAL: lasītāji netiek bloķēti, kamēr cits process raksta.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS secure_users (
+                    email_key TEXT PRIMARY KEY,
+                    record BLOB NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    version INTEGER NOT NULL DEFAULT 0,
+                    username_key TEXT
+                ) WITHOUT ROWID
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(secure_users)")}
+            if "version" not in columns:
+                conn.execute("ALTER TABLE secure_users ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            if "username_key" not in columns:
+                conn.execute("ALTER TABLE secure_users ADD COLUMN username_key TEXT")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS secure_activity_journal (
+                    seq INTEGER PRIMARY KEY,
+                    email_key TEXT NOT NULL,
+                    event BLOB NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_secure_activity_journal_user ON secure_activity_journal(email_key, seq)"
+            )
+            self._migrate_legacy_blob(conn)
+            self._rebuild_username_index(conn)
+        finally:
+            conn.close()
+
+    def _rebuild_username_index(self, conn: sqlite3.Connection) -> int:
+        """Aizpilda ``username_key`` rindām, kurām tā nav (jauna kolonna vai migrācija).
+
+        Ja vairākiem veciem ierakstiem normalizētais vārds sakrīt, vārdu patur
+        pirmais; pārējiem ``username_key`` paliek tukšs. Atgriež aizpildīto skaitu.
+        """
+        conn.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_secure_users_username
+            ON secure_users(username_key) WHERE username_key IS NOT NULL
+            """
+        )
+        conn.execute("BEGIN IMMEDIATE")
+        filled = 0
+        try:
+            rows = conn.execute(
+                "SELECT email_key, record FROM secure_users WHERE username_key IS NULL ORDER BY updated_at"
+            ).fetchall()
+            for row in rows:
+                record = self._decrypt(row[1])
+                requested = self._normalize_username(str((record or {}).get("display_name", "")))
+                if not requested:
+                    continue
+                try:
+                    conn.execute(
+                        "UPDATE secure_users SET username_key = ? WHERE email_key = ?",
+                        (self._username_key(requested), row[0]),
+                    )
+                    filled += 1
+                except sqlite3.IntegrityError:
+                    continue
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return filled
+
+    def _migrate_legacy_blob(self, conn: sqlite3.Connection) -> None:
+        """Vienreizēja pāreja no viena šifrēta JSON faila uz rindām."""
         if not os.path.exists(self.data_file):
-            return {}
+            return
         with open(self.data_file, "rb") as file:
             encrypted = file.read()
-        if not encrypted:
-            return {}
+        users: Any = {}
+        if encrypted:
+            try:
+                users = json.loads(self.fernet.decrypt(encrypted).decode("utf-8"))
+            except InvalidToken:
+                # Cita atslēga: failu atstājam neskartu, lai dati nepazūd.
+                return
+        now = datetime.now(timezone.utc).isoformat()
+        conn.execute("BEGIN IMMEDIATE")
         try:
-            raw = self.fernet.decrypt(encrypted)
-        except InvalidToken:
-            return {}
-        parsed = json.loads(raw.decode("utf-8"))
-        return parsed if isinstance(parsed, dict) else {}
+            for email, record in (users.items() if isinstance(users, dict) else []):
+                if not isinstance(record, dict):
+                    continue
+                email_normalized = str(record.get("email") or email).strip().lower()
+                record["email"] = email_normalized
+                conn.execute(
+                    "INSERT OR IGNORE INTO secure_users (email_key, record, updated_at) VALUES (?, ?, ?)",
+                    (self._email_key(email_normalized), self._dump_record(self._unpack_record(record)), now),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        os.replace(self.data_file, self.data_file + ".migrated")
 
-    def _write(self, data: Dict[str, Dict[str, Any]]) -> None:
-        raw = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
-        encrypted = self.fernet.encrypt(raw)
-        with open(self.data_file, "wb") as file:
-            file.write(encrypted)
+    def _email_key(self, email_normalized: str) -> str:
+        return hmac.new(self._index_key, email_normalized.encode("utf-8"), hashlib.sha256).hexdigest()
 
-    @staticmethod
-    def _hash_password(password: str, salt: str) -> str:
-        digest = hashlib.pbkdf2_hmac(
-            "sha256",
-            password.encode("utf-8"),
-            base64.urlsafe_b64decode(salt.encode("utf-8")),
-            200_000,
+    def _username_key(self, username_normalized: str) -> str:
+        return hmac.new(
+            self._index_key, b"username:" + username_normalized.encode("utf-8"), hashlib.sha256
+        ).hexdigest()
+
+    def _encrypt(self, record: Dict[str, Any]) -> bytes:
+        return self.fernet.encrypt(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    def _decrypt(self, encrypted: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            parsed = json.loads(self.fernet.decrypt(bytes(encrypted)).decode("utf-8"))
+        except InvalidToken:
+            return None
+        return parsed if isinstance(parsed, dict) else None
+
+    ACTIVITY_KEYS = (
+        "viewed_article_ids",
+        "saved_later_article_ids",
+        "saved_important_article_ids",
+        "ignored_article_ids",
+        "ignored_sources",
+    )
+    # Kolekcijas, kuru secībai nav nozīmes: glabājot tās tiek kārtotas un delta kodētas.
+    SORTED_ID_KEYS = ("saved_later_article_ids", "saved_important_article_ids", "ignored_article_ids")
+
+    @classmethod
+    def _unpack_record(cls, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Pārveido glabāto (vai veco sarakstu) ``activity`` par sakārtotām kopām."""
+        stored = record.get("activity")
+        stored = stored if isinstance(stored, dict) else {}
+        activity: Dict[str, Dict[Any, None]] = {}
+        for key in cls.ACTIVITY_KEYS:
+            values = stored.get(key) or []
+            if isinstance(values, dict) and "delta" in values:
+                total = 0
+                decoded = []
+                for delta in values["delta"]:
+                    total += delta
+                    decoded.append(total)
+                values = decoded
+            activity[key] = dict.fromkeys(values)
+        record["activity"] = activity
+        return record
+
+    @classmethod
+    def _pack_activity(cls, activity: Dict[str, Dict[Any, None]]) -> Dict[str, Any]:
+        packed: Dict[str, Any] = {}
+        for key in cls.ACTIVITY_KEYS:
+            values = list(activity.get(key, ()))
+            if key in cls.SORTED_ID_KEYS and values and all(type(value) is int for value in values):
+                values.sort()
+                packed[key] = {"delta": [values[0], *(b - a for a, b in zip(values, values[1:]))]}
+            else:
+                packed[key] = values
+        return packed
+
+    @classmethod
+    def _public_record(cls, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Ieraksta kopija ar kolekcijām kā sarakstiem (ID kolekcijas — augošā secībā)."""
+        public = copy.deepcopy(
+            {key: value for key, value in record.items() if key not in ("activity", "activity_versions")}
         )
-        return base64.urlsafe_b64encode(digest).decode("utf-8")
+        activity = record["activity"]
+        public["activity"] = {}
+        for key in cls.ACTIVITY_KEYS:
+            values = list(activity[key])
+            if key in cls.SORTED_ID_KEYS and all(type(value) is int for value in values):
+                values.sort()
+            public["activity"][key] = values
+        return public
+
+    def _load_record(self, encrypted: bytes) -> Optional[Dict[str, Any]]:
+        record = self._decrypt(encrypted)
+        return self._unpack_record(record) if record is not None else None
+
+    def _dump_record(self, record: Dict[str, Any]) -> bytes:
+        dumped = {**record, "activity": self._pack_activity(record["activity"])}
+        versions = record.get("activity_versions")
+        if versions and len(versions) > self.ACTIVITY_VERSION_LIMIT:
+            newest = sorted(versions.items(), key=lambda item: item[1])[-self.ACTIVITY_VERSION_LIMIT:]
+            dumped["activity_versions"] = dict(newest)
+        return self._encrypt(dumped)
 
     @staticmethod
-    def _empty_activity() -> Dict[str, Any]:
-        return {
-            "viewed_article_ids": [],
-            "saved_later_article_ids": [],
-            "saved_important_article_ids": [],
-            "ignored_article_ids": [],
-            "ignored_sources": [],
-        }
+    @contextmanager
+    def _read_snapshot(conn: sqlite3.Connection):
+        """Viena lasīšanas transakcija, lai ieraksts un žurnāla aste būtu no viena WAL momentuzņēmuma.
+
+        Bez tās cita procesa sapludināšana starp abiem lasījumiem dotu ierakstu ar
+        divreiz pielietotiem vai trūkstošiem notikumiem. Ja transakcija jau atvērta, to izmanto.
+        """
+        if conn.in_transaction:
+            yield
+            return
+        conn.execute("BEGIN")
+        try:
+            yield
+        finally:
+            if conn.in_transaction:
+                conn.execute("COMMIT")
+
+    def _get(
+        self, conn: sqlite3.Connection, email_normalized: str, with_journal: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        email_key = self._email_key(email_normalized)
+        if not with_journal:
+            row = conn.execute("SELECT record FROM secure_users WHERE email_key = ?", (email_key,)).fetchone()
+            return self._load_record(row["record"]) if row else None
+        with self._read_snapshot(conn):
+            row = conn.execute("SELECT version FROM secure_users WHERE email_key = ?", (email_key,)).fetchone()
+            if row is None:
+                return None
+            record = self._cached_record(conn, email_key, row["version"])
+        return copy.deepcopy(record) if record is not None else None
+
+    def _cached_record(self, conn: sqlite3.Connection, email_key: str, version: int) -> Optional[Dict[str, Any]]:
+        """Ieraksts ar pielietotu žurnāla asti; atšifrē tikai to, kā kešā vēl nav.
+
+        Jāsauc ``_read_snapshot`` iekšienē. Atgrieztā vārdnīca ir koplietota ar kešu,
+        to nedrīkst mainīt.
+        """
+        cached = self.record_cache.get(email_key)
+        if cached is not None and cached[0] == version:
+            _, last_seq, record = cached
+        else:
+            row = conn.execute(
+                "SELECT record, version FROM secure_users WHERE email_key = ?", (email_key,)
+            ).fetchone()
+            record = self._load_record(row["record"]) if row else None
+            if record is None:
+                return None
+            cached, version, last_seq = None, row["version"], 0
+        events = conn.execute(
+            "SELECT seq, event FROM secure_activity_journal WHERE email_key = ? AND seq > ? ORDER BY seq",
+            (email_key, last_seq),
+        ).fetchall()
+        if cached is not None and not events:
+            return record
+        if cached is not None:
+            record = copy.deepcopy(record)
+        for event in events:
+            self._apply_event(record, event["event"])
+            last_seq = event["seq"]
+        self.record_cache.set(email_key, (version, last_seq, record))
+        return record
+
+    def _apply_event(self, record: Dict[str, Any], encrypted: bytes) -> None:
+        event = self._decrypt(encrypted)
+        if event is None:
+            return
+        action, payload, version = event.get("action", ""), event.get("payload"), event.get("version")
+        target = self.ACTIVITY_ACTIONS.get(action)
+        if isinstance(version, int) and target is not None and target[0] in self.TOGGLED_KEYS:
+            # Notikumi no dažādiem procesiem žurnālā var nonākt apgrieztā secībā;
+            # katram rakstam uzvar notikums ar lielāko SQLite ``user_state_versions`` vērtību.
+            versions = record.setdefault("activity_versions", {})
+            mark = f"{target[0]}:{payload}"
+            if versions.get(mark, -1) > version:
+                return
+            versions[mark] = version
+        self._apply_activity(record["activity"], action, payload)
+
+    def _get_snapshot(self, conn: sqlite3.Connection, email_key: str) -> tuple[Optional[Dict[str, Any]], int]:
+        """Ieraksts bez žurnāla astes un tā ``version`` (optimistiskai pārrakstīšanai)."""
+        row = conn.execute("SELECT record, version FROM secure_users WHERE email_key = ?", (email_key,)).fetchone()
+        if row is None:
+            return None, 0
+        return self._load_record(row["record"]), row["version"]
+
+    def _put(self, conn: sqlite3.Connection, record: Dict[str, Any], expected_version: int) -> bool:
+        """Pārraksta ierakstu tikai, ja kopš nolasīšanas neviens to nav mainījis."""
+        cursor = conn.execute(
+            """
+            UPDATE secure_users SET record = ?, updated_at = ?, version = version + 1
+            WHERE email_key = ? AND version = ?
+            """,
+            (
+                self._dump_record(record),
+                datetime.now(timezone.utc).isoformat(),
+                self._email_key(record["email"]),
+                expected_version,
+            ),
+        )
+        return cursor.rowcount == 1
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        """Visi ieraksti atšifrēti (diagnostikai un testiem; pieprasījumos netiek lietots)."""
+        conn = self._connect()
+        try:
+            with self._read_snapshot(conn):
+                versions = conn.execute("SELECT email_key, version FROM secure_users").fetchall()
+                records = [self._cached_record(conn, row["email_key"], row["version"]) for row in versions]
+        finally:
+            conn.close()
+        return {record["email"]: self._public_record(record) for record in records if record}
 
     @staticmethod
-    def _add_unique(values: List[Any], value: Any) -> List[Any]:
-        if value not in values:
-            values.append(value)
-        return values
+    def _hash_password(password: str, salt: str, params: Optional[Dict[str, Any]] = None) -> str:
+        params = params or LEGACY_PASSWORD_HASH_PARAMS
+        salt_bytes = base64.urlsafe_b64decode(salt.encode("utf-8"))
+        if params["algorithm"] == "scrypt":
+            digest = hashlib.scrypt(
+                password.encode("utf-8"),
+                salt=salt_bytes,
+                n=params["n"],
+                r=params["r"],
+                p=params["p"],
+                maxmem=256 * params["n"] * params["r"],
+                dklen=32,
+            )
+        elif params["algorithm"] == "pbkdf2_sha256":
+            digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt_bytes, params["iterations"])
+        else:
+            raise ValueError(f"Unsupported password hash algorithm: {params['algorithm']}")
+        return base64.urlsafe_b64encode(digest).decode("utf-8")
+
+    @classmethod
+    def _hash_off_thread(cls, password: str, salt: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """``_hash_password`` paroļu pavedienos; pilnas rindas gadījumā ``PasswordHashingBusy``."""
+        return password_hasher.run(cls._hash_password, password, salt, params)
 
     @staticmethod
-    def _remove_value(values: List[Any], value: Any) -> List[Any]:
-        return [item for item in values if item != value]
+    def _new_salt() -> str:
+        return base64.urlsafe_b64encode(secrets.token_bytes(16)).decode("utf-8")
+
+    @classmethod
+    def _empty_activity(cls) -> Dict[str, Any]:
+        return {key: [] for key in cls.ACTIVITY_KEYS}
 
     @staticmethod
     def _normalize_username(display_name: str) -> str:
@@ -235,79 +889,205 @@ class SecureUserStore:
         requested = self._normalize_username(display_name)
         if not requested:
             return False
-        users = self._read()
-        return any(self._normalize_username(str(user.get("display_name", ""))) == requested for user in users.values())
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT 1 FROM secure_users WHERE username_key = ?", (self._username_key(requested),)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row is not None
 
     def create_user(self, email: str, display_name: str, password: str) -> tuple[bool, str]:
-        users = self._read()
         email_normalized = email.strip().lower()
         display_name_clean = " ".join(display_name.strip().split())
-        if email_normalized in users:
-            return False, "Šāds e-pasts jau ir reģistrēts."
-        if self.username_exists(display_name_clean):
-            return False, "Šāds lietotājvārds jau ir aizņemts. Izvēlies citu."
-
-        salt = base64.urlsafe_b64encode(secrets.token_bytes(16)).decode("utf-8")
-        users[email_normalized] = {
-            "email": email_normalized,
-            "display_name": display_name_clean,
-            "salt": salt,
-            "password_hash": self._hash_password(password, salt),
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "last_login_at": None,
-            "activity": self._empty_activity(),
-        }
-        self._write(users)
+        conn = self._connect()
+        try:
+            if self._get(conn, email_normalized) is not None:
+                return False, "Šāds e-pasts jau ir reģistrēts."
+            if self.username_exists(display_name_clean):
+                return False, "Šāds lietotājvārds jau ir aizņemts. Izvēlies citu."
+
+            salt = self._new_salt()
+            record = {
+                "email": email_normalized,
+                "display_name": display_name_clean,
+                "salt": salt,
+                "password_hash": self._hash_off_thread(password, salt, PASSWORD_HASH_PARAMS),
+                "password_params": PASSWORD_HASH_PARAMS,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "last_login_at": None,
+                "activity": self._unpack_record({})["activity"],
+            }
+            try:
+                conn.execute(
+                    "INSERT INTO secure_users (email_key, record, updated_at, username_key) VALUES (?, ?, ?, ?)",
+                    (
+                        self._email_key(email_normalized),
+                        self._dump_record(record),
+                        record["created_at"],
+                        self._username_key(self._normalize_username(display_name_clean)),
+                    ),
+                )
+            except sqlite3.IntegrityError:
+                # Paralēla reģistrācija paspēja pirmā; noskaidrojam, kura atslēga sakrita.
+                if self._get(conn, email_normalized, with_journal=False) is not None:
+                    return False, "Šāds e-pasts jau ir reģistrēts."
+                return False, "Šāds lietotājvārds jau ir aizņemts. Izvēlies citu."
+        finally:
+            conn.close()
         return True, "Konts veiksmīgi izveidots."
 
     def authenticate(self, email: str, password: str) -> Optional[Dict[str, Any]]:
-        users = self._read()
-        record = users.get(email.strip().lower())
-        if not record:
-            return None
-        expected = self._hash_password(password, record["salt"])
-        if secrets.compare_digest(expected, record["password_hash"]):
-            record["last_login_at"] = datetime.now(timezone.utc).isoformat()
-            if "activity" not in record or not isinstance(record["activity"], dict):
-                record["activity"] = self._empty_activity()
-            users[record["email"]] = record
-            self._write(users)
-            return record
-        return None
-
-    def record_activity(self, email: str, action: str, payload: Any) -> None:
-        users = self._read()
         email_normalized = email.strip().lower()
-        user = users.get(email_normalized)
-        if not user:
+        conn = self._connect()
+        try:
+            record = self._get(conn, email_normalized)
+            if not record:
+                return None
+            params = record.get("password_params") or LEGACY_PASSWORD_HASH_PARAMS
+            expected = self._hash_off_thread(password, record["salt"], params)
+            if not secrets.compare_digest(expected, record["password_hash"]):
+                return None
+            upgrade = None
+            if params != PASSWORD_HASH_PARAMS:
+                salt = self._new_salt()
+                try:
+                    upgrade = {
+                        "salt": salt,
+                        "password_hash": self._hash_off_thread(password, salt, PASSWORD_HASH_PARAMS),
+                        "password_params": PASSWORD_HASH_PARAMS,
+                    }
+                except PasswordHashingBusy:
+                    # Pārjauksim nākamajā pieteikšanās reizē.
+                    upgrade = None
+            now = datetime.now(timezone.utc).isoformat()
+            email_key = self._email_key(email_normalized)
+            # Ierakstā maināms tikai pieteikšanās laiks (un, ja vajag, paroles jaucējs);
+            # žurnāla aste paliek žurnālā. Ja cits process ierakstu mainīja, lasām no jauna.
+            for _ in range(USER_STORE_WRITE_RETRIES):
+                snapshot, version = self._get_snapshot(conn, email_key)
+                if snapshot is None:
+                    break
+                snapshot["last_login_at"] = now
+                if upgrade and snapshot.get("password_hash") == record["password_hash"]:
+                    snapshot.update(upgrade)
+                if self._put(conn, snapshot, version):
+                    break
+            record["last_login_at"] = now
+            return self._public_record(record)
+        finally:
+            conn.close()
+
+    # Darbība -> (kolekcija, pievienot?)
+    ACTIVITY_ACTIONS = {
+        "view_article": ("viewed_article_ids", True),
+        "save_later": ("saved_later_article_ids", True),
+        "save_important": ("saved_important_article_ids", True),
+        "unsave_later": ("saved_later_article_ids", False),
+        "unsave_important": ("saved_important_article_ids", False),
+        "ignore_article": ("ignored_article_ids", True),
+        "ignore_source": ("ignored_sources", True),
+    }
+    # Kolekcijas ar noņemšanas darbību: tām notikumu secība maina rezultātu.
+    TOGGLED_KEYS = frozenset(key for key, add in ACTIVITY_ACTIONS.values() if not add)
+    # Cik pēdējo rakstu versijas ieraksts atceras; vēlu pienākušam notikumam pietiek ar dažām.
+    ACTIVITY_VERSION_LIMIT = 1000
+
+    @classmethod
+    def _apply_activity(cls, activity: Dict[str, Dict[Any, None]], action: str, payload: Any) -> None:
+        target = cls.ACTIVITY_ACTIONS.get(action)
+        if target is None:
             return
+        key, add = target
+        values = activity[key]
+        if not add:
+            values.pop(payload, None)
+        elif key == "viewed_article_ids":
+            # Skatījumu vēsture ir LRU: atkārtots skatījums pārvieto rakstu uz beigām.
+            values.pop(payload, None)
+            values[payload] = None
+            while len(values) > USER_VIEWED_HISTORY_LIMIT:
+                del values[next(iter(values))]
+        else:
+            values.setdefault(payload, None)
 
-        if "activity" not in user or not isinstance(user["activity"], dict):
-            user["activity"] = self._empty_activity()
-        activity = user["activity"]
-
-        if action == "view_article":
-            activity["viewed_article_ids"] = self._add_unique(activity.get("viewed_article_ids", []), payload)
-        elif action == "save_later":
-            activity["saved_later_article_ids"] = self._add_unique(activity.get("saved_later_article_ids", []), payload)
-        elif action == "save_important":
-            activity["saved_important_article_ids"] = self._add_unique(
-                activity.get("saved_important_article_ids", []), payload
-            )
-        elif action == "unsave_later":
-            activity["saved_later_article_ids"] = self._remove_value(activity.get("saved_later_article_ids", []), payload)
-        elif action == "unsave_important":
-            activity["saved_important_article_ids"] = self._remove_value(
-                activity.get("saved_important_article_ids", []), payload
-            )
-        elif action == "ignore_article":
-            activity["ignored_article_ids"] = self._add_unique(activity.get("ignored_article_ids", []), payload)
-        elif action == "ignore_source":
-            activity["ignored_sources"] = self._add_unique(activity.get("ignored_sources", []), payload)
+    def record_activity(self, email: str, action: str, payload: Any) -> None:
+        """Pievieno notikumu žurnālam; ieraksts netiek ne lasīts, ne pārrakstīts."""
+        self.record_activities([(email, action, payload)])
 
-        user["activity"] = activity
-        users[email_normalized] = user
-        self._write(users)
+    def record_activities(self, events: Iterable[tuple[Any, ...]]) -> int:
+        """Pievieno notikumu partiju žurnālam vienā transakcijā; atgriež skaitu.
+
+        Notikums ir ``(email, action, payload)`` vai ``(email, action, payload, version)``,
+        kur ``version`` ir lietotāja ``user_state_versions`` vērtība pēc SQLite izmaiņas.
+        """
+        rows = []
+        for email, action, payload, *version in events:
+            event = {"action": action, "payload": payload}
+            if version and version[0] is not None:
+                event["version"] = int(version[0])
+            rows.append((self._email_key(email.strip().lower()), self._encrypt(event)))
+        if not rows:
+            return 0
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("INSERT INTO secure_activity_journal (email_key, event) VALUES (?, ?)", rows)
+            conn.execute("COMMIT")
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            conn.close()
+        return len(rows)
+
+    def get_activity(self, email: str) -> Optional[Dict[str, List[Any]]]:
+        """Lietotāja darbību kolekcijas (kā sarakstus) ar pielietotu žurnāla asti."""
+        conn = self._connect()
+        try:
+            record = self._get(conn, email.strip().lower())
+        finally:
+            conn.close()
+        return self._public_record(record)["activity"] if record else None
+
+    def compact_activity_journal(self, batch_size: int = 10_000) -> int:
+        """Sapludina žurnāla notikumus lietotāju ierakstos un izdzēš tos.
+
+        Apstrādā līdz ``batch_size`` vecākajiem notikumiem vienā transakcijā;
+        notikumi lietotājiem, kuru nav, tiek vienkārši izmesti. Atgriež
+        apstrādāto notikumu skaitu.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            events = conn.execute(
+                "SELECT seq, email_key, event FROM secure_activity_journal ORDER BY seq LIMIT ?", (batch_size,)
+            ).fetchall()
+            if not events:
+                conn.execute("COMMIT")
+                return 0
+            by_user: Dict[str, List[bytes]] = {}
+            for event in events:
+                by_user.setdefault(event["email_key"], []).append(event["event"])
+            now = datetime.now(timezone.utc).isoformat()
+            for email_key, user_events in by_user.items():
+                row = conn.execute("SELECT record FROM secure_users WHERE email_key = ?", (email_key,)).fetchone()
+                record = self._load_record(row["record"]) if row else None
+                if record is None:
+                    continue
+                for encrypted in user_events:
+                    self._apply_event(record, encrypted)
+                conn.execute(
+                    "UPDATE secure_users SET record = ?, updated_at = ?, version = version + 1 WHERE email_key = ?",
+                    (self._dump_record(record), now, email_key),
+                )
+            conn.execute("DELETE FROM secure_activity_journal WHERE seq <= ?", (events[-1]["seq"],))
+            conn.execute("COMMIT")
+            return len(events)
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            conn.close()
 
 
 user_store = SecureUserStore(USERS_DATA_FILE, USERS_KEY_FILE)
@@ -319,6 +1099,181 @@ def get_db() -> sqlite3.Connection:
     return conn
 
 
+def init_login_throttle(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS login_throttle (
+            key TEXT PRIMARY KEY,
+            failures INTEGER NOT NULL DEFAULT 0,
+            locked_until INTEGER NOT NULL DEFAULT 0,
+            window_start INTEGER NOT NULL DEFAULT 0,
+            window_count INTEGER NOT NULL DEFAULT 0,
+            previous_count INTEGER NOT NULL DEFAULT 0,
+            expires_at INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_login_throttle_expires ON login_throttle(expires_at)")
+
+
+class LoginThrottle:
+    """Pieteikšanās ierobežotājs, kura stāvoklis ir kopīgs visiem procesiem (tabula ``login_throttle``).
+
+    E-pastam darbojas kā ``AuthGuard`` (``observability_test_env.py``): pēc
+    ``max_failures`` neveiksmēm pēc kārtas konts tiek bloķēts uz
+    ``lockout_seconds``, veiksmīga pieteikšanās skaitītāju nonullē. IP adresei —
+    kā ``IpRateLimiter``: ne vairāk kā ``ip_max_attempts`` mēģinājumu
+    ``ip_window_seconds`` logā, ko aproksimē ar diviem skaitītājiem (iepriekšējais
+    un pašreizējais logs), tāpēc katrs mēģinājums ir viena rindas maiņa.
+
+    Katrai rindai ir ``expires_at``, pēc kura tā vairs netiek ņemta vērā (arī
+    tad, ja vēl nav izdzēsta); novecojušās rindas tiek dzēstas ik pēc
+    ``LOGIN_THROTTLE_SWEEP_EVERY`` ierakstiem, un, ja rindu vēl ir vairāk par
+    ``max_keys``, vispirms tiek izmestas tās, kuras beigtos agrāk.
+    """
+
+    def __init__(
+        self,
+        max_failures: int,
+        lockout_seconds: int,
+        ip_max_attempts: int,
+        ip_window_seconds: int,
+        max_keys: int,
+    ) -> None:
+        self.max_failures = max_failures
+        self.lockout_seconds = lockout_seconds
+        self.ip_max_attempts = ip_max_attempts
+        self.ip_window_seconds = ip_window_seconds
+        self.max_keys = max_keys
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind: str, value: str) -> str:
+        # Atslēgas garums nav atkarīgs no uzbrucēja ievadītā e-pasta garuma.
+        return f"{kind}:{hashlib.sha256(value.encode('utf-8')).hexdigest()[:32]}"
+
+    def locked_for(self, email: str, now: Optional[float] = None) -> int:
+        """Atlikušās bloķējuma sekundes (0, ja e-pasts nav bloķēts)."""
+        now = time.time() if now is None else now
+        with get_db() as conn:
+            row = conn.execute(
+                "SELECT locked_until, expires_at FROM login_throttle WHERE key = ?", (self.key("email", email),)
+            ).fetchone()
+        if row is None or row["locked_until"] <= now or row["expires_at"] <= now:
+            return 0
+        return max(1, int(row["locked_until"] - now))
+
+    def allow_ip(self, ip: str, now: Optional[float] = None) -> bool:
+        """Reģistrē mēģinājumu no ``ip``; ``False``, ja logā limits jau sasniegts."""
+        now = time.time() if now is None else now
+        window = self.ip_window_seconds
+        bucket = int(now // window * window)
+        key = self.key("ip", ip)
+        conn = get_db()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT window_start, window_count, previous_count FROM login_throttle WHERE key = ?", (key,)
+            ).fetchone()
+            current = previous = 0
+            if row is not None and row["window_start"] == bucket:
+                current, previous = row["window_count"], row["previous_count"]
+            elif row is not None and row["window_start"] == bucket - window:
+                previous = row["window_count"]
+            estimate = previous * (window - (now - bucket)) / window + current
+            allowed = estimate < self.ip_max_attempts
+            if allowed:
+                current += 1
+            conn.execute(
+                """
+                INSERT INTO login_throttle (key, window_start, window_count, previous_count, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    window_start = excluded.window_start,
+                    window_count = excluded.window_count,
+                    previous_count = excluded.previous_count,
+                    expires_at = excluded.expires_at
+                """,
+                (key, bucket, current, previous, bucket + 2 * window),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        self._after_write(now)
+        return allowed
+
+    def record_failure(self, email: str, now: Optional[float] = None) -> bool:
+        """Reģistrē neveiksmīgu mēģinājumu; ``True``, ja e-pasts tagad ir bloķēts."""
+        now = time.time() if now is None else now
+        key = self.key("email", email)
+        conn = get_db()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT failures, locked_until, expires_at FROM login_throttle WHERE key = ?", (key,)
+            ).fetchone()
+            # Novecojusi rinda skaitās kā neesoša arī tad, ja ``sweep`` to vēl nav izdzēsis.
+            active = row is not None and row["expires_at"] > now
+            failures = row["failures"] if active and row["locked_until"] <= now else 0
+            failures += 1
+            locked_until = 0
+            if failures >= self.max_failures:
+                failures, locked_until = 0, int(now) + self.lockout_seconds
+            conn.execute(
+                """
+                INSERT INTO login_throttle (key, failures, locked_until, expires_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    failures = excluded.failures,
+                    locked_until = excluded.locked_until,
+                    expires_at = excluded.expires_at
+                """,
+                (key, failures, locked_until, max(locked_until, int(now) + LOGIN_FAILURE_TTL_SECONDS)),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        self._after_write(now)
+        return locked_until > 0
+
+    def record_success(self, email: str) -> None:
+        with get_db() as conn:
+            conn.execute("DELETE FROM login_throttle WHERE key = ?", (self.key("email", email),))
+
+    def _after_write(self, now: float) -> None:
+        with self._lock:
+            self._writes += 1
+            if self._writes % LOGIN_THROTTLE_SWEEP_EVERY:
+                return
+        self.sweep(now)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Izdzēš novecojušās rindas un apgriež tabulu līdz ``max_keys``; atgriež dzēsto skaitu."""
+        now = time.time() if now is None else now
+        with get_db() as conn:
+            removed = conn.execute("DELETE FROM login_throttle WHERE expires_at <= ?", (int(now),)).rowcount
+            overflow = conn.execute("SELECT COUNT(*) FROM login_throttle").fetchone()[0] - self.max_keys
+            if overflow > 0:
+                removed += conn.execute(
+                    """
+                    DELETE FROM login_throttle WHERE key IN (
+                        SELECT key FROM login_throttle ORDER BY expires_at LIMIT ?
+                    )
+                    """,
+                    (overflow,),
+                ).rowcount
+        return removed
+
+
+login_throttle = LoginThrottle(
+    LOGIN_MAX_FAILURES,
+    LOGIN_LOCKOUT_SECONDS,
+    LOGIN_IP_MAX_ATTEMPTS,
+    LOGIN_IP_WINDOW_SECONDS,
+    LOGIN_THROTTLE_MAX_KEYS,
+)
+
+
 
 
 def migrate_legacy_users_table(conn: sqlite3.Connection) -> None:
@@ -357,8 +1312,475 @@ def migrate_legacy_users_table(conn: sqlite3.Connection) -> None:
     conn.execute("DROP TABLE users")
     conn.execute("ALTER TABLE users_new RENAME TO users")
 
+ARTICLE_STORAGE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY{autoincrement},
+        title TEXT NOT NULL,
+        summary TEXT,
+        source_id INTEGER NOT NULL,
+        topic_id INTEGER,
+        published_ts INTEGER NOT NULL,
+        url TEXT NOT NULL,
+        url_fp INTEGER NOT NULL,
+        location TEXT,
+        image_url TEXT
+    )
+"""
+
+
+def url_fingerprint(url: str) -> int:
+    """64 bitu URL nospiedums (signed, lai ietilpst SQLite INTEGER).
+
+    Unikālais indekss uz šī skaitļa ir daudzkārt mazāks par indeksu uz pilno URL
+    tekstu. Sadursmes varbūtība pie miljoniem rakstu ir niecīga; tādā gadījumā
+    otrs raksts vienkārši netiek ievietots kā dublikāts.
+    """
+    digest = hashlib.blake2b(str(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def to_epoch(value: datetime) -> int:
+    return int(value.timestamp())
+
+
+def epoch_to_iso(value: Optional[int]) -> Optional[str]:
+    if value is None:
+        return None
+    return datetime.fromtimestamp(int(value), tz=timezone.utc).isoformat()
+
+
+def lookup_id(conn: sqlite3.Connection, table: str, name: str) -> int:
+    """Vārdnīcas (``sources``/``topics``) ieraksta ID; ja tāda nav, to izveido."""
+    row = conn.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()
+    if row:
+        return int(row[0])
+    return int(conn.execute(f"INSERT INTO {table} (name) VALUES (?)", (name,)).lastrowid)
+
+
+def insert_article(
+    conn: sqlite3.Connection,
+    title: str,
+    summary: str,
+    source: str,
+    published: datetime,
+    url: str,
+    topic: Optional[str],
+    location: Optional[str] = None,
+    image_url: Optional[str] = None,
+) -> Optional[int]:
+    """Ievieto rakstu kompaktajā glabāšanas formā. Dublikāta gadījumā atgriež ``None``.
+
+    Apzināti nav ``INSERT OR IGNORE``: tas ar AUTOINCREMENT patērētu ID katram
+    atkārtoti ielādētam RSS ierakstam.
+    """
+    fingerprint = url_fingerprint(url)
+    # Jau zināmu URL atpazīstam ar lasījumu, lai atkārtota barotnes ielāde neatvērtu rakstīšanas transakciju.
+    if conn.execute("SELECT 1 FROM articles WHERE url_fp = ?", (fingerprint,)).fetchone():
+        return None
+    try:
+        cursor = conn.execute(
+            """
+            INSERT INTO articles
+                (title, summary, source_id, topic_id, published_ts, url, url_fp, location, image_url)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                title,
+                summary,
+                lookup_id(conn, "sources", source),
+                lookup_id(conn, "topics", topic) if topic else None,
+                to_epoch(published),
+                url,
+                fingerprint,
+                location,
+                image_url,
+            ),
+        )
+    except sqlite3.IntegrityError:
+        return None
+    return int(cursor.lastrowid)
+
+
+def article_view_select(table: str) -> str:
+    return f"""
+        SELECT a.id, a.title, a.summary, s.name AS source, a.published_ts,
+               strftime('%Y-%m-%dT%H:%M:%S+00:00', a.published_ts, 'unixepoch') AS published_at,
+               a.url, t.name AS topic, a.location, a.image_url, a.source_id, a.topic_id
+        FROM {table} a
+        JOIN sources s ON s.id = a.source_id
+        LEFT JOIN topics t ON t.id = a.topic_id
+    """
+
+
+def init_article_storage(conn: sqlite3.Connection) -> None:
+    """Rakstu glabāšana: vesels skaitlis laikam, URL nospiedums, avotu/tēmu vārdnīcas.
+
+    Lasīšana notiek caur skatu ``article_feed``, kas atjauno vecos kolonnu
+    nosaukumus (``source``, ``topic``, ``published_at``), tāpēc veidnēm un
+    vaicājumu rezultātiem nav jāmainās.
+    """
+    init_source_registry(conn)
+    conn.execute("CREATE TABLE IF NOT EXISTS topics (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(articles)").fetchall()}
+    if columns and "published_at" in columns:
+        migrate_article_storage(conn)
+    conn.execute(ARTICLE_STORAGE_SCHEMA.format(name="articles", autoincrement=" AUTOINCREMENT"))
+    create_article_indexes(conn, "articles")
+    init_source_counters(conn)
+    init_topic_buckets(conn)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS ingestion_state (id INTEGER PRIMARY KEY CHECK (id = 1), generation INTEGER NOT NULL)"
+    )
+    state_columns = {row["name"] for row in conn.execute("PRAGMA table_info(ingestion_state)").fetchall()}
+    if "content_version" not in state_columns:
+        conn.execute("ALTER TABLE ingestion_state ADD COLUMN content_version INTEGER NOT NULL DEFAULT 0")
+    conn.execute("INSERT OR IGNORE INTO ingestion_state (id, generation) VALUES (1, 0)")
+    conn.execute("DROP VIEW IF EXISTS article_feed")
+    conn.execute(f"CREATE VIEW article_feed AS {article_view_select('articles')}")
+
+
+SOURCE_REGISTRY_COLUMNS = {
+    # JSON saraksts tikai izpildes laikā pievienotiem avotiem; ``DEFAULT_SOURCES``
+    # barotnes paliek kodā.
+    "feed_urls": "TEXT",
+    "enabled": "INTEGER NOT NULL DEFAULT 1",
+    # Rakstu skaits karstajā ``articles`` tabulā; uztur trigeri.
+    "article_count": "INTEGER NOT NULL DEFAULT 0",
+    # Kad ielāde pēdējo reizi saņēma ierakstus no šī avota.
+    "last_seen_at": "TEXT",
+}
+
+
+def init_source_registry(conn: sqlite3.Connection) -> None:
+    """Avotu reģistrs: ``sources`` ir gan rakstu vārdnīca, gan filtra saraksta avots."""
+    conn.execute("CREATE TABLE IF NOT EXISTS sources (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(sources)").fetchall()}
+    for column, definition in SOURCE_REGISTRY_COLUMNS.items():
+        if column not in columns:
+            conn.execute(f"ALTER TABLE sources ADD COLUMN {column} {definition}")
+    conn.executemany("INSERT OR IGNORE INTO sources (name) VALUES (?)", ((name,) for name in DEFAULT_SOURCES))
+
+
+def init_source_counters(conn: sqlite3.Connection) -> None:
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_articles_insert_sources'"
+    ).fetchone()
+    for event, row_ref, sign in (("INSERT", "NEW", "+"), ("DELETE", "OLD", "-")):
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_articles_{event.lower()}_sources
+            AFTER {event} ON articles
+            BEGIN
+                UPDATE sources SET article_count = article_count {sign} 1 WHERE id = {row_ref}.source_id;
+            END
+            """
+        )
+    if not exists:
+        conn.execute("UPDATE sources SET article_count = (SELECT COUNT(*) FROM articles a WHERE a.source_id = sources.id)")
+
+
+def init_topic_buckets(conn: sqlite3.Connection) -> None:
+    """Rollup ``topic_buckets``: rakstu skaits pa (stunda, tēma, avots).
+
+    Tabulu uztur trigeri uz ``articles``, tātad tajā pašā transakcijā, kurā
+    ielāde ievieto rakstu, arhivēšana to dzēš vai tēmas pārrēķins to maina.
+    Raksti bez tēmas glabājas ar ``topic_id = 0``.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_articles_insert_topic_buckets'"
+    ).fetchone()
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS topic_buckets (
+            hour INTEGER NOT NULL,
+            topic_id INTEGER NOT NULL,
+            source_id INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (hour, topic_id, source_id)
+        ) WITHOUT ROWID
+        """
+    )
+    add = (
+        "INSERT INTO topic_buckets (hour, topic_id, source_id, count) "
+        f"VALUES (NEW.published_ts / {TOPIC_BUCKET_SECONDS}, COALESCE(NEW.topic_id, 0), NEW.source_id, 1) "
+        "ON CONFLICT (hour, topic_id, source_id) DO UPDATE SET count = count + 1;"
+    )
+    remove = (
+        "UPDATE topic_buckets SET count = count - 1 "
+        f"WHERE hour = OLD.published_ts / {TOPIC_BUCKET_SECONDS} "
+        "AND topic_id = COALESCE(OLD.topic_id, 0) AND source_id = OLD.source_id;"
+    )
+    for name, event, body in (
+        ("insert", "INSERT", add),
+        ("delete", "DELETE", remove),
+        ("update", "UPDATE OF topic_id, source_id, published_ts", remove + add),
+    ):
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_articles_{name}_topic_buckets
+            AFTER {event} ON articles
+            BEGIN
+                {body}
+            END
+            """
+        )
+    if not exists:
+        rebuild_topic_buckets(conn)
+
+
+def rebuild_topic_buckets(conn: sqlite3.Connection) -> int:
+    """Pārrēķina ``topic_buckets`` no ``articles``. Atgriež rollup rindu skaitu."""
+    conn.execute("DELETE FROM topic_buckets")
+    conn.execute(
+        f"""
+        INSERT INTO topic_buckets (hour, topic_id, source_id, count)
+        SELECT published_ts / {TOPIC_BUCKET_SECONDS}, COALESCE(topic_id, 0), source_id, COUNT(*)
+        FROM articles
+        GROUP BY 1, 2, 3
+        """
+    )
+    return int(conn.execute("SELECT COUNT(*) FROM topic_buckets").fetchone()[0])
+
+
+def ingestion_generation(conn: sqlite3.Connection) -> int:
+    """Rakstu kopas versija; mainās tikai, kad ielāde/arhivēšana to tiešām izmaina.
+
+    Glabājas datubāzē, lai to redzētu arī citi procesi, kas kešo rezultātus.
+    """
+    row = conn.execute("SELECT generation FROM ingestion_state WHERE id = 1").fetchone()
+    return int(row[0]) if row else 0
+
+
+def bump_ingestion_generation(conn: sqlite3.Connection, content_changed: bool = False) -> None:
+    """Palielina paaudzi; ``content_changed`` nozīmē, ka mainītas jau esošas rindas.
+
+    Satura versija ļauj citu procesu ``HotArticleIndex`` pārbūvēt pilnībā, jo
+    inkrementālā papildināšana redz tikai jaunus ID.
+    """
+    conn.execute(
+        "UPDATE ingestion_state SET generation = generation + 1, content_version = content_version + ? WHERE id = 1",
+        (int(content_changed),),
+    )
+
+
+def result_window(days: Optional[int]) -> Optional[int]:
+    return int(time.time() // RESULT_CACHE_WINDOW_SECONDS) if days else None
+
+
+def ingestion_sources(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Ielādējamie avoti: ``DEFAULT_SOURCES`` + reģistrā pievienotie, bez atslēgtajiem."""
+    sources: Dict[str, Any] = dict(DEFAULT_SOURCES)
+    for row in conn.execute("SELECT name, feed_urls, enabled FROM sources WHERE feed_urls IS NOT NULL OR enabled = 0"):
+        if not row["enabled"]:
+            sources.pop(row["name"], None)
+        else:
+            sources[row["name"]] = json.loads(row["feed_urls"])
+    return sources
+
+
+def register_source(name: str, feed_urls: List[str]) -> None:
+    """Pievieno vai atjauno avotu bez koda izmaiņām; nākamā ielāde to jau izmanto."""
+    name = sanitize_text(name, 100)
+    if not name or not feed_urls:
+        raise ValueError("Avotam vajadzīgs nosaukums un vismaz viena barotne.")
+    with get_db() as conn:
+        conn.execute(
+            """
+            INSERT INTO sources (name, feed_urls, enabled) VALUES (?, ?, 1)
+            ON CONFLICT(name) DO UPDATE SET feed_urls = excluded.feed_urls, enabled = 1
+            """,
+            (name, json.dumps(list(feed_urls))),
+        )
+    sources_cache.clear()
+
+
+def set_source_enabled(name: str, enabled: bool) -> bool:
+    """Ieslēdz/atslēdz avota ielādi. Atgriež ``False``, ja avota nav.
+
+    Jau ielādētie raksti paliek redzami (un filtrējami), līdz tos arhivē.
+    """
+    with get_db() as conn:
+        cursor = conn.execute("UPDATE sources SET enabled = ? WHERE name = ?", (int(enabled), name))
+    sources_cache.clear()
+    return cursor.rowcount > 0
+
+
+def list_source_registry() -> List[sqlite3.Row]:
+    with get_db() as conn:
+        return conn.execute(
+            "SELECT name, feed_urls, enabled, article_count, last_seen_at FROM sources ORDER BY name"
+        ).fetchall()
+
+
+def create_article_indexes(conn: sqlite3.Connection, table: str) -> None:
+    conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_url_fp ON {table}(url_fp)")
+    if table == "articles":
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published_ts DESC, id DESC)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source_id, published_ts DESC, id DESC)"
+        )
+        conn.execute("DROP INDEX IF EXISTS idx_articles_topic")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_articles_topic_source "
+            "ON articles(topic_id, source_id, published_ts DESC, id DESC)"
+        )
+
+
+def migrate_article_storage(conn: sqlite3.Connection) -> None:
+    """Vienreizēja migrācija no teksta laukiem (ISO laiks, avota/tēmas nosaukumi, UNIQUE url).
+
+    Ja divu dažādu URL nospiedumi sakrīt, migrācija apstājas ar kļūdu, nevis klusi
+    izmet rakstu. Nenolasāms ``published_at`` tiek aizstāts ar ``fetched_at`` (ja
+    tāda kolonna ir) vai pašreizējo laiku, lai arhivēšana to uzreiz neaizvāktu.
+    """
+    conn.create_function("url_fingerprint", 1, url_fingerprint, deterministic=True)
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'articles'").fetchone()
+    archive_tables = [
+        row["name"]
+        for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB 'articles_archive_[0-9]*'"
+        ).fetchall()
+    ]
+    legacy_tables = {}
+    for table in ["articles", *archive_tables]:
+        table_columns = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+        if "published_at" not in table_columns:
+            continue
+        # Vecajā shēmā ``url`` bija UNIQUE, tāpēc vienāds nospiedums nozīmē īstu sadursmi.
+        collisions = conn.execute(
+            f"SELECT group_concat(id) AS ids FROM {table} GROUP BY url_fingerprint(url) HAVING COUNT(*) > 1"
+        ).fetchall()
+        if collisions:
+            raise RuntimeError(
+                f"URL fingerprint collision in {table} (article ids {'; '.join(row['ids'] for row in collisions)}); "
+                "article storage was not migrated"
+            )
+        legacy_tables[table] = table_columns
+
+    # Skati atsaucas uz pārbūvējamām tabulām; tie tiek izveidoti no jauna pēc migrācijas.
+    conn.execute("DROP VIEW IF EXISTS all_articles")
+    conn.execute("DROP VIEW IF EXISTS article_feed")
+    for table, table_columns in legacy_tables.items():
+        fallback_ts = "CAST(strftime('%s', o.fetched_at) AS INTEGER), " if "fetched_at" in table_columns else ""
+        undated = conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE strftime('%s', published_at) IS NULL"
+        ).fetchone()[0]
+        if undated:
+            app.logger.warning("%d articles in %s have an unparsable published_at; using a fallback time", undated, table)
+        conn.execute(f"INSERT OR IGNORE INTO sources (name) SELECT DISTINCT source FROM {table}")
+        conn.execute(f"INSERT OR IGNORE INTO topics (name) SELECT DISTINCT topic FROM {table} WHERE topic IS NOT NULL")
+        new_table = f"{table}_compact"
+        conn.execute(f"DROP TABLE IF EXISTS {new_table}")
+        conn.execute(
+            ARTICLE_STORAGE_SCHEMA.format(name=new_table, autoincrement=" AUTOINCREMENT" if table == "articles" else "")
+        )
+        conn.execute(
+            f"""
+            INSERT INTO {new_table} ({ARTICLE_STORAGE_COLUMNS})
+            SELECT o.id, o.title, o.summary, s.id, t.id,
+                   COALESCE(
+                       CAST(strftime('%s', o.published_at) AS INTEGER),
+                       {fallback_ts}CAST(strftime('%s', 'now') AS INTEGER)
+                   ),
+                   o.url, url_fingerprint(o.url), o.location,
+                   {"o.image_url" if "image_url" in table_columns else "NULL"}
+            FROM {table} o
+            JOIN sources s ON s.name = o.source
+            LEFT JOIN topics t ON t.name = o.topic
+            ORDER BY o.id
+            """
+        )
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+        create_article_indexes(conn, table)
+
+    if sequence is not None:
+        # Arhivētie ID nedrīkst tikt izmantoti atkārtoti jauniem rakstiem.
+        updated = conn.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'articles'",
+            (int(sequence["seq"]),),
+        )
+        if not updated.rowcount:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('articles', ?)", (int(sequence["seq"]),))
+
+
+SEARCH_HISTORY_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        user_id INTEGER NOT NULL,
+        query_key TEXT NOT NULL,
+        query TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 1,
+        first_seen TEXT NOT NULL,
+        last_seen TEXT NOT NULL,
+        PRIMARY KEY (user_id, query_key)
+    )
+"""
+
+
+def normalize_search_query(query: str) -> str:
+    return " ".join(str(query or "").casefold().split())
+
+
+def migrate_search_history(conn: sqlite3.Connection) -> None:
+    """Pārveido ``search_history`` no rindas-uz-meklējumu uz agregātu pa (lietotājs, vaicājums).
+
+    Vecajā shēmā katrs lapas ielādes meklējums bija jauna rinda, tāpēc tabula
+    auga bez robežām. Esošās rindas tiek saspiestas ar skaitu un pirmo/pēdējo laiku.
+    """
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(search_history)").fetchall()}
+    if not columns:
+        conn.execute(SEARCH_HISTORY_SCHEMA.format(name="search_history"))
+        return
+    if "query_key" in columns:
+        return
+
+    aggregated: Dict[tuple[int, str], List[Any]] = {}
+    for row in conn.execute("SELECT user_id, query, created_at FROM search_history ORDER BY created_at"):
+        key = (int(row["user_id"]), normalize_search_query(row["query"]))
+        if not key[1]:
+            continue
+        item = aggregated.get(key)
+        if item is None:
+            aggregated[key] = [row["query"], 1, row["created_at"], row["created_at"]]
+        else:
+            item[0] = row["query"]
+            item[1] += 1
+            item[3] = row["created_at"]
+
+    conn.execute("DROP TABLE IF EXISTS search_history_new")
+    conn.execute(SEARCH_HISTORY_SCHEMA.format(name="search_history_new"))
+    conn.executemany(
+        """
+        INSERT INTO search_history_new (user_id, query_key, query, count, first_seen, last_seen)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        ((user_id, query_key, *values) for (user_id, query_key), values in aggregated.items()),
+    )
+    conn.execute("DROP TABLE search_history")
+    conn.execute("ALTER TABLE search_history_new RENAME TO search_history")
+    for user_id in {user_id for user_id, _ in aggregated}:
+        trim_search_history(conn, user_id)
+
+
+def trim_search_history(conn: sqlite3.Connection, user_id: int) -> None:
+    conn.execute(
+        """
+        DELETE FROM search_history
+        WHERE user_id = ? AND query_key NOT IN (
+            SELECT query_key FROM search_history
+            WHERE user_id = ?
+            ORDER BY last_seen DESC
+            LIMIT ?
+        )
+        """,
+        (user_id, user_id, SEARCH_HISTORY_PER_USER),
+    )
+
+
 def init_db() -> None:
     with get_db() as conn:
+        # Iedarbojas tikai jaunai datubāzei; esošu pārslēdz ``scripts/article_partitions.py``.
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS users (
@@ -377,24 +1799,7 @@ def init_db() -> None:
         conn.execute(
             "CREATE UNIQUE INDEX IF NOT EXISTS idx_users_display_name_unique ON users(LOWER(display_name))"
         )
-        article_columns = {row["name"] for row in conn.execute("PRAGMA table_info(articles)").fetchall()}
-        if article_columns and "image_url" not in article_columns:
-            conn.execute("ALTER TABLE articles ADD COLUMN image_url TEXT")
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS articles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                summary TEXT,
-                source TEXT NOT NULL,
-                published_at TEXT NOT NULL,
-                url TEXT UNIQUE NOT NULL,
-                topic TEXT,
-                location TEXT,
-                image_url TEXT
-            )
-            """
-        )
+        init_article_storage(conn)
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS saved_articles (
@@ -436,12 +1841,21 @@ def init_db() -> None:
         )
         conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS search_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                query TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
+            CREATE INDEX IF NOT EXISTS idx_saved_articles_user_tag_created
+            ON saved_articles(user_id, tag, created_at DESC, article_id DESC)
+            """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_viewed_articles_user_viewed
+            ON viewed_articles(user_id, viewed_at DESC, article_id DESC)
+            """
+        )
+        migrate_search_history(conn)
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_search_history_user_last_seen
+            ON search_history(user_id, last_seen DESC)
             """
         )
         conn.execute(
@@ -454,6 +1868,174 @@ def init_db() -> None:
             )
             """
         )
+        init_user_counters(conn)
+        init_user_state_versions(conn)
+        init_login_throttle(conn)
+        refresh_all_articles_view(conn)
+
+
+USER_COUNTER_COLUMNS = ("saved_later", "saved_important", "ignored_articles", "ignored_sources", "viewed_articles")
+
+# Katrs skaitītājs: (tabula, SQL izteiksme vienai rindai, kas ir 1 vai 0).
+# ``{row}`` trigerī kļūst par ``NEW.``/``OLD.``, pārrēķinā par tukšu virkni.
+USER_COUNTER_SOURCES = {
+    "saved_later": ("saved_articles", "{row}tag = 'later'"),
+    "saved_important": ("saved_articles", "{row}tag = 'important'"),
+    "ignored_articles": ("ignored_articles", "1"),
+    "ignored_sources": ("ignored_sources", "1"),
+    "viewed_articles": ("viewed_articles", "1"),
+}
+
+
+def init_user_counters(conn: sqlite3.Connection) -> None:
+    """Izveido ``user_counters`` tabulu un trigerus, kas to uztur aktuālu.
+
+    Profila lapa tad nolasa vienu rindu, nevis skaita lietotāja vēsturi ar
+    pieciem ``COUNT(*)``. ``INSERT OR IGNORE`` un ``ON CONFLICT DO UPDATE``
+    neizsauc INSERT trigerus, tāpēc atkārtotas darbības skaitu nedubulto.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_counters'"
+    ).fetchone()
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS user_counters (
+            user_id INTEGER PRIMARY KEY,
+            {", ".join(f"{column} INTEGER NOT NULL DEFAULT 0" for column in USER_COUNTER_COLUMNS)}
+        )
+        """
+    )
+    for table in sorted({table for table, _ in USER_COUNTER_SOURCES.values()}):
+        columns = [column for column, (source, _) in USER_COUNTER_SOURCES.items() if source == table]
+        for event, row_ref, sign in (("INSERT", "NEW", "+"), ("DELETE", "OLD", "-")):
+            assignments = ", ".join(
+                f"{column} = {column} {sign} ({USER_COUNTER_SOURCES[column][1].format(row=f'{row_ref}.')})"
+                for column in columns
+            )
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_counters
+                AFTER {event} ON {table}
+                BEGIN
+                    INSERT OR IGNORE INTO user_counters (user_id) VALUES ({row_ref}.user_id);
+                    UPDATE user_counters SET {assignments} WHERE user_id = {row_ref}.user_id;
+                END
+                """
+            )
+    if not exists:
+        rebuild_user_counters(conn)
+
+
+# Tabulas, kuru rindas ietekmē ``UserState`` (lapas atzīmes).
+USER_STATE_TABLES = ("saved_articles", "viewed_articles")
+
+
+def init_user_state_versions(conn: sqlite3.Connection) -> None:
+    """Izveido ``user_state_versions`` un trigerus, kas versiju palielina.
+
+    Versija mainās tajā pašā transakcijā, kurā tiek pievienota vai dzēsta
+    saglabāta/skatīta raksta rinda, tāpēc kešotais ``UserState`` kļūst nederīgs
+    visos procesos, arī tad, ja izmaiņu ierakstīja cita procesa ``activity_buffer``.
+    Atkārtots skatījums (``ON CONFLICT DO UPDATE``) atzīmes nemaina un versiju nepalielina.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_state_versions (
+            user_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    for table in USER_STATE_TABLES:
+        for event, row_ref in (("INSERT", "NEW"), ("DELETE", "OLD")):
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_state_version
+                AFTER {event} ON {table}
+                BEGIN
+                    INSERT INTO user_state_versions (user_id, version) VALUES ({row_ref}.user_id, 1)
+                    ON CONFLICT(user_id) DO UPDATE SET version = version + 1;
+                END
+                """
+            )
+
+
+def count_user_activity(conn: sqlite3.Connection) -> Dict[int, Dict[str, int]]:
+    """Pārrēķina skaitītājus no pamattabulām (lēni, tikai pārbaudei/labošanai)."""
+    actual: Dict[int, Dict[str, int]] = {}
+    for column, (table, condition) in USER_COUNTER_SOURCES.items():
+        rows = conn.execute(
+            f"SELECT user_id, SUM({condition.format(row='')}) AS c FROM {table} GROUP BY user_id"
+        ).fetchall()
+        for row in rows:
+            counters = actual.setdefault(int(row["user_id"]), dict.fromkeys(USER_COUNTER_COLUMNS, 0))
+            counters[column] = int(row["c"] or 0)
+    return actual
+
+
+def rebuild_user_counters(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM user_counters")
+    conn.executemany(
+        f"""
+        INSERT INTO user_counters (user_id, {", ".join(USER_COUNTER_COLUMNS)})
+        VALUES (?, {", ".join("?" for _ in USER_COUNTER_COLUMNS)})
+        """,
+        [
+            (user_id, *(counters[column] for column in USER_COUNTER_COLUMNS))
+            for user_id, counters in count_user_activity(conn).items()
+        ],
+    )
+
+
+def check_user_counters(repair: bool = False) -> Dict[int, Dict[str, tuple[int, int]]]:
+    """Salīdzina ``user_counters`` ar faktiskajiem datiem.
+
+    Atgriež novirzes formā ``{user_id: {kolonna: (saglabāts, faktiskais)}}``.
+    Ja ``repair`` ir patiess, novirzes tiek izlabotas.
+    """
+    with get_db() as conn:
+        actual = count_user_activity(conn)
+        stored = {
+            int(row["user_id"]): {column: int(row[column]) for column in USER_COUNTER_COLUMNS}
+            for row in conn.execute("SELECT * FROM user_counters").fetchall()
+        }
+        drift: Dict[int, Dict[str, tuple[int, int]]] = {}
+        empty = dict.fromkeys(USER_COUNTER_COLUMNS, 0)
+        for user_id in sorted(set(actual) | set(stored)):
+            expected = actual.get(user_id, empty)
+            current = stored.get(user_id, empty)
+            differences = {
+                column: (current[column], expected[column])
+                for column in USER_COUNTER_COLUMNS
+                if current[column] != expected[column]
+            }
+            if differences:
+                drift[user_id] = differences
+
+        if repair and drift:
+            for user_id in drift:
+                expected = actual.get(user_id, empty)
+                conn.execute(
+                    f"""
+                    INSERT INTO user_counters (user_id, {", ".join(USER_COUNTER_COLUMNS)})
+                    VALUES (?, {", ".join("?" for _ in USER_COUNTER_COLUMNS)})
+                    ON CONFLICT(user_id) DO UPDATE SET
+                    {", ".join(f"{column} = excluded.{column}" for column in USER_COUNTER_COLUMNS)}
+                    """,
+                    (user_id, *(expected[column] for column in USER_COUNTER_COLUMNS)),
+                )
+    return drift
+
+
+def _display_name_taken(conn: sqlite3.Connection, display_name: str, exclude_email: str | None = None) -> bool:
+    if exclude_email:
+        row = conn.execute(
+            "SELECT id FROM users WHERE LOWER(display_name) = LOWER(?) AND email != ?",
+            (display_name, exclude_email.strip().lower()),
+        ).fetchone()
+    else:
+        row = conn.execute("SELECT id FROM users WHERE LOWER(display_name) = LOWER(?)", (display_name,)).fetchone()
+    return row is not None
 
 
 def is_display_name_available(display_name: str, exclude_email: str | None = None) -> bool:
@@ -461,26 +2043,22 @@ def is_display_name_available(display_name: str, exclude_email: str | None = Non
     if not cleaned:
         return False
     with get_db() as conn:
-        if exclude_email:
-            row = conn.execute(
-                "SELECT id FROM users WHERE LOWER(display_name) = LOWER(?) AND email != ?",
-                (cleaned, exclude_email.strip().lower()),
-            ).fetchone()
-        else:
-            row = conn.execute("SELECT id FROM users WHERE LOWER(display_name) = LOWER(?)", (cleaned,)).fetchone()
-    return row is None
+        return not _display_name_taken(conn, cleaned, exclude_email)
 
 
 def get_or_create_user(email: str, display_name: str) -> int:
+    """Atrod vai izveido lietotāja rindu; raksta tikai tad, ja kaut kas mainījies."""
     email = email.strip().lower()
     display_name = " ".join(display_name.strip().split())
     with get_db() as conn:
-        existing = conn.execute("SELECT id, preferred_theme FROM users WHERE email = ?", (email,)).fetchone()
+        existing = conn.execute("SELECT id, display_name FROM users WHERE email = ?", (email,)).fetchone()
         if existing:
+            user_id = int(existing["id"])
             # Lietotājvārdu nemainām automātiski uz jau aizņemtu vērtību.
-            if is_display_name_available(display_name, exclude_email=email):
-                conn.execute("UPDATE users SET display_name = ? WHERE id = ?", (display_name, existing["id"]))
-            return int(existing["id"])
+            if existing["display_name"] != display_name and not _display_name_taken(conn, display_name, email):
+                conn.execute("UPDATE users SET display_name = ? WHERE id = ?", (display_name, user_id))
+                profile_cache.pop(user_id)
+            return user_id
         cursor = conn.execute(
             "INSERT INTO users (email, display_name, created_at, preferred_theme) VALUES (?, ?, ?, ?)",
             (email, display_name, datetime.now(timezone.utc).isoformat(), "light"),
@@ -488,12 +2066,29 @@ def get_or_create_user(email: str, display_name: str) -> int:
         return int(cursor.lastrowid)
 
 
+def find_user_id(email: str) -> Optional[int]:
+    with get_db() as conn:
+        row = conn.execute("SELECT id FROM users WHERE email = ?", (email.strip().lower(),)).fetchone()
+    return int(row["id"]) if row else None
+
+
 def current_user_id() -> int:
+    """Lietotāja ID no sesijas.
+
+    ID tiek noteikts pieslēdzoties vai reģistrējoties un glabāts sesijā, tāpēc
+    parastie lapu skatījumi neveic nevienu rakstīšanu ``users`` tabulā. Vecākām
+    sesijām bez ``user_id`` to atrodam pēc e-pasta vienreiz un saglabājam sesijā.
+    """
+    user_id = session.get("user_id")
+    if user_id:
+        return int(user_id)
     email = session.get("user_email")
     display_name = session.get("display_name")
     if not email or not display_name:
         raise PermissionError("Lietotājs nav ielogojies")
-    return get_or_create_user(email, display_name)
+    user_id = find_user_id(email) or get_or_create_user(email, display_name)
+    session["user_id"] = user_id
+    return user_id
 
 
 def current_user_email() -> str:
@@ -528,6 +2123,57 @@ def parse_positive_int(value: Any, field_name: str = "id") -> int:
     return parsed
 
 
+def _cursor_signature(payload: str) -> str:
+    digest = hmac.new(
+        str(app.config["SECRET_KEY"]).encode("utf-8"), b"cursor:" + payload.encode("ascii"), hashlib.sha256
+    ).digest()
+    return base64.urlsafe_b64encode(digest[:9]).decode("ascii")
+
+
+def encode_cursor(*values: Any) -> str:
+    """Iekodē lapošanas kursoru (pēdējā parādītā ieraksta kārtošanas atslēgu).
+
+    Kursors ir parakstīts, tāpēc klients nevar izdomāt savus kursorus (un ar
+    tiem piepildīt ``result_cache``).
+    """
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(",", ":"))
+    payload = base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+    return f"{payload}.{_cursor_signature(payload)}"
+
+
+def decode_cursor(raw: str | None, types: tuple[type, ...] = (int, int)) -> Optional[List[Any]]:
+    """Atkodē kursoru. Bojāts, svešs vai neparakstīts kursors tiek ignorēts (rāda pirmo lapu).
+
+    ``types`` ir kārtošanas atslēgas lauku tipi; kursors ar citu garumu vai
+    citu tipu vērtībām (piemēram, objektu ``int`` vietā) netiek padots SQL.
+    """
+    if not raw:
+        return None
+    payload, _, signature = raw.partition(".")
+    try:
+        if not secrets.compare_digest(signature, _cursor_signature(payload)):
+            return None
+        padded = payload + "=" * (-len(payload) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError):
+        return None
+    if not isinstance(values, list) or len(values) != len(types):
+        return None
+    for value, expected in zip(values, types):
+        if isinstance(value, bool) or not isinstance(value, expected):
+            return None
+    return values
+
+
+def split_page(rows: List[sqlite3.Row], limit: int, *key_fields: str) -> tuple[List[sqlite3.Row], Optional[str]]:
+    """Sadala ``limit + 1`` ierakstus lapā un nākamās lapas kursorā."""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(*(last[field] for field in key_fields))
+
+
 def sanitize_text(value: str | None, max_length: int = 350) -> str:
     """Pārvērš RSS aprakstus drošā, īsā tekstā bez HTML.
 
@@ -571,6 +2217,12 @@ app.jinja_env.globals["csrf_token"] = csrf_token
 
 @app.before_request
 def enforce_basic_request_security() -> None:
+    if (
+        REQUEST_RATE_LIMIT
+        and request.endpoint != "static"
+        and not request_rate_limiter.allow(request.remote_addr or "unknown", datetime.now(timezone.utc))
+    ):
+        abort(429, description="Pārāk daudz pieprasījumu. Mēģini vēlreiz pēc brīža.")
     session.permanent = True
     if request.method == "POST" and not app.config.get("TESTING"):
         sent_token = request.form.get("csrf_token") or request.headers.get("X-CSRF-Token")
@@ -721,12 +2373,18 @@ def normalize_article_url(feed_url: str, article_url: str) -> str:
 def upsert_articles() -> int:
     inserted = 0
     seen_urls: set[str] = set()
+    archive_cutoff = datetime.now(timezone.utc) - timedelta(days=ARTICLE_RETENTION_DAYS)
+    last_seen_cutoff = (datetime.now(timezone.utc) - timedelta(seconds=SOURCE_LAST_SEEN_REFRESH_SECONDS)).isoformat()
+    any_seen = False
     with get_db() as conn:
-        for source, feed_urls in DEFAULT_SOURCES.items():
+        last_seen = {row["name"]: row["last_seen_at"] for row in conn.execute("SELECT name, last_seen_at FROM sources")}
+        for source, feed_urls in ingestion_sources(conn).items():
             source_inserted = 0
+            source_seen = False
             for feed_url in iter_feed_urls(feed_urls):
                 feed = parse_feed(feed_url)
                 entries = getattr(feed, "entries", []) or []
+                source_seen = source_seen or bool(entries)
                 for entry in entries[:30]:
                     title = sanitize_text(entry.get("title", "Bez virsraksta"), 300) or "Bez virsraksta"
                     summary = sanitize_text(
@@ -737,80 +2395,439 @@ def upsert_articles() -> int:
                     if not url or not urlparse(url).scheme.startswith("http") or url in seen_urls:
                         continue
                     seen_urls.add(url)
-                    published_at = parse_published(entry).isoformat()
+                    published = parse_published(entry)
+                    if published < archive_cutoff and is_archived_url(conn, url):
+                        # Raksts jau pārvietots uz arhīvu; neievietojam to atkārtoti karstajā tabulā.
+                        continue
                     topic = detect_topic(title, summary)
                     location = sanitize_text(entry.get("dc_coverage") or entry.get("location"), 100)
                     image_url = extract_image_url(entry)
-                    try:
-                        conn.execute(
-                            """
-                            INSERT INTO articles (title, summary, source, published_at, url, topic, location, image_url)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                            """,
-                            (title, summary, source, published_at, url, topic, location, image_url),
-                        )
+                    if insert_article(conn, title, summary, source, published, url, topic, location, image_url):
                         inserted += 1
                         source_inserted += 1
-                    except sqlite3.IntegrityError:
-                        continue
                 if source_inserted >= 40:
                     break
+            any_seen = any_seen or source_seen
+            if source_seen and (source_inserted or (last_seen.get(source) or "") < last_seen_cutoff):
+                conn.execute(
+                    "UPDATE sources SET last_seen_at = ? WHERE name = ?",
+                    (datetime.now(timezone.utc).isoformat(), source),
+                )
 
         # Ja pilnīgi visi ārējie avoti atgrieza 0 ierakstus, ieliekam skaidru
         # diagnostikas ierakstu, nevis atstājam lietotāju ar tukšu lapu.
-        if inserted == 0:
+        if not any_seen:
             for item in FALLBACK_ARTICLES:
+                if insert_article(
+                    conn,
+                    item["title"],
+                    item["summary"],
+                    item["source"],
+                    datetime.now(timezone.utc),
+                    item["url"],
+                    item["topic"],
+                    item.get("location"),
+                    item.get("image_url"),
+                ):
+                    inserted += 1
+        if inserted:
+            bump_ingestion_generation(conn)
+    sources_cache.clear()
+    return inserted
+
+
+class ActivityBuffer:
+    """Procesa buferis biežiem, mazsvarīgiem ierakstiem (skatījumi, meklējumi)
+    un lietotāju darbību notikumiem šifrētajai glabātuvei (``"store"``).
+
+    Pieprasījums tikai ieliek notikumu rindā un nekad neraksta pats; fona
+    pavediens to ieraksta ar ``executemany`` vienā transakcijā ik pēc
+    ``flush_seconds`` sekundēm vai tiklīdz sakrājas ``batch_size`` notikumi.
+    Rinda ir ierobežota ar ``max_pending``: ja datubāze ilgstoši nav pieejama,
+    vecākie notikumi tiek izmesti un saskaitīti (``dropped``). Izslēdzot procesu,
+    atlikums tiek ierakstīts (``atexit``). Avārijas gadījumā var pazust ne vairāk
+    kā pēdējo ``flush_seconds`` sekunžu notikumi.
+
+    SQLite daļa un ``user_store`` daļa tiek rakstītas atsevišķi: ja neizdodas
+    viena, atpakaļ rindā tiek likti tikai tās notikumi, tāpēc atkārtojums otru
+    nedubulto. Neatbilstības pēc avārijas vai izmešanas atrod ``reconcile_user_activity``.
+
+    Katrs notikums atceras ``DB_PATH`` un ``user_store``, kas bija spēkā, kad to
+    ielika rindā, tāpēc vēlāks ieraksts nenonāk citā datubāzē (piemēram, testos).
+    Ja ``flush_seconds <= 0``, pavediens netiek startēts un ``add`` raksta uzreiz.
+    """
+
+    def __init__(self, flush_seconds: float, batch_size: int, max_pending: int) -> None:
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.dropped = 0
+        self.failures = 0
+        self._pending: List[tuple[tuple[str, Any], str, int, Any, str]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, kind: str, user_id: int, value: Any) -> None:
+        event = ((DB_PATH, user_store), kind, user_id, value, datetime.now(timezone.utc).isoformat())
+        with self._lock:
+            self._pending.append(event)
+            self._trim()
+            pending = len(self._pending)
+        if self.flush_seconds <= 0:
+            # Bez fona pavediena rakstām uzreiz; kļūdas gadījumā notikumi paliek rindā.
+            try:
+                self.flush()
+            except Exception:
+                app.logger.exception("Activity write-through failed; %d events pending", self.pending())
+            return
+        self._ensure_thread()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _trim(self) -> None:
+        """Izmet vecākos notikumus virs ``max_pending`` (jāsauc zem ``_lock``)."""
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped += overflow
+            app.logger.warning("Activity buffer full, dropped %d oldest events", overflow)
+
+    def _requeue(self, events: List[tuple[tuple[str, Any], str, int, Any, str]]) -> None:
+        with self._lock:
+            self._pending = events + self._pending
+            self._trim()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"pending": len(self._pending), "dropped": self.dropped, "failures": self.failures}
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                events, self._pending = self._pending, []
+            if not events:
+                return 0
+            batches: Dict[tuple[str, Any], List[tuple[tuple[str, Any], str, int, Any, str]]] = {}
+            for event in events:
+                batches.setdefault(event[0], []).append(event)
+            groups = list(batches.items())
+            written = 0
+            for position, ((db_path, store), batch) in enumerate(groups):
+                later = [event for _, rest in groups[position + 1:] for event in rest]
+                views = [(user_id, value, created_at) for _, kind, user_id, value, created_at in batch if kind == "view"]
+                searches = [
+                    (user_id, value, created_at) for _, kind, user_id, value, created_at in batch if kind == "search"
+                ]
+                store_events = [event for event in batch if event[1] == "store"]
                 try:
-                    conn.execute(
+                    self._write(db_path, views, searches)
+                except sqlite3.Error:
+                    # Neizdevušos partiju atliekam atpakaļ rindā, lai nākamais mēģinājums to ierakstītu.
+                    self.failures += 1
+                    self._requeue(batch + later)
+                    raise
+                try:
+                    store.record_activities(value for _, _, _, value, _ in store_events)
+                except sqlite3.Error:
+                    self.failures += 1
+                    self._requeue(store_events + later)
+                    raise
+                written += len(batch)
+            return written
+
+    @staticmethod
+    def _write(db_path: str, views: List[tuple[int, Any, str]], searches: List[tuple[int, Any, str]]) -> None:
+        if not views and not searches:
+            return
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                if views:
+                    conn.executemany(
                         """
-                        INSERT INTO articles (title, summary, source, published_at, url, topic, location, image_url)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        INSERT INTO viewed_articles (user_id, article_id, viewed_at)
+                        VALUES (?, ?, ?)
+                        ON CONFLICT(user_id, article_id) DO UPDATE SET viewed_at=excluded.viewed_at
                         """,
-                        (
-                            item["title"],
-                            item["summary"],
-                            item["source"],
-                            datetime.now(timezone.utc).isoformat(),
-                            item["url"],
-                            item["topic"],
-                            item.get("location"),
-                            item.get("image_url"),
-                        ),
+                        views,
                     )
-                    inserted += 1
-                except sqlite3.IntegrityError:
-                    pass
-    return inserted
+                if searches:
+                    conn.executemany(
+                        """
+                        INSERT INTO search_history (user_id, query_key, query, count, first_seen, last_seen)
+                        VALUES (?, ?, ?, 1, ?, ?)
+                        ON CONFLICT(user_id, query_key) DO UPDATE SET
+                            count = count + 1,
+                            query = excluded.query,
+                            last_seen = excluded.last_seen
+                        """,
+                        [
+                            (user_id, normalize_search_query(query), query, created_at, created_at)
+                            for user_id, query, created_at in searches
+                        ],
+                    )
+                    for user_id in {user_id for user_id, _, _ in searches}:
+                        trim_search_history(conn, user_id)
+        finally:
+            conn.close()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+        try:
+            self.flush()
+        except Exception:
+            app.logger.exception("Activity flush on shutdown failed; %d events lost", self.pending())
+
+    def _ensure_thread(self) -> None:
+        # ``is_alive`` arī pēc ``fork`` (gunicorn ``--preload``), kur pavediens netiek pārmantots.
+        if (self._thread is not None and self._thread.is_alive()) or self.flush_seconds <= 0:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="activity-buffer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_seconds)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Pavediens turpina darbu; neierakstītie notikumi paliek rindā nākamajam mēģinājumam.
+                app.logger.exception("Activity flush failed")
+
+
+activity_buffer = ActivityBuffer(ACTIVITY_FLUSH_SECONDS, ACTIVITY_BATCH_SIZE, ACTIVITY_MAX_PENDING)
+atexit.register(activity_buffer.stop)
 
 
 def record_search(user_id: int, query: str) -> None:
-    if not query:
+    if not normalize_search_query(query):
         return
-    with get_db() as conn:
-        conn.execute(
-            "INSERT INTO search_history (user_id, query, created_at) VALUES (?, ?, ?)",
-            (user_id, query, datetime.now(timezone.utc).isoformat()),
-        )
+    activity_buffer.add("search", user_id, query)
 
 
 def record_view(user_id: int, article_id: int) -> None:
+    activity_buffer.add("view", user_id, article_id)
+
+
+# Darbība -> SQL, kas to ieraksta SQLite tabulās (parametri ``:user_id``, ``:payload``, ``:now``).
+USER_ACTIVITY_SQL = {
+    "save_later": (
+        "INSERT OR IGNORE INTO saved_articles (user_id, article_id, tag, created_at) "
+        "VALUES (:user_id, :payload, 'later', :now)"
+    ),
+    "save_important": (
+        "INSERT OR IGNORE INTO saved_articles (user_id, article_id, tag, created_at) "
+        "VALUES (:user_id, :payload, 'important', :now)"
+    ),
+    "unsave_later": "DELETE FROM saved_articles WHERE user_id = :user_id AND article_id = :payload AND tag = 'later'",
+    "unsave_important": (
+        "DELETE FROM saved_articles WHERE user_id = :user_id AND article_id = :payload AND tag = 'important'"
+    ),
+    "ignore_source": "INSERT OR IGNORE INTO ignored_sources (user_id, source) VALUES (:user_id, :payload)",
+    "ignore_article": "INSERT OR IGNORE INTO ignored_articles (user_id, article_id) VALUES (:user_id, :payload)",
+}
+
+
+def record_user_activity(user_id: int, email: str, action: str, payload: Any) -> None:
+    """Vienīgais lietotāja darbību ceļš: SQLite tabulas un šifrētā glabātuve.
+
+    Pieprasījumā tiek izpildīts tikai lētais indeksētais SQLite ieraksts (skatījumi —
+    arī tas caur ``activity_buffer``), bet notikums ``user_store`` žurnālam tiek
+    tikai ielikts rindā un ierakstīts fonā partijās ar atkārtojumu neveiksmes
+    gadījumā, tāpēc glabātuves kļūda pieprasījumu nesasniedz.
+    """
+    version = None
+    if action == "view_article":
+        record_view(user_id, payload)
+    else:
+        with get_db() as conn:
+            conn.execute(
+                USER_ACTIVITY_SQL[action],
+                {"user_id": user_id, "payload": payload, "now": datetime.now(timezone.utc).isoformat()},
+            )
+            # Versija no tās pašas transakcijas sakārto saglabāšanu/noņemšanu arī starp procesiem.
+            version = user_state_version(conn, user_id)
+    activity_buffer.add("store", user_id, (email, action, payload, version))
+
+
+def sqlite_user_activity(conn: sqlite3.Connection, user_id: int) -> Dict[str, List[Any]]:
+    """Lietotāja darbības no SQLite tabulām ``SecureUserStore`` kolekciju formā."""
+    saved = conn.execute("SELECT article_id, tag FROM saved_articles WHERE user_id = ?", (user_id,)).fetchall()
+    viewed = conn.execute(
+        "SELECT article_id FROM viewed_articles WHERE user_id = ? ORDER BY viewed_at DESC, article_id DESC LIMIT ?",
+        (user_id, USER_VIEWED_HISTORY_LIMIT),
+    ).fetchall()
+    return {
+        "viewed_article_ids": [row["article_id"] for row in reversed(viewed)],
+        "saved_later_article_ids": sorted(row["article_id"] for row in saved if row["tag"] == "later"),
+        "saved_important_article_ids": sorted(row["article_id"] for row in saved if row["tag"] == "important"),
+        "ignored_article_ids": sorted(
+            row["article_id"]
+            for row in conn.execute("SELECT article_id FROM ignored_articles WHERE user_id = ?", (user_id,))
+        ),
+        "ignored_sources": sorted(
+            row["source"] for row in conn.execute("SELECT source FROM ignored_sources WHERE user_id = ?", (user_id,))
+        ),
+    }
+
+
+# Kolekcija -> (darbība trūkstošam ID, darbība liekam ID vai None, ja tādas nav).
+RECONCILE_ACTIONS = {
+    "viewed_article_ids": ("view_article", None),
+    "saved_later_article_ids": ("save_later", "unsave_later"),
+    "saved_important_article_ids": ("save_important", "unsave_important"),
+    "ignored_article_ids": ("ignore_article", None),
+    "ignored_sources": ("ignore_source", None),
+}
+
+
+def _activity_differences(expected: Dict[str, List[Any]], stored: Dict[str, List[Any]]) -> Dict[str, tuple[List[Any], List[Any]]]:
+    """``{kolekcija: (trūkst glabātuvē, lieks glabātuvē)}`` tikai kolekcijām, kas atšķiras."""
+    differences = {}
+    for collection in RECONCILE_ACTIONS:
+        stored_values = set(stored[collection])
+        missing = [value for value in expected[collection] if value not in stored_values]
+        extra = []
+        if collection != "viewed_article_ids":
+            expected_values = set(expected[collection])
+            extra = [value for value in stored[collection] if value not in expected_values]
+        if missing or extra:
+            differences[collection] = (missing, extra)
+    return differences
+
+
+def _read_activity_pair(user_id: int, email: str) -> tuple[Optional[Dict[str, List[Any]]], Dict[str, List[Any]]]:
+    """Glabātuves un SQLite stāvoklis vienam lietotājam.
+
+    Glabātuve tiek nolasīta pirmā: serveris vispirms raksta SQLite un tikai pēc
+    tam (fonā) glabātuvi, tāpēc vēl neaizsūtīts notikums izskatās kā "trūkst",
+    nevis kā "lieks". SQLite tiek nolasīts vienā transakcijā (viens momentuzņēmums).
+    """
+    stored = user_store.get_activity(email)
     with get_db() as conn:
+        conn.execute("BEGIN")
+        try:
+            expected = sqlite_user_activity(conn, user_id)
+        finally:
+            conn.rollback()
+    return stored, expected
+
+
+def reconcile_user_activity(fix: bool = False) -> List[Dict[str, Any]]:
+    """Salīdzina SQLite darbību tabulas ar ``user_store`` ierakstiem.
+
+    SQLite ir noteicošais avots. Atgriež neatbilstības (``email``, ``collection``,
+    ``missing`` — ir SQLite, nav glabātuvē, ``extra`` — otrādi). Skatījumiem
+    glabātuvē ir tikai pēdējie ``USER_VIEWED_HISTORY_LIMIT``, un vecākie
+    skatījumi var būt arhivēti, tāpēc tur ``extra`` netiek uzskatīti par kļūdu.
+
+    Ar ``fix=True`` trūkstošie notikumi tiek pievienoti glabātuves žurnālam,
+    liekie saglabājumi — atsaukti. Pirms tam abi avoti tiek nolasīti vēlreiz,
+    un labots tiek tikai tas, kas joprojām atšķiras. Šeit tiek iztukšots tikai
+    šī procesa ``activity_buffer``; strādājoša servera buferī esošie notikumi var
+    nonākt glabātuvē pēc labojuma, tāpēc ``fix`` jāizpilda, kad serveris ir
+    apturēts (vai pēc tā buferu iztukšošanas, ``ACTIVITY_FLUSH_SECONDS``).
+    """
+    activity_buffer.flush()
+    with get_db() as conn:
+        users = conn.execute("SELECT id, email FROM users ORDER BY id").fetchall()
+
+    mismatches: List[Dict[str, Any]] = []
+    for row in users:
+        stored, expected = _read_activity_pair(row["id"], row["email"])
+        if stored is None:
+            continue
+        differences = _activity_differences(expected, stored)
+        for collection, (missing, extra) in differences.items():
+            mismatches.append({"email": row["email"], "collection": collection, "missing": missing, "extra": extra})
+        if not fix or not differences:
+            continue
+
+        stored, expected = _read_activity_pair(row["id"], row["email"])
+        recheck = _activity_differences(expected, stored) if stored is not None else {}
+        corrections: List[tuple[str, str, Any]] = []
+        for collection, (missing, extra) in differences.items():
+            still_missing, still_extra = recheck.get(collection, ([], []))
+            add_action, remove_action = RECONCILE_ACTIONS[collection]
+            corrections.extend((row["email"], add_action, value) for value in missing if value in still_missing)
+            if remove_action:
+                corrections.extend((row["email"], remove_action, value) for value in extra if value in still_extra)
+        if corrections:
+            user_store.record_activities(corrections)
+    return mismatches
+
+
+def ignore_filters(table: str = "article_feed") -> List[str]:
+    """Lietotāja ignorēto avotu/rakstu filtri kā anti-join apakšvaicājumi.
+
+    Ignorēto ID saraksts netiek ielādēts Python pusē un ievietots ``NOT IN (?, ?, …)``,
+    tāpēc parametru skaits nav atkarīgs no lietotāja vēstures un vaicājums nav
+    jāpārkompilē katram pieprasījumam. Abiem filtriem jāpadod ``user_id``.
+    """
+    return [
+        f"NOT EXISTS (SELECT 1 FROM ignored_sources i WHERE i.user_id = ? AND i.source = {table}.source)",
+        f"NOT EXISTS (SELECT 1 FROM ignored_articles i WHERE i.user_id = ? AND i.article_id = {table}.id)",
+    ]
+
+
+def user_ignores_anything(conn: sqlite3.Connection, user_id: int) -> bool:
+    return bool(
         conn.execute(
-            """
-            INSERT INTO viewed_articles (user_id, article_id, viewed_at)
-            VALUES (?, ?, ?)
-            ON CONFLICT(user_id, article_id) DO UPDATE SET viewed_at=excluded.viewed_at
+            "SELECT EXISTS (SELECT 1 FROM ignored_sources WHERE user_id = ?) "
+            "OR EXISTS (SELECT 1 FROM ignored_articles WHERE user_id = ?)",
+            (user_id, user_id),
+        ).fetchone()[0]
+    )
+
+
+def ignored_in_page(conn: sqlite3.Connection, user_id: int, rows: List[sqlite3.Row]) -> Dict[int, bool]:
+    """Kurus no kopīgā rezultāta rakstiem lietotājs ignorē: ``{id: ignorēts viss avots}``.
+
+    Viens vaicājums ar tiem pašiem ``ignore_filters`` pār lapas ``(id, source)``
+    pāriem, tāpēc ignorēto avotu saraksts katrā pieprasījumā netiek ielādēts.
+    """
+    if not rows:
+        return {}
+    source_filter, article_filter = ignore_filters("page")
+    return {
+        int(row["id"]): bool(row["source_ignored"])
+        for row in conn.execute(
+            f"""
+            WITH page(id, source) AS (
+                SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]') FROM json_each(?)
+            )
+            SELECT id, NOT ({source_filter}) AS source_ignored
+            FROM page
+            WHERE NOT ({source_filter} AND {article_filter})
             """,
-            (user_id, article_id, datetime.now(timezone.utc).isoformat()),
-        )
+            (json.dumps([[row["id"], row["source"]] for row in rows]), user_id, user_id, user_id),
+        ).fetchall()
+    }
 
 
-def fetch_articles(
-    user_id: int,
+def build_article_filters(
+    user_id: Optional[int],
     query: str,
     days: Optional[int],
     source: Optional[str],
-) -> List[sqlite3.Row]:
+) -> tuple[List[str], List[Any]]:
     filters = []
     params: List[Any] = []
 
@@ -821,155 +2838,793 @@ def fetch_articles(
 
     if days:
         since = datetime.now(timezone.utc) - timedelta(days=days)
-        filters.append("published_at >= ?")
-        params.append(since.isoformat())
+        filters.append("published_ts >= ?")
+        params.append(to_epoch(since))
 
     if source:
-        filters.append("source = ?")
+        filters.append("source_id = (SELECT id FROM sources WHERE name = ?)")
         params.append(source)
 
-    ignored_sources = get_ignored_sources(user_id)
-    ignored_articles = get_ignored_articles(user_id)
+    if user_id is not None:
+        filters.extend(ignore_filters())
+        params.extend([user_id, user_id])
 
-    if ignored_sources:
-        placeholders = ",".join("?" for _ in ignored_sources)
-        filters.append(f"source NOT IN ({placeholders})")
-        params.extend(ignored_sources)
+    return filters, params
 
-    if ignored_articles:
-        placeholders = ",".join("?" for _ in ignored_articles)
-        filters.append(f"id NOT IN ({placeholders})")
-        params.extend(ignored_articles)
 
-    where_clause = "WHERE " + " AND ".join(filters) if filters else ""
+# SQLite ``LIKE`` bez ICU salīdzina reģistru neatkarīgi tikai ASCII burtiem.
+LIKE_CASE_FOLD = {code: code + 32 for code in range(ord("A"), ord("Z") + 1)}
 
-    with get_db() as conn:
+
+def like_tokens(*texts: Optional[str]) -> set[str]:
+    """Vārdi ``LIKE`` semantikā: atdalīti ar atstarpēm, tikai ASCII pārvērsti mazajos burtos.
+
+    Vaicājums bez atstarpēm var sakrist tikai ar apakšvirkni viena šāda vārda
+    iekšienē, tāpēc ``LIKE '%q%'`` atbilst "kāds vārds satur q".
+    """
+    return set(" ".join(text or "" for text in texts).translate(LIKE_CASE_FOLD).split())
+
+
+class HotArticleIndex:
+    """Nemainīgs kolonnu momentuzņēmums rakstiem ar ``published_ts >= cutoff``.
+
+    Kolonnas (``ids``, ``published``, ``sources``, ``topics``) ir ``array('q')``,
+    kārtotas pēc ``(published_ts, id)`` dilstoši, tāpat kā ziņu lapa. Filtrs ir
+    cikls, kas apstājas, tiklīdz atrasts vajadzīgais rindu skaits.
+    ``postings`` katram vārdam glabā rakstu ID; pēc inkrementālas atjaunošanas
+    tajā var palikt jau izkrituši ID, tos izfiltrē ``positions``. Loga rindas
+    glabājas arī pilnā veidā (``rows``), lai lapai nebūtu jāiet uz SQLite.
+    """
+
+    def __init__(
+        self,
+        generation: int,
+        cutoff: int,
+        entries: List[tuple[int, int, int, int]],
+        postings: Dict[str, array],
+        rows: Dict[int, sqlite3.Row],
+        source_ids: Dict[str, int],
+        topic_ids: Dict[str, int],
+        dropped: int = 0,
+        content_version: int = 0,
+    ) -> None:
+        entries.sort(reverse=True)
+        self.generation = generation
+        self.content_version = content_version
+        self.cutoff = cutoff
+        self.published = array("q", (entry[0] for entry in entries))
+        self.ids = array("q", (entry[1] for entry in entries))
+        self.sources = array("q", (entry[2] for entry in entries))
+        self.topics = array("q", (entry[3] for entry in entries))
+        self.positions = {article_id: position for position, article_id in enumerate(self.ids)}
+        self.postings = postings
+        self.rows = rows
+        self.source_ids = source_ids
+        self.topic_ids = topic_ids
+        self.max_id = max(self.ids, default=0)
+        self.dropped = dropped
+        self._token_matches: OrderedDict[str, frozenset[int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load(conn: sqlite3.Connection, where: str, params: List[Any]) -> List[sqlite3.Row]:
         return conn.execute(
-            f"""
-            SELECT id, title, summary, source, published_at, url, topic, location, image_url
-            FROM articles
-            {where_clause}
-            ORDER BY published_at DESC
-            """,
+            f"SELECT {ARTICLE_COLUMNS}, source_id, topic_id FROM article_feed WHERE {where}",
             params,
         ).fetchall()
 
+    @staticmethod
+    def _lookups(conn: sqlite3.Connection) -> tuple[Dict[str, int], Dict[str, int]]:
+        return (
+            {row["name"]: int(row["id"]) for row in conn.execute("SELECT id, name FROM sources")},
+            {row["name"]: int(row["id"]) for row in conn.execute("SELECT id, name FROM topics")},
+        )
 
+    @classmethod
+    def build(
+        cls, conn: sqlite3.Connection, generation: int, cutoff: int, content_version: int = 0
+    ) -> "HotArticleIndex":
+        rows = cls._load(conn, "published_ts >= ?", [cutoff])
+        postings: Dict[str, List[int]] = {}
+        for row in rows:
+            for token in like_tokens(row["title"], row["summary"], row["topic"]):
+                postings.setdefault(token, []).append(int(row["id"]))
+        return cls(
+            generation,
+            cutoff,
+            [(int(row["published_ts"]), int(row["id"]), int(row["source_id"]), int(row["topic_id"] or 0)) for row in rows],
+            {token: array("q", ids) for token, ids in postings.items()},
+            {int(row["id"]): row for row in rows},
+            *cls._lookups(conn),
+            content_version=content_version,
+        )
 
-def fetch_articles_by_topic(user_id: int, topic: str) -> List[sqlite3.Row]:
-    """Atgriež tikai precīzās tēmas rakstus salīdzinājuma skatam."""
-    filters = ["topic = ?"]
-    params: List[Any] = [topic]
+    def extend(
+        self, conn: sqlite3.Connection, generation: int, cutoff: int, content_version: int = 0
+    ) -> "HotArticleIndex":
+        """Jauns momentuzņēmums: paliekošās rindas + raksti ar ``id > max_id``.
 
-    ignored_sources = get_ignored_sources(user_id)
-    ignored_articles = get_ignored_articles(user_id)
+        Ja rindu skaits nesakrīt ar datubāzi (arhivēšana, dzēšana), mainīta esošo
+        rindu satura versija (piemēram, cits process pārrēķināja tēmas) vai izkritušo
+        ID postings sarakstos sakrājies par daudz, indekss tiek būvēts no jauna.
+        """
+        if content_version != self.content_version:
+            return HotArticleIndex.build(conn, generation, cutoff, content_version)
+        kept = [
+            (published, article_id, source_id, topic_id)
+            for published, article_id, source_id, topic_id in zip(self.published, self.ids, self.sources, self.topics)
+            if published >= cutoff
+        ]
+        rows = self._load(conn, "id > ? AND published_ts >= ?", [self.max_id, cutoff])
+        expected = conn.execute("SELECT COUNT(*) FROM articles WHERE published_ts >= ?", (cutoff,)).fetchone()[0]
+        dropped = self.dropped + len(self.ids) - len(kept)
+        if len(kept) + len(rows) != expected or dropped > len(kept):
+            return HotArticleIndex.build(conn, generation, cutoff, content_version)
+
+        added: Dict[str, List[int]] = {}
+        cached_rows = {entry[1]: self.rows[entry[1]] for entry in kept}
+        for row in rows:
+            cached_rows[int(row["id"])] = row
+            kept.append((int(row["published_ts"]), int(row["id"]), int(row["source_id"]), int(row["topic_id"] or 0)))
+            for token in like_tokens(row["title"], row["summary"], row["topic"]):
+                added.setdefault(token, []).append(int(row["id"]))
+        postings = dict(self.postings)
+        for token, ids in added.items():
+            postings[token] = postings[token] + array("q", ids) if token in postings else array("q", ids)
+        return HotArticleIndex(
+            generation,
+            cutoff,
+            kept,
+            postings,
+            cached_rows,
+            *self._lookups(conn),
+            dropped=dropped,
+            content_version=content_version,
+        )
 
-    if ignored_sources:
-        placeholders = ",".join("?" for _ in ignored_sources)
-        filters.append(f"source NOT IN ({placeholders})")
-        params.extend(ignored_sources)
+    def _matching_ids(self, query: str) -> frozenset[int]:
+        needle = query.translate(LIKE_CASE_FOLD)
+        with self._lock:
+            cached = self._token_matches.get(needle)
+            if cached is not None:
+                return cached
+        matches = frozenset(
+            article_id
+            for token, ids in self.postings.items()
+            if needle in token
+            for article_id in ids
+            if article_id in self.positions
+        )
+        with self._lock:
+            self._token_matches[needle] = matches
+            while len(self._token_matches) > 256:
+                self._token_matches.popitem(last=False)
+        return matches
+
+    def _start(self, after: Optional[List[Any]]) -> int:
+        """Pirmā pozīcija ar ``(published_ts, id) < after``; kolonnas kārtotas dilstoši."""
+        if not after:
+            return 0
+        key = (-int(after[0]), -int(after[1]))
+        return bisect_right(range(len(self.ids)), key, key=lambda position: (-self.published[position], -self.ids[position]))
+
+    def select(
+        self,
+        after: Optional[List[Any]],
+        needed: int,
+        since: Optional[int] = None,
+        source: Optional[str] = None,
+        topic: Optional[str] = None,
+        query: str = "",
+    ) -> List[int]:
+        """Pozīcijas, kas atbilst filtriem, pēc ``after``, ne vairāk kā ``needed``."""
+        start = self._start(after)
+        source_id = self.source_ids.get(source, -1) if source else None
+        topic_id = self.topic_ids.get(topic, -1) if topic else None
+        matches = self._matching_ids(query) if query else None
+        if since is not None:
+            # Kolonnas kārtotas pēc laika, tāpēc ``since`` nosaka beigu pozīciju.
+            end = bisect_right(range(len(self.ids)), -since, key=lambda position: -self.published[position])
+        else:
+            end = len(self.ids)
+        if start >= end:
+            return []
+
+        positions = []
+        for position in range(start, end):
+            if source_id is not None and self.sources[position] != source_id:
+                continue
+            if topic_id is not None and self.topics[position] != topic_id:
+                continue
+            if matches is not None and self.ids[position] not in matches:
+                continue
+            positions.append(position)
+            if len(positions) == needed:
+                break
+        return positions
+
+
+_hot_index: Optional[HotArticleIndex] = None
+_hot_index_lock = threading.Lock()
+
+
+def get_hot_index(conn: sqlite3.Connection) -> Optional[HotArticleIndex]:
+    """Aktuālais karstā loga indekss; pēc jaunas ielādes paaudzes tas tiek papildināts."""
+    global _hot_index
+    if HOT_INDEX_DAYS <= 0:
+        return None
+    state = conn.execute("SELECT generation, content_version FROM ingestion_state WHERE id = 1").fetchone()
+    generation, content_version = (int(state[0]), int(state[1])) if state else (0, 0)
+    # Logs slīd pa stundām, lai indekss nav jāpārbūvē katrā pieprasījumā.
+    cutoff = to_epoch(datetime.now(timezone.utc) - timedelta(days=HOT_INDEX_DAYS)) // 3600 * 3600
+    index = _hot_index
+    if index is not None and index.generation == generation and index.cutoff == cutoff:
+        return index
+    with _hot_index_lock:
+        index = _hot_index
+        if index is None or index.generation != generation or index.cutoff != cutoff:
+            if index is None:
+                index = HotArticleIndex.build(conn, generation, cutoff, content_version)
+            else:
+                index = index.extend(conn, generation, cutoff, content_version)
+            _hot_index = index
+    return index
+
+
+def invalidate_hot_index() -> None:
+    global _hot_index
+    with _hot_index_lock:
+        _hot_index = None
+
+
+def hot_index_usable(query: str) -> bool:
+    """Indekss atbild tikai uz vaicājumiem, kuru ``LIKE`` semantiku tas precīzi atkārto."""
+    return not query or not (set(query) & {"%", "_"} or any(char.isspace() for char in query))
+
+
+FEED_SORT_KEYS = {"time": ("published_ts", "id"), "coverage": ("coverage", "published_ts", "id")}
+# Cik kopīgā kešotā rezultāta daļas viens pieprasījums drīkst izskatīt, pirms
+# atlikums tiek nolasīts ar lietotāja filtriem SQL pusē.
+FEED_CACHED_CHUNKS_PER_PAGE = 3
+
+
+def feed_query_key(query: str) -> str:
+    """Meklējums tādā formā, kādā ``LIKE`` to neatšķir: ASCII burti mazie, atstarpes sapludinātas.
+
+    Pilns ``casefold`` kā ``normalize_search_query`` šeit neder: ``LIKE`` bez ICU
+    atšķir "Ā" no "ā", tāpēc šādi vaicājumi dod dažādus rezultātus. Ar šo formu
+    tiek izpildīts arī pats vaicājums, lai kešotais rezultāts atbilstu atslēgai.
+    """
+    return " ".join(query.split()).translate(LIKE_CASE_FOLD)
 
-    if ignored_articles:
-        placeholders = ",".join("?" for _ in ignored_articles)
-        filters.append(f"id NOT IN ({placeholders})")
-        params.extend(ignored_articles)
 
+def fetch_articles(
+    user_id: int,
+    query: str,
+    days: Optional[int],
+    source: Optional[str],
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    sort: str = "time",
+) -> tuple[List[sqlite3.Row], Optional[str]]:
+    """Atgriež vienu lapu rakstu lietotājam, bez viņa ignorētajiem avotiem/rakstiem.
+
+    Lapas tiek ņemtas no kopīgā ``result_cache`` (viens ieraksts visiem
+    lietotājiem ar vienādu filtru), un ignorētie raksti tiek izmesti pēc tam.
+    Ja izmests kaut kas tiek, nākamā daļa tiek ņemta no tās pašas kešotās
+    secības, bet ne vairāk kā ``FEED_CACHED_CHUNKS_PER_PAGE`` daļas; atlikums
+    tiek nolasīts tieši ar lietotāja anti-join filtriem, tāpēc lietotājs, kas
+    ignorē gandrīz visu, neizskrien cauri visai tabulai un neizstumj citu kešu.
+    Ar ``sort="coverage"`` atspoguļojums jāskaita pēc lietotāja anti-join, tāpēc
+    kopīgais kešs tiek izmantots tikai lietotājiem, kas neko neignorē.
+    """
+    limit = limit or PAGE_SIZE
+    sort = sort if sort in FEED_SORT_KEYS else "time"
+    key_fields = FEED_SORT_KEYS[sort]
+    query = feed_query_key(query)
+    if decode_cursor(cursor, (int,) * len(key_fields)) is None:
+        cursor = None
     with get_db() as conn:
-        return conn.execute(
+        if sort == "coverage" and user_ignores_anything(conn, user_id):
+            return query_article_page(conn, user_id, query, days, source, cursor, limit, sort)
+        generation = ingestion_generation(conn)
+        window = result_window(days)
+        page: List[sqlite3.Row] = []
+        chunk_cursor = cursor
+        for _ in range(FEED_CACHED_CHUNKS_PER_PAGE):
+            key = (query, days or None, source or None, sort, chunk_cursor, limit, generation, window)
+            chunk = result_cache.get(key)
+            if chunk is None:
+                chunk = query_article_page(conn, None, query, days, source, chunk_cursor, limit, sort)
+                result_cache.set(key, chunk)
+            rows, chunk_next = chunk
+            hidden = ignored_in_page(conn, user_id, rows)
+            for row in rows:
+                if row["id"] in hidden:
+                    continue
+                if len(page) == limit:
+                    # Lapa pilna, un aiz tās ir vēl vismaz viens redzams raksts.
+                    return page, encode_cursor(*(page[-1][field] for field in key_fields))
+                page.append(row)
+            if chunk_next is None or len(page) == limit:
+                # Pilnai lapai nākamo daļu nelasām: ja tur viss būtu ignorēts,
+                # "Ielādēt vairāk" vienkārši parādīs tukšu lapu.
+                return page, chunk_next
+            chunk_cursor = chunk_next
+        rest, next_cursor = query_article_page(
+            conn, user_id, query, days, source, chunk_cursor, limit - len(page), sort
+        )
+        return page + rest, next_cursor
+
+
+def query_article_page(
+    conn: sqlite3.Connection,
+    user_id: Optional[int],
+    query: str,
+    days: Optional[int],
+    source: Optional[str],
+    cursor: Optional[str],
+    limit: int,
+    sort: str = "time",
+) -> tuple[List[sqlite3.Row], Optional[str]]:
+    """Viena lapa tieši no SQLite. Ar ``user_id=None`` bez ignorēšanas filtriem.
+
+    ``cursor`` ir iepriekšējās lapas pēdējā ieraksta atslēga, tāpēc nākamā lapa
+    tiek nolasīta ar indeksu, nevis ar OFFSET, kas būtu jāizskrien cauri.
+    """
+    if sort == "coverage":
+        return query_articles_by_coverage(conn, user_id, query, days, source, cursor, limit)
+
+    after = decode_cursor(cursor)
+    if user_id is None and hot_index_usable(query):
+        index = get_hot_index(conn)
+        if index is not None:
+            return query_hot_page(conn, index, query, days, source, after, limit)
+
+    rows = query_time_rows(conn, user_id, query, days, source, after, limit + 1)
+    return split_page(rows, limit, *FEED_SORT_KEYS["time"])
+
+
+def query_time_rows(
+    conn: sqlite3.Connection,
+    user_id: Optional[int],
+    query: str,
+    days: Optional[int],
+    source: Optional[str],
+    after: Optional[List[Any]],
+    count: int,
+) -> List[sqlite3.Row]:
+    filters, params = build_article_filters(user_id, query, days, source)
+    if after:
+        filters.append("(published_ts, id) < (?, ?)")
+        params.extend(after)
+
+    where_clause = "WHERE " + " AND ".join(filters) if filters else ""
+
+    return conn.execute(
+        f"""
+        SELECT {ARTICLE_COLUMNS}
+        FROM article_feed
+        {where_clause}
+        ORDER BY published_ts DESC, id DESC
+        LIMIT ?
+        """,
+        [*params, count],
+    ).fetchall()
+
+
+def query_hot_page(
+    conn: sqlite3.Connection,
+    index: HotArticleIndex,
+    query: str,
+    days: Optional[int],
+    source: Optional[str],
+    after: Optional[List[Any]],
+    limit: int,
+) -> tuple[List[sqlite3.Row], Optional[str]]:
+    """Lapa no karstā indeksa; ja tas beidzas ātrāk, turpinājums tiek lasīts no SQLite.
+
+    SQL tiek izpildīts tikai rindām, kas vecākas par indeksa ``cutoff``, tāpēc
+    parastas pirmās lapas un to turpinājumi neskar rakstu tabulu.
+    """
+    since = to_epoch(datetime.now(timezone.utc) - timedelta(days=days)) if days else None
+    positions = index.select(after, limit + 1, since=since, source=source, query=query)
+    rows = [index.rows[index.ids[position]] for position in positions]
+    if len(positions) <= limit and (since is None or since < index.cutoff):
+        older = [index.cutoff, 0]
+        if after and (after[0], after[1]) < (older[0], older[1]):
+            older = after
+        rows.extend(query_time_rows(conn, None, query, days, source, older, limit + 1 - len(rows)))
+    return split_page(rows, limit, *FEED_SORT_KEYS["time"])
+
+
+def query_articles_by_coverage(
+    conn: sqlite3.Connection,
+    user_id: Optional[int],
+    query: str,
+    days: Optional[int],
+    source: Optional[str],
+    cursor: Optional[str],
+    limit: int,
+) -> tuple[List[sqlite3.Row], Optional[str]]:
+    """Lapa, kārtota pēc tēmas atspoguļojuma, tad pēc laika.
+
+    Tēmas skaitu aprēķina loga funkcija pār visu filtra rezultātu, bet uz Python
+    pusi tiek atgriezta tikai viena lapa. Kursors ir ``(coverage, published_ts, id)``.
+    """
+    filters, params = build_article_filters(user_id, query, days, source)
+    where_clause = "WHERE " + " AND ".join(filters) if filters else ""
+
+    after = decode_cursor(cursor, (int, int, int))
+    keyset = ""
+    if after:
+        keyset = "WHERE (coverage, published_ts, id) < (?, ?, ?)"
+        params.extend(after)
+
+    rows = conn.execute(
+        f"""
+        SELECT *
+        FROM (
+            SELECT {ARTICLE_COLUMNS},
+                   COUNT(*) OVER (PARTITION BY COALESCE(topic, 'Cits')) AS coverage
+            FROM article_feed
+            {where_clause}
+        )
+        {keyset}
+        ORDER BY coverage DESC, published_ts DESC, id DESC
+        LIMIT ?
+        """,
+        [*params, limit + 1],
+    ).fetchall()
+    return split_page(rows, limit, *FEED_SORT_KEYS["coverage"])
+
+
+def fetch_topic_counts(
+    user_id: int,
+    query: str,
+    days: Optional[int],
+    source: Optional[str],
+) -> Dict[str, int]:
+    """Tēmu skaiti sānjoslai visam filtram, ne tikai parādītajai lapai.
+
+    Bez teksta meklējuma skaiti tiek summēti no ``topic_buckets``; ar meklējumu
+    jāskaita pašas rindas, jo teksta filtru rollup tabulā nevar attēlot.
+    """
+    if query:
+        return count_topics_in_articles(user_id, query, days, source)
+    return count_topics_in_buckets(user_id, days, source)
+
+
+def count_topics_in_articles(
+    user_id: int,
+    query: str,
+    days: Optional[int],
+    source: Optional[str],
+) -> Dict[str, int]:
+    filters, params = build_article_filters(user_id, query, days, source)
+    where_clause = "WHERE " + " AND ".join(filters) if filters else ""
+
+    with get_db() as conn:
+        rows = conn.execute(
             f"""
-            SELECT id, title, summary, source, published_at, url, topic, location, image_url
-            FROM articles
-            WHERE {' AND '.join(filters)}
-            ORDER BY published_at DESC
+            SELECT COALESCE(topic, 'Cits') AS topic, COUNT(*) AS total
+            FROM article_feed
+            {where_clause}
+            GROUP BY 1
+            ORDER BY total DESC, topic
             """,
             params,
         ).fetchall()
+    return {row["topic"]: int(row["total"]) for row in rows}
 
-def get_sources() -> List[str]:
-    with get_db() as conn:
-        rows = conn.execute("SELECT DISTINCT source FROM articles ORDER BY source").fetchall()
-    return [row["source"] for row in rows]
 
+def count_topics_in_buckets(user_id: int, days: Optional[int], source: Optional[str]) -> Dict[str, int]:
+    """Tēmu skaiti no stundu rollup tabulas, koriģēti ar lietotāja ignorētajiem.
+
+    Pilnās stundas nāk no ``topic_buckets``; loga sākuma nepilnā stunda tiek
+    saskaitīta no ``articles`` (ne vairāk kā stundas rindas), tāpēc rezultāts
+    sakrīt ar ``count_topics_in_articles``. Ignorētie avoti tiek izslēgti pēc
+    ``source_id``, ignorētie raksti — atņemti.
+    """
+    bucket_filters = [
+        "b.source_id NOT IN (SELECT s.id FROM ignored_sources i JOIN sources s ON s.name = i.source WHERE i.user_id = ?)"
+    ]
+    bucket_params: List[Any] = [user_id]
+    ignored_filters = ["i.user_id = ?", ignore_filters("a")[0]]
+    ignored_params: List[Any] = [user_id, user_id]
+    source_filter = "source_id = (SELECT id FROM sources WHERE name = ?)"
+    selects = []
+    params: List[Any] = []
+
+    if days:
+        since = to_epoch(datetime.now(timezone.utc) - timedelta(days=days))
+        first_hour = -(-since // TOPIC_BUCKET_SECONDS)
+        bucket_filters.append("b.hour >= ?")
+        bucket_params.append(first_hour)
+        ignored_filters.append("a.published_ts >= ?")
+        ignored_params.append(first_hour * TOPIC_BUCKET_SECONDS)
+        edge_filters = ["published_ts >= ?", "published_ts < ?", *ignore_filters()]
+        edge_params: List[Any] = [since, first_hour * TOPIC_BUCKET_SECONDS, user_id, user_id]
+        if source:
+            edge_filters.append(source_filter)
+            edge_params.append(source)
+        selects.append(
+            f"SELECT COALESCE(topic, 'Cits') AS topic, COUNT(*) AS total FROM article_feed "
+            f"WHERE {' AND '.join(edge_filters)} GROUP BY 1"
+        )
+        params.extend(edge_params)
+
+    if source:
+        bucket_filters.append(f"b.{source_filter}")
+        bucket_params.append(source)
+        ignored_filters.append(f"a.{source_filter}")
+        ignored_params.append(source)
+
+    selects.append(
+        "SELECT COALESCE(t.name, 'Cits') AS topic, b.count AS total "
+        "FROM topic_buckets b LEFT JOIN topics t ON t.id = b.topic_id "
+        f"WHERE {' AND '.join(bucket_filters)}"
+    )
+    params.extend(bucket_params)
+    selects.append(
+        "SELECT COALESCE(a.topic, 'Cits') AS topic, -COUNT(*) AS total "
+        "FROM ignored_articles i JOIN article_feed a ON a.id = i.article_id "
+        f"WHERE {' AND '.join(ignored_filters)} GROUP BY 1"
+    )
+    params.extend(ignored_params)
 
-def get_ignored_sources(user_id: int) -> List[str]:
     with get_db() as conn:
         rows = conn.execute(
-            "SELECT source FROM ignored_sources WHERE user_id = ?", (user_id,)
+            f"""
+            SELECT topic, SUM(total) AS total
+            FROM ({' UNION ALL '.join(selects)})
+            GROUP BY topic
+            HAVING SUM(total) > 0
+            ORDER BY total DESC, topic
+            """,
+            params,
         ).fetchall()
-    return [row["source"] for row in rows]
+    return {row["topic"]: int(row["total"]) for row in rows}
+
 
+def fetch_articles_by_topic(
+    user_id: int,
+    topic: str,
+    per_source: int = COMPARE_ARTICLES_PER_SOURCE,
+    days: Optional[int] = None,
+) -> List[sqlite3.Row]:
+    """Precīzās tēmas jaunākie ``per_source`` raksti no katra avota salīdzinājuma skatam.
 
-def get_ignored_articles(user_id: int) -> List[int]:
+    Kopīgais rezultāts tiek kešots tāpat kā ziņu lapas. Ignorēto avotu raksti
+    tiek vienkārši izmesti; ja lietotājs ignorējis kādu no atlasītajiem rakstiem,
+    vaicājums tiek izpildīts viņam atsevišķi, lai avotam joprojām būtu
+    ``per_source`` raksti.
+    """
     with get_db() as conn:
-        rows = conn.execute(
-            "SELECT article_id FROM ignored_articles WHERE user_id = ?", (user_id,)
-        ).fetchall()
-    return [int(row["article_id"]) for row in rows]
+        key = ("compare", topic, per_source, days or None, ingestion_generation(conn), result_window(days))
+        rows = result_cache.get(key)
+        if rows is None:
+            rows = query_articles_by_topic(conn, None, topic, per_source, days)
+            result_cache.set(key, rows)
+        hidden = ignored_in_page(conn, user_id, rows)
+        if not all(hidden.values()):
+            return query_articles_by_topic(conn, user_id, topic, per_source, days)
+    return [row for row in rows if row["id"] not in hidden]
+
+
+def query_articles_by_topic(
+    conn: sqlite3.Connection,
+    user_id: Optional[int],
+    topic: str,
+    per_source: int,
+    days: Optional[int],
+) -> List[sqlite3.Row]:
+    """Rezultāta apjoms ir ierobežots ar avotu skaits × ``per_source``, nevis ar
+    visu tēmas vēsturi. Indekss ``(topic_id, source_id, published_ts)`` dod
+    rindas jau vajadzīgajā secībā, tāpēc loga funkcijai nav jākārto.
+    """
+    if user_id is None and days:
+        since = to_epoch(datetime.now(timezone.utc) - timedelta(days=days))
+        index = get_hot_index(conn)
+        if index is not None and since >= index.cutoff:
+            per_source_count: Dict[int, int] = {}
+            ids = []
+            for position in index.select(None, len(index.ids), since=since, topic=topic):
+                source_id = index.sources[position]
+                if per_source_count.get(source_id, 0) < per_source:
+                    per_source_count[source_id] = per_source_count.get(source_id, 0) + 1
+                    ids.append(index.ids[position])
+            return [index.rows[article_id] for article_id in ids]
+
+    filters = ["topic_id = (SELECT id FROM topics WHERE name = ?)"]
+    params: List[Any] = [topic]
+    if user_id is not None:
+        filters.extend(ignore_filters())
+        params.extend([user_id, user_id])
+    if days:
+        filters.append("published_ts >= ?")
+        params.append(to_epoch(datetime.now(timezone.utc) - timedelta(days=days)))
+
+    return conn.execute(
+        f"""
+        SELECT {ARTICLE_COLUMNS}
+        FROM (
+            SELECT {ARTICLE_COLUMNS},
+                   ROW_NUMBER() OVER (PARTITION BY source_id ORDER BY published_ts DESC, id DESC) AS rank
+            FROM article_feed
+            WHERE {' AND '.join(filters)}
+        )
+        WHERE rank <= ?
+        ORDER BY published_ts DESC, id DESC
+        """,
+        [*params, per_source],
+    ).fetchall()
 
 
-def get_saved_article_ids(user_id: int, tag: str) -> List[int]:
+def get_sources() -> List[str]:
+    """Filtra avoti no reģistra; kešoti līdz nākamajai ielādei vai reģistra izmaiņai.
+
+    Sarakstā ir visi avoti, kuru raksti ir karstajā tabulā, arī atslēgtie:
+    atslēgšana aptur tikai jaunu rakstu ielādi, bet esošie raksti paliek ziņu
+    plūsmā, tāpēc pēc tiem jāvar arī filtrēt.
+    """
+    cached = sources_cache.get("filter")
+    if cached is not None:
+        return cached
     with get_db() as conn:
-        rows = conn.execute(
-            "SELECT article_id FROM saved_articles WHERE user_id = ? AND tag = ?",
-            (user_id, tag),
-        ).fetchall()
-    return [int(row["article_id"]) for row in rows]
+        rows = conn.execute("SELECT name FROM sources WHERE article_count > 0 ORDER BY name").fetchall()
+    sources = [row["name"] for row in rows]
+    sources_cache.set("filter", sources)
+    return sources
+
 
+@dataclass(frozen=True)
+class UserState:
+    """Lietotāja atzīmes tikai tiem rakstiem, kas redzami pašreizējā lapā.
+
+    Ignorētie avoti un raksti šeit nav vajadzīgi, jo tie tiek izfiltrēti jau SQL
+    vaicājumā (skat. ``ignore_filters``).
+    """
+
+    saved_later: frozenset[int] = field(default_factory=frozenset)
+    saved_important: frozenset[int] = field(default_factory=frozenset)
+    viewed: frozenset[int] = field(default_factory=frozenset)
+
+
+def user_state_version(conn: sqlite3.Connection, user_id: int) -> int:
+    """Lietotāja atzīmju versija; to uztur ``init_user_state_versions`` trigeri."""
+    row = conn.execute("SELECT version FROM user_state_versions WHERE user_id = ?", (user_id,)).fetchone()
+    return int(row[0]) if row else 0
+
+
+def load_user_state(user_id: int, article_ids: Iterable[int]) -> UserState:
+    """Ielādē lapas rakstu atzīmes ar vienu vaicājumu un kešo līdz nākamajai izmaiņai."""
+    ids = tuple(sorted({int(article_id) for article_id in article_ids}))
+    if not ids:
+        return UserState()
 
-def get_viewed_article_ids(user_id: int) -> List[int]:
     with get_db() as conn:
+        version = user_state_version(conn, user_id)
+        cached = user_state_cache.get((user_id, ids))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        # Viens JSON parametrs neatkarīgi no lapas izmēra, lai vaicājums nav jāpārkompilē.
+        ids_json = json.dumps(ids)
         rows = conn.execute(
-            "SELECT article_id FROM viewed_articles WHERE user_id = ?",
-            (user_id,),
+            """
+            SELECT s.tag AS kind, s.article_id
+            FROM saved_articles s
+            WHERE s.user_id = ? AND s.article_id IN (SELECT value FROM json_each(?))
+            UNION ALL
+            SELECT 'viewed' AS kind, v.article_id
+            FROM viewed_articles v
+            WHERE v.user_id = ? AND v.article_id IN (SELECT value FROM json_each(?))
+            """,
+            (user_id, ids_json, user_id, ids_json),
         ).fetchall()
-    return [int(row["article_id"]) for row in rows]
+
+    marks: Dict[str, set[int]] = {"later": set(), "important": set(), "viewed": set()}
+    for row in rows:
+        marks.setdefault(row["kind"], set()).add(int(row["article_id"]))
+    state = UserState(
+        saved_later=frozenset(marks["later"]),
+        saved_important=frozenset(marks["important"]),
+        viewed=frozenset(marks["viewed"]),
+    )
+    user_state_cache.set((user_id, ids), (version, state))
+    return state
 
 
-def get_saved_articles(user_id: int, tag: str) -> List[sqlite3.Row]:
+def fetch_article_rows(article_ids: Iterable[int]) -> Dict[int, sqlite3.Row]:
+    """Atrod rakstus pēc ID gan karstajā tabulā, gan arhīva partīcijās."""
+    ids = [int(article_id) for article_id in article_ids]
+    if not ids:
+        return {}
     with get_db() as conn:
         rows = conn.execute(
-            """
-            SELECT a.id, a.title, a.summary, a.source, a.published_at, a.url, a.topic, a.location, a.image_url
-            FROM articles a
-            JOIN saved_articles s ON s.article_id = a.id
-            WHERE s.user_id = ? AND s.tag = ?
-            ORDER BY s.created_at DESC
+            f"""
+            SELECT {ARTICLE_COLUMNS}
+            FROM all_articles
+            WHERE id IN (SELECT value FROM json_each(?))
             """,
-            (user_id, tag),
+            (json.dumps(ids),),
         ).fetchall()
-    return rows
+    return {int(row["id"]): row for row in rows}
 
 
-def get_recently_viewed(user_id: int, limit: int = 30) -> List[sqlite3.Row]:
+def hydrate_articles(keys: List[sqlite3.Row], time_field: str) -> List[Dict[str, Any]]:
+    """Pievieno lapas atslēgām (article_id + laiks) pilnus raksta laukus saglabātajā secībā."""
+    articles = fetch_article_rows(row["article_id"] for row in keys)
+    hydrated = []
+    for row in keys:
+        article = articles.get(int(row["article_id"]))
+        if article is not None:
+            hydrated.append({**dict(article), time_field: row[time_field]})
+    return hydrated
+
+
+def get_saved_articles(
+    user_id: int,
+    tag: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> tuple[List[Dict[str, Any]], Optional[str]]:
+    limit = limit or PAGE_SIZE
+    filters = ["user_id = ?", "tag = ?"]
+    params: List[Any] = [user_id, tag]
+    after = decode_cursor(cursor, (str, int))
+    if after:
+        filters.append("(created_at, article_id) < (?, ?)")
+        params.extend(after)
+
     with get_db() as conn:
-        rows = conn.execute(
-            """
-            SELECT a.id, a.title, a.summary, a.source, a.published_at, a.url, a.topic, a.location, a.image_url, v.viewed_at
-            FROM viewed_articles v
-            JOIN articles a ON a.id = v.article_id
-            WHERE v.user_id = ?
-            ORDER BY v.viewed_at DESC
+        keys = conn.execute(
+            f"""
+            SELECT article_id, created_at AS saved_at
+            FROM saved_articles
+            WHERE {' AND '.join(filters)}
+            ORDER BY created_at DESC, article_id DESC
             LIMIT ?
             """,
-            (user_id, limit),
+            [*params, limit + 1],
         ).fetchall()
-    return rows
-
+    page, next_cursor = split_page(keys, limit, "saved_at", "article_id")
+    return hydrate_articles(page, "saved_at"), next_cursor
 
-def build_topic_counts(articles: Iterable[sqlite3.Row]) -> Dict[str, int]:
-    counts: Dict[str, int] = {}
-    for article in articles:
-        topic = article["topic"] or "Cits"
-        counts[topic] = counts.get(topic, 0) + 1
-    return counts
 
+def get_recently_viewed(
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> tuple[List[Dict[str, Any]], Optional[str]]:
+    limit = limit or PAGE_SIZE
+    filters = ["user_id = ?"]
+    params: List[Any] = [user_id]
+    after = decode_cursor(cursor, (str, int))
+    if after:
+        filters.append("(viewed_at, article_id) < (?, ?)")
+        params.extend(after)
 
-def sort_by_topic_coverage(articles: List[sqlite3.Row]) -> List[sqlite3.Row]:
-    counts = build_topic_counts(articles)
-    return sorted(articles, key=lambda row: counts.get(row["topic"] or "Cits", 0), reverse=True)
+    with get_db() as conn:
+        keys = conn.execute(
+            f"""
+            SELECT article_id, viewed_at
+            FROM viewed_articles
+            WHERE {' AND '.join(filters)}
+            ORDER BY viewed_at DESC, article_id DESC
+            LIMIT ?
+            """,
+            [*params, limit + 1],
+        ).fetchall()
+    page, next_cursor = split_page(keys, limit, "viewed_at", "article_id")
+    return hydrate_articles(page, "viewed_at"), next_cursor
 
 
 def get_user_profile_data(user_id: int) -> sqlite3.Row:
+    row = profile_cache.get(user_id)
+    if row is not None:
+        return row
     with get_db() as conn:
         row = conn.execute(
             "SELECT id, email, display_name, created_at, preferred_theme FROM users WHERE id = ?",
@@ -977,39 +3632,25 @@ def get_user_profile_data(user_id: int) -> sqlite3.Row:
         ).fetchone()
     if row is None:
         raise PermissionError("Lietotājs nav atrasts")
+    profile_cache.set(user_id, row)
     return row
 
 
 def set_user_theme(user_id: int, theme: str) -> None:
     with get_db() as conn:
         conn.execute("UPDATE users SET preferred_theme = ? WHERE id = ?", (theme, user_id))
+    profile_cache.pop(user_id)
 
 
 def get_user_stats(user_id: int) -> Dict[str, int]:
     with get_db() as conn:
-        stats = {
-            "saved_later": conn.execute(
-                "SELECT COUNT(*) AS c FROM saved_articles WHERE user_id = ? AND tag = 'later'",
-                (user_id,),
-            ).fetchone()["c"],
-            "saved_important": conn.execute(
-                "SELECT COUNT(*) AS c FROM saved_articles WHERE user_id = ? AND tag = 'important'",
-                (user_id,),
-            ).fetchone()["c"],
-            "ignored_articles": conn.execute(
-                "SELECT COUNT(*) AS c FROM ignored_articles WHERE user_id = ?",
-                (user_id,),
-            ).fetchone()["c"],
-            "ignored_sources": conn.execute(
-                "SELECT COUNT(*) AS c FROM ignored_sources WHERE user_id = ?",
-                (user_id,),
-            ).fetchone()["c"],
-            "viewed_articles": conn.execute(
-                "SELECT COUNT(*) AS c FROM viewed_articles WHERE user_id = ?",
-                (user_id,),
-            ).fetchone()["c"],
-        }
-    return {k: int(v) for k, v in stats.items()}
+        row = conn.execute(
+            f"SELECT {', '.join(USER_COUNTER_COLUMNS)} FROM user_counters WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+    if row is None:
+        return dict.fromkeys(USER_COUNTER_COLUMNS, 0)
+    return {column: int(row[column]) for column in USER_COUNTER_COLUMNS}
 
 
 @app.context_processor
@@ -1033,21 +3674,20 @@ def index() -> str:
     days_raw = request.args.get("days")
     source = sanitize_text(request.args.get("source"), 100) or None
     sort = request.args.get("sort", "time")
+    cursor = request.args.get("cursor") or None
 
     days = int(days_raw) if days_raw and days_raw.isdigit() else None
 
-    record_search(user_id, query)
+    if not cursor:
+        # Nākamās lapas un atkārtoti ielādes nav jauni meklējumi.
+        record_search(user_id, query)
 
-    articles = fetch_articles(user_id, query, days, source)
-    if sort == "coverage":
-        articles = sort_by_topic_coverage(articles)
+    articles, next_cursor = fetch_articles(user_id, query, days, source, cursor, sort=sort)
 
     sources = get_sources()
-    saved_later = set(get_saved_article_ids(user_id, "later"))
-    saved_important = set(get_saved_article_ids(user_id, "important"))
-    viewed_ids = set(get_viewed_article_ids(user_id))
+    state = load_user_state(user_id, (article["id"] for article in articles))
 
-    topic_counts = build_topic_counts(articles)
+    topic_counts = fetch_topic_counts(user_id, query, days, source)
 
     return render_template(
         "index.html",
@@ -1057,10 +3697,11 @@ def index() -> str:
         selected_days=days_raw,
         query=query,
         sort=sort,
-        saved_later=saved_later,
-        saved_important=saved_important,
-        viewed_ids=viewed_ids,
+        saved_later=state.saved_later,
+        saved_important=state.saved_important,
+        viewed_ids=state.viewed,
         topic_counts=topic_counts,
+        next_cursor=next_cursor,
     )
 
 
@@ -1069,7 +3710,9 @@ def index() -> str:
 def compare() -> str:
     user_id = current_user_id()
     topic = sanitize_text(request.args.get("topic", ""), 200)
-    articles = fetch_articles_by_topic(user_id, topic)
+    days_raw = request.args.get("days")
+    days = int(days_raw) if days_raw and days_raw.isdigit() else None
+    articles = fetch_articles_by_topic(user_id, topic, days=days)
     grouped: Dict[str, List[sqlite3.Row]] = {}
     for article in articles:
         grouped.setdefault(article["source"], []).append(article)
@@ -1080,16 +3723,16 @@ def compare() -> str:
 @login_required
 def saved() -> str:
     user_id = current_user_id()
-    articles = get_saved_articles(user_id, "later")
-    return render_template("saved.html", articles=articles, title="Lasīt vēlāk")
+    articles, next_cursor = get_saved_articles(user_id, "later", request.args.get("cursor") or None)
+    return render_template("saved.html", articles=articles, title="Lasīt vēlāk", next_cursor=next_cursor)
 
 
 @app.route("/important")
 @login_required
 def important() -> str:
     user_id = current_user_id()
-    articles = get_saved_articles(user_id, "important")
-    return render_template("saved.html", articles=articles, title="Svarīgie")
+    articles, next_cursor = get_saved_articles(user_id, "important", request.args.get("cursor") or None)
+    return render_template("saved.html", articles=articles, title="Svarīgie", next_cursor=next_cursor)
 
 
 @app.route("/history")
@@ -1099,10 +3742,10 @@ def history() -> str:
     with get_db() as conn:
         history_rows = conn.execute(
             """
-            SELECT query, created_at
+            SELECT query, count, last_seen
             FROM search_history
             WHERE user_id = ?
-            ORDER BY created_at DESC
+            ORDER BY last_seen DESC
             LIMIT 20
             """,
             (user_id,),
@@ -1116,8 +3759,14 @@ def history() -> str:
             """,
             (user_id,),
         ).fetchall()
-    viewed_rows = get_recently_viewed(user_id)
-    return render_template("history.html", history=history_rows, saved=saved_rows, viewed=viewed_rows)
+    viewed_rows, next_cursor = get_recently_viewed(user_id, request.args.get("cursor") or None)
+    return render_template(
+        "history.html",
+        history=history_rows,
+        saved=saved_rows,
+        viewed=viewed_rows,
+        next_cursor=next_cursor,
+    )
 
 
 @app.route("/register", methods=["GET", "POST"])
@@ -1148,12 +3797,17 @@ def register() -> str:
             flash("Paroles nesakrīt.", "danger")
             return render_template("register.html")
 
-        created, message = user_store.create_user(email, display_name, password)
+        try:
+            created, message = user_store.create_user(email, display_name, password)
+        except PasswordHashingBusy:
+            flash(PASSWORD_HASHING_BUSY_MESSAGE, "warning")
+            return render_template("register.html"), 503
         flash(message, "success" if created else "danger")
         if created:
             session["user_email"] = email
             session["display_name"] = display_name
             user_id = get_or_create_user(email, display_name)
+            session["user_id"] = user_id
             session["preferred_theme"] = get_user_profile_data(user_id)["preferred_theme"]
             return redirect(url_for("index"))
 
@@ -1165,32 +3819,31 @@ def login() -> str:
     if request.method == "POST":
         email = sanitize_text(request.form.get("email", ""), 254).lower()
         password = request.form.get("password", "")
-        now = datetime.now(timezone.utc)
 
-        lock_until = LOGIN_LOCKED_UNTIL.get(email)
-        if lock_until and now < lock_until:
-            remaining = max(1, int((lock_until - now).total_seconds()))
+        if not login_throttle.allow_ip(request.remote_addr or "unknown"):
+            flash(f"Pārāk daudz mēģinājumu. Mēģini vēlreiz pēc {LOGIN_IP_WINDOW_SECONDS} sek.", "danger")
+            return render_template("login.html"), 429
+
+        remaining = login_throttle.locked_for(email)
+        if remaining:
             flash(f"Pārāk daudz mēģinājumu. Mēģini vēlreiz pēc {remaining} sek.", "danger")
             return render_template("login.html")
 
-        if lock_until and now >= lock_until:
-            LOGIN_LOCKED_UNTIL.pop(email, None)
-            LOGIN_ATTEMPTS.pop(email, None)
-
-        user = user_store.authenticate(email, password)
+        try:
+            user = user_store.authenticate(email, password)
+        except PasswordHashingBusy:
+            flash(PASSWORD_HASHING_BUSY_MESSAGE, "warning")
+            return render_template("login.html"), 503
         if user:
-            LOGIN_ATTEMPTS.pop(email, None)
-            LOGIN_LOCKED_UNTIL.pop(email, None)
+            login_throttle.record_success(email)
             session["user_email"] = user["email"]
             session["display_name"] = user["display_name"]
             user_id = get_or_create_user(user["email"], user["display_name"])
+            session["user_id"] = user_id
             session["preferred_theme"] = get_user_profile_data(user_id)["preferred_theme"]
             return redirect(url_for("index"))
 
-        failures = LOGIN_ATTEMPTS.get(email, 0) + 1
-        LOGIN_ATTEMPTS[email] = failures
-        if failures >= LOGIN_MAX_FAILURES:
-            LOGIN_LOCKED_UNTIL[email] = now + timedelta(seconds=LOGIN_LOCKOUT_SECONDS)
+        if login_throttle.record_failure(email):
             flash("Pārāk daudz neveiksmīgu mēģinājumu. Konts īslaicīgi bloķēts.", "danger")
             return render_template("login.html")
 
@@ -1214,6 +3867,7 @@ def profile() -> str:
         if display_name:
             with get_db() as conn:
                 conn.execute("UPDATE users SET display_name = ? WHERE id = ?", (display_name, user_id))
+            profile_cache.pop(user_id)
             session["display_name"] = display_name
 
         set_user_theme(user_id, selected_theme)
@@ -1233,6 +3887,29 @@ def logout() -> str:
     return redirect(url_for("login"))
 
 
+@app.route("/internal/cache-stats")
+def cache_stats():
+    """Procesa kešu skaitītāji (trāpījumi, kļūdas, izstumšanas) uzraudzībai.
+
+    Pieejami tikai iekšējiem izsaucējiem ar ``X-Internal-Token`` galveni, kas
+    sakrīt ar ``INTERNAL_STATS_TOKEN``; bez konfigurēta marķiera maršruts atbild ar 404.
+    """
+    sent_token = request.headers.get("X-Internal-Token", "")
+    if not INTERNAL_STATS_TOKEN or not secrets.compare_digest(sent_token, INTERNAL_STATS_TOKEN):
+        abort(404)
+    with get_db() as conn:
+        generation = ingestion_generation(conn)
+    return jsonify(
+        {
+            "ingestion_generation": generation,
+            "results": result_cache.stats(),
+            "user_records": user_store.record_cache.stats(),
+            "password_hashing": password_hasher.stats(),
+            "activity": activity_buffer.stats(),
+        }
+    )
+
+
 @app.route("/refresh", methods=["POST"])
 @login_required
 def refresh() -> str:
@@ -1246,11 +3923,10 @@ def open_article(article_id: int) -> str:
     user_id = current_user_id()
     email = current_user_email()
     with get_db() as conn:
-        article = conn.execute("SELECT url FROM articles WHERE id = ?", (article_id,)).fetchone()
+        article = conn.execute("SELECT url FROM all_articles WHERE id = ?", (article_id,)).fetchone()
     if not article:
         abort(404)
-    record_view(user_id, article_id)
-    user_store.record_activity(email, "view_article", article_id)
+    record_user_activity(user_id, email, "view_article", article_id)
     return redirect(article["url"])
 
 
@@ -1274,18 +3950,7 @@ def save_article() -> str:
         flash("Nederīgs raksta identifikators.", "warning")
         return safe_redirect("index")
 
-    with get_db() as conn:
-        conn.execute(
-            """
-            INSERT OR IGNORE INTO saved_articles (user_id, article_id, tag, created_at)
-            VALUES (?, ?, ?, ?)
-            """,
-            (user_id, article_id_int, tag, datetime.now(timezone.utc).isoformat()),
-        )
-    if tag == "later":
-        user_store.record_activity(email, "save_later", article_id_int)
-    if tag == "important":
-        user_store.record_activity(email, "save_important", article_id_int)
+    record_user_activity(user_id, email, f"save_{tag}", article_id_int)
     return safe_redirect("index")
 
 
@@ -1305,15 +3970,7 @@ def unsave_article() -> str:
         except ValueError:
             flash("Nederīgs raksta identifikators.", "warning")
             return safe_redirect("index")
-        with get_db() as conn:
-            conn.execute(
-                "DELETE FROM saved_articles WHERE user_id = ? AND article_id = ? AND tag = ?",
-                (user_id, article_id_int, tag),
-            )
-        if tag == "later":
-            user_store.record_activity(email, "unsave_later", article_id_int)
-        if tag == "important":
-            user_store.record_activity(email, "unsave_important", article_id_int)
+        record_user_activity(user_id, email, f"unsave_{tag}", article_id_int)
     return safe_redirect("index")
 
 
@@ -1324,12 +3981,7 @@ def ignore_source() -> str:
     email = current_user_email()
     source = sanitize_text(request.form.get("source"), 100)
     if source:
-        with get_db() as conn:
-            conn.execute(
-                "INSERT OR IGNORE INTO ignored_sources (user_id, source) VALUES (?, ?)",
-                (user_id, source),
-            )
-        user_store.record_activity(email, "ignore_source", source)
+        record_user_activity(user_id, email, "ignore_source", source)
     return safe_redirect("index")
 
 
@@ -1345,12 +3997,7 @@ def ignore_article() -> str:
         except ValueError:
             flash("Nederīgs raksta identifikators.", "warning")
             return safe_redirect("index")
-        with get_db() as conn:
-            conn.execute(
-                "INSERT OR IGNORE INTO ignored_articles (user_id, article_id) VALUES (?, ?)",
-                (user_id, article_id_int),
-            )
-        user_store.record_activity(email, "ignore_article", article_id_int)
+        record_user_activity(user_id, email, "ignore_article", article_id_int)
     return safe_redirect("index")
 
 
@@ -1390,15 +4037,228 @@ def remove_saved_search() -> str:
 def cleanup_existing_article_summaries() -> None:
     """Notīra vecos RSS HTML fragmentus un pārrēķina tēmas esošajā data.db."""
     with get_db() as conn:
-        rows = conn.execute("SELECT id, title, summary, topic FROM articles").fetchall()
+        rows = conn.execute("SELECT id, title, summary, topic FROM article_feed").fetchall()
+        changed = False
         for row in rows:
             cleaned = sanitize_text(row["summary"], 700)
             topic = detect_topic(row["title"], cleaned)
             if cleaned != (row["summary"] or "") or topic != (row["topic"] or ""):
                 conn.execute(
-                    "UPDATE articles SET summary = ?, topic = ? WHERE id = ?",
-                    (cleaned, topic, row["id"]),
+                    "UPDATE articles SET summary = ?, topic_id = ? WHERE id = ?",
+                    (cleaned, lookup_id(conn, "topics", topic) if topic else None, row["id"]),
                 )
+                changed = True
+        if changed:
+            bump_ingestion_generation(conn, content_changed=True)
+            # Inkrementālā atjaunošana pārlasa tikai jaunus rakstus, ne mainītas tēmas.
+            invalidate_hot_index()
+
+
+ARCHIVE_TABLE_PREFIX = "articles_archive_"
+
+
+def list_archive_tables(conn: sqlite3.Connection) -> List[str]:
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ? ORDER BY name",
+        (ARCHIVE_TABLE_PREFIX + "[0-9][0-9][0-9][0-9][0-9][0-9]",),
+    ).fetchall()
+    return [row["name"] for row in rows]
+
+
+def refresh_all_articles_view(conn: sqlite3.Connection) -> None:
+    """Pārveido ``all_articles`` skatu: karstā tabula + visas arhīva partīcijas.
+
+    Saglabātie, svarīgie un skatītie raksti tiek meklēti šajā skatā, tāpēc tie
+    atrodas arī pēc pārvietošanas uz arhīvu. ``WHERE id = ...`` tiek nodots katrai
+    partīcijai, un katrā tiek izmantota primārā atslēga.
+    """
+    selects = [article_view_select(table) for table in ["articles", *list_archive_tables(conn)]]
+    conn.execute("DROP VIEW IF EXISTS all_articles")
+    conn.execute(f"CREATE VIEW all_articles AS {' UNION ALL '.join(selects)}")
+
+
+def is_archived_url(conn: sqlite3.Connection, url: str) -> bool:
+    for table in list_archive_tables(conn):
+        if conn.execute(f"SELECT 1 FROM {table} WHERE url_fp = ?", (url_fingerprint(url),)).fetchone():
+            return True
+    return False
+
+
+def archive_old_articles(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Pārvieto rakstus, kas vecāki par ``ARTICLE_RETENTION_DAYS``, mēneša arhīva tabulās.
+
+    Atgriež pārvietoto rindu skaitu pa partīcijām.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = to_epoch(now - timedelta(days=ARTICLE_RETENTION_DAYS))
+    moved: Dict[str, int] = {}
+    with get_db() as conn:
+        months = [
+            row["month"]
+            for row in conn.execute(
+                "SELECT DISTINCT strftime('%Y%m', published_ts, 'unixepoch') AS month FROM articles WHERE published_ts < ?",
+                (cutoff,),
+            ).fetchall()
+        ]
+        if not months:
+            return moved
+        known_tables = set(list_archive_tables(conn))
+        for month in months:
+            table = ARCHIVE_TABLE_PREFIX + month
+            if not re.fullmatch(r"articles_archive_\d{6}", table):
+                continue
+            conn.execute(ARTICLE_STORAGE_SCHEMA.format(name=table, autoincrement=""))
+            create_article_indexes(conn, table)
+            month_filter = "published_ts < ? AND strftime('%Y%m', published_ts, 'unixepoch') = ?"
+            conn.execute(
+                f"INSERT OR IGNORE INTO {table} ({ARTICLE_STORAGE_COLUMNS}) "
+                f"SELECT {ARTICLE_STORAGE_COLUMNS} FROM articles WHERE {month_filter}",
+                (cutoff, month),
+            )
+            # Dzēšam tikai tiešām nokopētās rindas: ja arhīvā jau ir tāds pats ``url_fp``
+            # (piemēram, atkārtoti ielasīts raksts), karstā rinda paliek, lai saglabātās
+            # un skatītās atsauces nepazustu.
+            cursor = conn.execute(
+                f"DELETE FROM articles WHERE {month_filter} "
+                f"AND EXISTS (SELECT 1 FROM {table} AS archived WHERE archived.id = articles.id)",
+                (cutoff, month),
+            )
+            moved[table] = cursor.rowcount
+            kept = conn.execute(f"SELECT COUNT(*) FROM articles WHERE {month_filter}", (cutoff, month)).fetchone()[0]
+            if kept:
+                app.logger.warning("Archive %s already holds %d of these URLs; kept them in articles", table, kept)
+        if not known_tables.issuperset(moved):
+            refresh_all_articles_view(conn)
+        conn.execute("DELETE FROM topic_buckets WHERE count <= 0")
+        bump_ingestion_generation(conn)
+    sources_cache.clear()
+    return moved
+
+
+def incremental_vacuum(pages: int = INCREMENTAL_VACUUM_PAGES) -> int:
+    """Atbrīvo līdz ``pages`` brīvajām lapām. Atgriež atlikušo brīvo lapu skaitu."""
+    conn = get_db()
+    try:
+        conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+        return int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+    finally:
+        conn.close()
+
+
+def enable_incremental_vacuum() -> bool:
+    """Pārslēdz esošu datubāzi uz ``auto_vacuum = INCREMENTAL`` (pilns VACUUM, vienreiz)."""
+    conn = get_db()
+    try:
+        if int(conn.execute("PRAGMA auto_vacuum").fetchone()[0]) == 2:
+            return False
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return True
+    finally:
+        conn.close()
+
+
+def describe_article_partitions() -> List[Dict[str, Any]]:
+    """Karstās tabulas un arhīva partīciju rindu skaits, laika robežas un izmērs baitos."""
+    with get_db() as conn:
+        try:
+            sizes = {
+                row["name"]: int(row["size"])
+                for row in conn.execute("SELECT name, SUM(pgsize) AS size FROM dbstat GROUP BY name").fetchall()
+            }
+        except sqlite3.OperationalError:
+            sizes = {}
+        partitions = []
+        for table in ["articles", *list_archive_tables(conn)]:
+            row = conn.execute(
+                f"SELECT COUNT(*) AS total, MIN(published_ts) AS oldest, MAX(published_ts) AS newest FROM {table}"
+            ).fetchone()
+            index_names = [
+                index_row["name"]
+                for index_row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table,)
+                ).fetchall()
+            ]
+            partitions.append(
+                {
+                    "table": table,
+                    "rows": int(row["total"]),
+                    "oldest": epoch_to_iso(row["oldest"]),
+                    "newest": epoch_to_iso(row["newest"]),
+                    "table_bytes": sizes.get(table),
+                    "index_bytes": sum(sizes.get(name, 0) for name in index_names) if sizes else None,
+                }
+            )
+    return partitions
+
+
+def run_article_maintenance() -> None:
+    moved = archive_old_articles()
+    if moved:
+        app.logger.info("Arhivēti raksti: %s", moved)
+    incremental_vacuum()
+
+
+class PeriodicTask:
+    """Fona pavediens, kas izpilda ``func`` ik pēc ``interval_seconds`` sekundēm.
+
+    Tiek palaists slinki ar ``ensure_started()`` (no ``before_request``), tāpēc
+    darbojas arī zem WSGI servera, kur ``__main__`` bloks netiek izpildīts, un
+    tiek palaists no jauna, ja pavediens ir beidzies (piemēram, pēc ``fork``).
+    Kļūdas tiek žurnalētas, un pavediens turpina darbu.
+    """
+
+    def __init__(self, name: str, interval_seconds: float, func) -> None:
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.func()
+            except Exception:
+                app.logger.exception("Background task %s failed", self.name)
+            self._stopped.wait(self.interval_seconds)
+
+
+article_maintenance = PeriodicTask("article-maintenance", ARTICLE_MAINTENANCE_SECONDS, run_article_maintenance)
+
+
+def start_article_maintenance() -> None:
+    """Palaiž rakstu arhivēšanu un ``incremental_vacuum`` fonā (ja vēl nedarbojas)."""
+    article_maintenance.ensure_started()
+
+
+def compact_user_journal() -> None:
+    while user_store.compact_activity_journal():
+        pass
+
+
+user_journal_compaction = PeriodicTask("user-journal-compaction", USER_JOURNAL_COMPACT_SECONDS, compact_user_journal)
+
+
+def start_user_journal_compaction() -> None:
+    """Palaiž lietotāju darbību žurnāla sapludināšanu fonā (ja vēl nedarbojas)."""
+    user_journal_compaction.ensure_started()
 
 
 def ensure_seed_data() -> None:
@@ -1410,6 +4270,22 @@ def ensure_seed_data() -> None:
         upsert_articles()
 
 
+@app.before_request
+def start_background_tasks() -> None:
+    """Fona apkopi palaiž katrā procesā pirmais pieprasījums (arī zem gunicorn).
+
+    Žurnāla sapludināšana darbojas vienmēr. Rakstu apkopi ``ARTICLE_MAINTENANCE_THREAD=0``
+    izslēdz, piemēram, ja to izpilda ``cron`` ar ``scripts/article_partitions.py --archive --vacuum``.
+    """
+    if app.config.get("TESTING"):
+        return
+    start_user_journal_compaction()
+    if ARTICLE_MAINTENANCE_THREAD:
+        start_article_maintenance()
+
+
 if __name__ == "__main__":
     ensure_seed_data()
+    start_article_maintenance()
+    start_user_journal_compaction()
     app.run(debug=os.environ.get("FLASK_ENV") == "development")
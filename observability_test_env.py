@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict, deque
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
@@ -66,26 +68,66 @@ class AuthGuard:
 
 @dataclass
 class IpRateLimiter:
-    """In-memory IP rate limiter simulation for security tests."""
+    """Sliding-window IP rate limiter used by the security simulations and by app.py.
+
+    Each IP keeps a deque of accepted attempts inside the window, so ``allow``
+    is amortised O(1). IPs are kept in least-recently-seen order: idle ones are
+    swept from the front every ``sweep_interval`` calls, and the oldest are
+    evicted once more than ``max_keys`` IPs are tracked.
+    """
 
     max_attempts: int = 5
     window_seconds: int = 10
-    attempts: dict[str, list[datetime]] | None = None
+    max_keys: int = 100_000
+    sweep_interval: int = 1024
+    attempts: "OrderedDict[str, deque[datetime]] | None" = None
 
     def __post_init__(self) -> None:
-        self.attempts = self.attempts or {}
+        self.attempts = OrderedDict((ip, deque(stamps)) for ip, stamps in (self.attempts or {}).items())
+        self._window = timedelta(seconds=self.window_seconds)
+        self._calls = 0
+        self._lock = threading.Lock()
 
     def allow(self, ip: str, now: datetime) -> bool:
-        history = self.attempts.get(ip, [])
-        window_start = now - timedelta(seconds=self.window_seconds)
-        fresh_history = [stamp for stamp in history if stamp >= window_start]
-
-        allowed = len(fresh_history) < self.max_attempts
-        if allowed:
-            fresh_history.append(now)
-
-        self.attempts[ip] = fresh_history
-        return allowed
+        window_start = now - self._window
+        with self._lock:
+            self._calls += 1
+            if self._calls % self.sweep_interval == 0:
+                self._sweep(window_start)
+
+            history = self.attempts.get(ip)
+            if history is None:
+                history = self.attempts[ip] = deque()
+                while len(self.attempts) > self.max_keys:
+                    self.attempts.popitem(last=False)
+            else:
+                self.attempts.move_to_end(ip)
+
+            while history and history[0] < window_start:
+                history.popleft()
+            allowed = len(history) < self.max_attempts
+            if allowed:
+                history.append(now)
+            return allowed
+
+    def sweep(self, now: datetime) -> int:
+        """Drop IPs with no attempts left in the window; returns how many were removed."""
+        with self._lock:
+            return self._sweep(now - self._window)
+
+    def _sweep(self, window_start: datetime) -> int:
+        removed = 0
+        while self.attempts:
+            ip, history = next(iter(self.attempts.items()))
+            if history and history[-1] >= window_start:
+                break
+            del self.attempts[ip]
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self.attempts.clear()
 
 
 def generate_sample_events(now: datetime | None = None) -> list[DataEvent]:
@@ -0,0 +1,60 @@
+"""Rakstu partīciju (karstā tabula + mēneša arhīvi) pārskats un apkope.
+
+Lietošana:
+    python scripts/article_partitions.py                  # partīciju izmēri
+    python scripts/article_partitions.py --archive        # pārvietot vecos rakstus uz arhīvu
+    python scripts/article_partitions.py --vacuum         # PRAGMA incremental_vacuum
+    python scripts/article_partitions.py --enable-incremental-vacuum  # vienreizējs pilns VACUUM
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import app  # noqa: E402
+
+
+def format_bytes(value: int | None) -> str:
+    if value is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return str(value)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--archive", action="store_true", help="arhivēt rakstus, kas vecāki par ARTICLE_RETENTION_DAYS")
+    parser.add_argument("--vacuum", action="store_true", help="atbrīvot brīvās lapas ar incremental_vacuum")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true", help="pārslēgt esošu DB uz auto_vacuum=INCREMENTAL")
+    args = parser.parse_args()
+
+    app.init_db()
+    if args.enable_incremental_vacuum:
+        changed = app.enable_incremental_vacuum()
+        print("auto_vacuum=INCREMENTAL ieslēgts." if changed else "auto_vacuum=INCREMENTAL jau bija ieslēgts.")
+    if args.archive:
+        moved = app.archive_old_articles()
+        print(f"Arhivēti raksti: {sum(moved.values())} {moved or ''}")
+    if args.vacuum:
+        print(f"Atlikušās brīvās lapas: {app.incremental_vacuum()}")
+
+    print(f"{'Tabula':26} {'Rindas':>8} {'Tabula':>10} {'Indeksi':>10}  Periods")
+    for partition in app.describe_article_partitions():
+        period = f"{(partition['oldest'] or '')[:10]} … {(partition['newest'] or '')[:10]}"
+        print(
+            f"{partition['table']:26} {partition['rows']:>8} "
+            f"{format_bytes(partition['table_bytes']):>10} {format_bytes(partition['index_bytes']):>10}  {period}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
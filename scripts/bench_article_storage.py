@@ -0,0 +1,231 @@
+"""Rakstu glabāšanas salīdzinājums: teksta lauki pret kompakto formu.
+
+Lietošana:
+    python scripts/bench_article_storage.py [--articles 1000000] [--runs 50]
+
+Skripts izveido divas pagaidu datubāzes ar vienādiem sintētiskiem rakstiem:
+vecā forma (ISO laiks, avota/tēmas nosaukumi katrā rindā, UNIQUE uz pilno URL)
+un pašreizējā (``published_ts`` sekundēs, ``sources``/``topics`` vārdnīcas,
+unikāls 64 bitu URL nospiedums). Atskaitē ir faila izmērs, tabulu/indeksu
+izmērs (no ``dbstat``) un tipisko vaicājumu mediānais laiks.
+"""
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import app  # noqa: E402
+
+SOURCES = ["LSM", "Delfi", "TVNET", "BBC", "Reuters", "NPR", "The Guardian", "Al Jazeera"]
+TOPICS = ["Politika", "Ekonomika", "Sports", "Tehnoloģijas", "Kultūra", "Veselība", "Cits"]
+BATCH = 20_000
+
+LEGACY_SCHEMA = [
+    """
+    CREATE TABLE articles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        summary TEXT,
+        source TEXT NOT NULL,
+        published_at TEXT NOT NULL,
+        url TEXT UNIQUE NOT NULL,
+        topic TEXT,
+        location TEXT,
+        image_url TEXT
+    )
+    """,
+    "CREATE INDEX idx_articles_published ON articles(published_at DESC, id DESC)",
+    "CREATE INDEX idx_articles_source ON articles(source, published_at DESC, id DESC)",
+    "CREATE INDEX idx_articles_topic ON articles(topic, published_at DESC, id DESC)",
+]
+
+LEGACY_QUERIES = {
+    "feed page": (
+        "SELECT * FROM articles ORDER BY published_at DESC, id DESC LIMIT 31",
+        lambda now: (),
+    ),
+    "source page": (
+        "SELECT * FROM articles WHERE source = ? ORDER BY published_at DESC, id DESC LIMIT 31",
+        lambda now: ("BBC",),
+    ),
+    "last 7 days count": (
+        "SELECT COUNT(*) FROM articles WHERE published_at >= ?",
+        lambda now: ((now - timedelta(days=7)).isoformat(),),
+    ),
+    "url lookup": (
+        "SELECT 1 FROM articles WHERE url = ?",
+        lambda now: ("https://example.com/news/2024/article-123456-some-longer-slug-for-realism",),
+    ),
+}
+
+COMPACT_QUERIES = {
+    "feed page": (
+        f"SELECT {app.ARTICLE_COLUMNS} FROM article_feed ORDER BY published_ts DESC, id DESC LIMIT 31",
+        lambda now: (),
+    ),
+    "source page": (
+        f"SELECT {app.ARTICLE_COLUMNS} FROM article_feed "
+        "WHERE source_id = (SELECT id FROM sources WHERE name = ?) ORDER BY published_ts DESC, id DESC LIMIT 31",
+        lambda now: ("BBC",),
+    ),
+    "last 7 days count": (
+        "SELECT COUNT(*) FROM articles WHERE published_ts >= ?",
+        lambda now: (app.to_epoch(now - timedelta(days=7)),),
+    ),
+    "url lookup": (
+        "SELECT 1 FROM articles WHERE url_fp = ?",
+        lambda now: (app.url_fingerprint("https://example.com/news/2024/article-123456-some-longer-slug-for-realism"),),
+    ),
+}
+
+
+def synthetic_rows(count: int, now: datetime):
+    for number in range(count):
+        yield (
+            f"Raksts {number}: sintētisks virsraksts ar vidēju garumu",
+            "Kopsavilkums " * 12,
+            SOURCES[number % len(SOURCES)],
+            now - timedelta(seconds=number * 30),
+            f"https://example.com/news/2024/article-{number}-some-longer-slug-for-realism",
+            TOPICS[number % len(TOPICS)],
+        )
+
+
+def seed_legacy(conn: sqlite3.Connection, count: int, now: datetime) -> None:
+    for statement in LEGACY_SCHEMA:
+        conn.execute(statement)
+    rows = synthetic_rows(count, now)
+    while True:
+        batch = [
+            (title, summary, source, published.isoformat(), url, topic)
+            for title, summary, source, published, url, topic in _take(rows, BATCH)
+        ]
+        if not batch:
+            break
+        conn.executemany(
+            "INSERT INTO articles (title, summary, source, published_at, url, topic) VALUES (?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+    conn.commit()
+
+
+def seed_compact(conn: sqlite3.Connection, count: int, now: datetime) -> None:
+    app.init_article_storage(conn)
+    source_ids = {name: app.lookup_id(conn, "sources", name) for name in SOURCES}
+    topic_ids = {name: app.lookup_id(conn, "topics", name) for name in TOPICS}
+    rows = synthetic_rows(count, now)
+    while True:
+        batch = [
+            (
+                title,
+                summary,
+                source_ids[source],
+                topic_ids[topic],
+                app.to_epoch(published),
+                url,
+                app.url_fingerprint(url),
+            )
+            for title, summary, source, published, url, topic in _take(rows, BATCH)
+        ]
+        if not batch:
+            break
+        conn.executemany(
+            """
+            INSERT INTO articles (title, summary, source_id, topic_id, published_ts, url, url_fp)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            batch,
+        )
+    conn.commit()
+
+
+def _take(iterator, size: int) -> list:
+    batch = []
+    for item in iterator:
+        batch.append(item)
+        if len(batch) == size:
+            break
+    return batch
+
+
+def sizes(conn: sqlite3.Connection, path: Path) -> dict[str, int]:
+    rows = conn.execute(
+        """
+        SELECT m.type AS kind, SUM(d.pgsize) AS size
+        FROM dbstat d JOIN sqlite_master m ON m.name = d.name
+        WHERE m.tbl_name = 'articles'
+        GROUP BY m.type
+        """
+    ).fetchall()
+    by_kind = {row["kind"]: int(row["size"]) for row in rows}
+    # UNIQUE ierobežojuma automātiskais indekss sqlite_master ir ar type = 'index'.
+    return {"file": path.stat().st_size, "table": by_kind.get("table", 0), "indexes": by_kind.get("index", 0)}
+
+
+def measure(conn: sqlite3.Connection, sql: str, params: tuple, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for label, seed, queries in (
+            ("legacy", seed_legacy, LEGACY_QUERIES),
+            ("compact", seed_compact, COMPACT_QUERIES),
+        ):
+            path = Path(temp_dir) / f"{label}.db"
+            conn = sqlite3.connect(path)
+            conn.row_factory = sqlite3.Row
+            started = time.perf_counter()
+            seed(conn, args.articles, now)
+            load_seconds = time.perf_counter() - started
+            conn.execute("VACUUM")
+            conn.execute("ANALYZE")
+            results[label] = {
+                "load": load_seconds,
+                **sizes(conn, path),
+                **{name: measure(conn, sql, make_params(now), args.runs) for name, (sql, make_params) in queries.items()},
+            }
+            conn.close()
+
+    print(f"Raksti: {args.articles}, atkārtojumi: {args.runs}")
+    print(f"{'':20} {'legacy':>14} {'compact':>14} {'attiecība':>10}")
+    for key, unit, scale in (
+        ("file", "MB", 1 / 1_048_576),
+        ("table", "MB", 1 / 1_048_576),
+        ("indexes", "MB", 1 / 1_048_576),
+        ("load", "s", 1),
+        ("feed page", "ms", 1),
+        ("source page", "ms", 1),
+        ("last 7 days count", "ms", 1),
+        ("url lookup", "ms", 1),
+    ):
+        legacy, compact = results["legacy"][key], results["compact"][key]
+        ratio = compact / legacy if legacy else 0.0
+        print(f"{key:20} {legacy * scale:11.3f} {unit:2} {compact * scale:11.3f} {unit:2} {ratio:9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,92 @@
+"""Karstā loga indeksa (``HotArticleIndex``) salīdzinājums ar SQLite vaicājumiem.
+
+Lietošana:
+    python scripts/bench_hot_index.py [--articles 100000] [--runs 200]
+
+Skripts izveido pagaidu datubāzi (raksti vienmērīgi pa 60 dienām) un mēra
+kopīgās ziņu lapas vaicājumu (bez lietotāja filtriem, bez rezultātu keša)
+ar ieslēgtu un izslēgtu karsto indeksu.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import app  # noqa: E402
+
+SOURCES = ["LSM", "Delfi", "TVNET", "BBC", "Reuters", "NPR"]
+TOPICS = ["Politika", "Ekonomika", "Sports", "Tehnoloģijas", "Kultūra"]
+WORDS = ["valdība", "budžets", "hokejs", "mākslīgais", "intelekts", "koncerts", "vēlēšanas", "Rīga"]
+CASES = {
+    "pirmā lapa": ("", None, None),
+    "24h": ("", 1, None),
+    "avots": ("", None, "BBC"),
+    "meklēšana": ("budžets", 7, None),
+}
+
+
+def seed(count: int) -> None:
+    now = datetime.now(timezone.utc)
+    step = timedelta(days=60) / count
+    with app.get_db() as conn:
+        for number in range(count):
+            app.insert_article(
+                conn,
+                f"{WORDS[number % len(WORDS)]} {WORDS[(number * 7) % len(WORDS)]} {number}",
+                " ".join(WORDS[(number + offset) % len(WORDS)] for offset in range(12)),
+                SOURCES[number % len(SOURCES)],
+                now - step * number,
+                f"https://example.com/{number}",
+                TOPICS[number % len(TOPICS)],
+            )
+
+
+def measure(runs: int, query: str, days, source) -> float:
+    timings = []
+    with app.get_db() as conn:
+        for _ in range(runs):
+            started = time.perf_counter()
+            app.query_article_page(conn, None, query, days, source, None, app.PAGE_SIZE)
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        app.DB_PATH = str(Path(temp_dir) / "bench.db")
+        app.init_db()
+        seed(args.articles)
+        with app.get_db() as conn:
+            started = time.perf_counter()
+            index = app.get_hot_index(conn)
+            build_ms = (time.perf_counter() - started) * 1000
+        print(
+            f"Raksti: {args.articles}, indeksā: {len(index.ids)} ({app.HOT_INDEX_DAYS} d), "
+            f"vārdi: {len(index.postings)}, būvēšana: {build_ms:.0f} ms"
+        )
+        print(f"{'':12} {'SQLite':>10} {'indekss':>10}")
+        for label, (query, days, source) in CASES.items():
+            with patch("app.HOT_INDEX_DAYS", 0):
+                sqlite_ms = measure(args.runs, query, days, source)
+            index_ms = measure(args.runs, query, days, source)
+            print(f"{label:12} {sqlite_ms:8.3f} ms {index_ms:8.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
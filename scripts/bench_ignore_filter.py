@@ -0,0 +1,118 @@
+"""Ignorēto rakstu filtrēšanas salīdzinājums: ``NOT IN (?, …)`` pret ``NOT EXISTS``.
+
+Lietošana:
+    python scripts/bench_ignore_filter.py [--articles 50000] [--ignored 10000] [--runs 20]
+
+Skripts izveido pagaidu datubāzi, lietotāju ar daudziem ignorētiem rakstiem un
+mēra vienas ziņu lapas ielādi ar veco (ID saraksts Python pusē) un jauno
+(anti-join SQL pusē) pieeju.
+"""
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import app  # noqa: E402
+
+SOURCES = ["LSM", "Delfi", "TVNET", "BBC", "Reuters", "NPR"]
+
+
+def seed(article_count: int, ignored_count: int) -> int:
+    now = datetime.now(timezone.utc)
+    with app.get_db() as conn:
+        for number in range(article_count):
+            app.insert_article(
+                conn,
+                f"Raksts {number}",
+                "Kopsavilkums",
+                SOURCES[number % len(SOURCES)],
+                now - timedelta(minutes=number),
+                f"https://example.com/{number}",
+                "Cits",
+            )
+        user_id = int(
+            conn.execute(
+                "INSERT INTO users (email, display_name, created_at) VALUES (?, ?, ?)",
+                ("bench@example.com", "Bench", now.isoformat()),
+            ).lastrowid
+        )
+        conn.executemany(
+            "INSERT INTO ignored_articles (user_id, article_id) VALUES (?, ?)",
+            ((user_id, article_id) for article_id in range(1, ignored_count * 2, 2)),
+        )
+        conn.executemany(
+            "INSERT INTO ignored_sources (user_id, source) VALUES (?, ?)",
+            ((user_id, source) for source in SOURCES[:2]),
+        )
+    return user_id
+
+
+def legacy_fetch(user_id: int) -> list[sqlite3.Row]:
+    """Iepriekšējā pieeja: trīs savienojumi un ID saraksts kā bind parametri."""
+    with app.get_db() as conn:
+        ignored_sources = [row[0] for row in conn.execute("SELECT source FROM ignored_sources WHERE user_id = ?", (user_id,))]
+    with app.get_db() as conn:
+        ignored_articles = [row[0] for row in conn.execute("SELECT article_id FROM ignored_articles WHERE user_id = ?", (user_id,))]
+    source_placeholders = ",".join("?" for _ in ignored_sources)
+    article_placeholders = ",".join("?" for _ in ignored_articles)
+    with app.get_db() as conn:
+        return conn.execute(
+            f"""
+            SELECT {app.ARTICLE_COLUMNS}
+            FROM article_feed
+            WHERE source NOT IN ({source_placeholders}) AND id NOT IN ({article_placeholders})
+            ORDER BY published_ts DESC, id DESC
+            LIMIT ?
+            """,
+            [*ignored_sources, *ignored_articles, app.PAGE_SIZE + 1],
+        ).fetchall()
+
+
+def measure(label: str, runs: int, func) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    median = statistics.median(timings)
+    print(f"{label:12} median {median:8.2f} ms   p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:8.2f} ms")
+    return median
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=50_000)
+    parser.add_argument("--ignored", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        app.DB_PATH = str(Path(temp_dir) / "bench.db")
+        app.init_db()
+        user_id = seed(args.articles, args.ignored)
+        print(f"Raksti: {args.articles}, ignorēti raksti: {args.ignored}, ignorēti avoti: 2")
+
+        legacy_ids = [row["id"] for row in legacy_fetch(user_id)]
+        current_ids = [row["id"] for row in app.fetch_articles(user_id, "", None, None, limit=app.PAGE_SIZE)[0]]
+        if legacy_ids[: app.PAGE_SIZE] != current_ids:
+            print("Rezultāti nesakrīt!")
+            return 1
+
+        legacy = measure("NOT IN", args.runs, lambda: legacy_fetch(user_id))
+        current = measure("NOT EXISTS", args.runs, lambda: app.fetch_articles(user_id, "", None, None))
+        print(f"Paātrinājums: {legacy / current:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,140 @@
+"""Pieteikšanās viļņa mērījums: paroļu jaukšana pieprasījuma pavedienā pret ierobežotu kopu.
+
+Lietošana:
+    python scripts/bench_password_hashing.py [--clients 64] [--logins 4] [--workers 2] [--queue 8]
+
+Skripts izveido pagaidu lietotāju glabātuvi un ``--clients`` pavedienos
+vienlaikus izpilda ``authenticate``. Režīmā ``inline`` jaukšana notiek katrā
+pavedienā bez ierobežojuma (iepriekšējā uzvedība), režīmā ``bounded`` — caur
+``PasswordHasher`` ar ``--workers``/``--queue``; noraidītie mēģinājumi ir ātrās
+"mēģini vēlreiz" atbildes. Paralēli tiek mērīts vienkāršas lapas (neliels
+SQLite vaicājums) laiks, lai redzētu, cik ļoti vilnis bremzē pārējos.
+"""
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import app  # noqa: E402
+
+PASSWORD = "bench-password-123"
+
+
+class InlineHasher:
+    """Iepriekšējā uzvedība: jaukšana izsaucēja pavedienā bez ierobežojuma."""
+
+    def run(self, func, *args):
+        return func(*args)
+
+
+def percentile(values: list[float], share: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def run_burst(store: app.SecureUserStore, users: int, clients: int, logins: int, page_db: str) -> dict:
+    login_ms: list[float] = []
+    rejected_ms: list[float] = []
+    page_ms: list[float] = []
+    lock = threading.Lock()
+    stop = threading.Event()
+    barrier = threading.Barrier(clients + 1)
+
+    def client(number: int) -> None:
+        barrier.wait()
+        for attempt in range(logins):
+            email = f"user{(number + attempt) % users}@example.com"
+            started = time.perf_counter()
+            try:
+                ok = store.authenticate(email, PASSWORD) is not None
+            except app.PasswordHashingBusy:
+                with lock:
+                    rejected_ms.append((time.perf_counter() - started) * 1000)
+                continue
+            with lock:
+                if ok:
+                    login_ms.append((time.perf_counter() - started) * 1000)
+
+    def page_views() -> None:
+        conn = sqlite3.connect(page_db)
+        while not stop.is_set():
+            started = time.perf_counter()
+            conn.execute("SELECT COUNT(*) FROM pages").fetchone()
+            page_ms.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.005)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(clients)]
+    pages = threading.Thread(target=page_views)
+    for thread in threads:
+        thread.start()
+    pages.start()
+    started = time.perf_counter()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    pages.join()
+    return {
+        "ok": len(login_ms),
+        "rejected": len(rejected_ms),
+        "throughput": len(login_ms) / elapsed,
+        "login_p50": percentile(login_ms, 0.5),
+        "login_p99": percentile(login_ms, 0.99),
+        "rejected_p99": percentile(rejected_ms, 0.99),
+        "page_p99": percentile(page_ms, 0.99),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--logins", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=app.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--queue", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = app.SecureUserStore(str(Path(temp_dir) / "users.enc"), str(Path(temp_dir) / "users.key"))
+        for number in range(args.users):
+            store.create_user(f"user{number}@example.com", f"Lietotājs {number}", PASSWORD)
+        page_db = str(Path(temp_dir) / "pages.db")
+        with sqlite3.connect(page_db) as conn:
+            conn.execute("CREATE TABLE pages (id INTEGER PRIMARY KEY)")
+            conn.executemany("INSERT INTO pages (id) VALUES (?)", ((number,) for number in range(1000)))
+
+        print(
+            f"Lietotāji: {args.users}, klienti: {args.clients} x {args.logins}, "
+            f"parametri: {app.PASSWORD_HASH_PARAMS}, pavedieni: {args.workers}, rinda: {args.queue}"
+        )
+        print(f"{'režīms':8} {'ok':>5} {'noraid.':>7} {'login/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'noraid. p99':>11} {'lapa p99':>9}")
+        for label, hasher in (
+            ("inline", InlineHasher()),
+            ("bounded", app.PasswordHasher(workers=args.workers, queue_limit=args.queue)),
+        ):
+            with patch.object(app, "password_hasher", hasher):
+                result = run_burst(store, args.users, args.clients, args.logins, page_db)
+            print(
+                f"{label:8} {result['ok']:5} {result['rejected']:7} {result['throughput']:8.1f} "
+                f"{result['login_p50']:8.1f} {result['login_p99']:8.1f} {result['rejected_p99']:11.2f} {result['page_p99']:9.2f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+"""IP ierobežotāja salīdzinājums: sarakstu filtrēšana pret slīdošo logu ar ``deque``.
+
+Lietošana:
+    python scripts/bench_rate_limiter.py [--ips 100000] [--hits 3] [--hot-hits 20000]
+
+Simulē "credential stuffing" vilni: ``--ips`` dažādas adreses, katra pa
+``--hits`` mēģinājumiem, kas izkliedēti ilgākā laikā par logu, un vienu
+"karsto" adresi ar ``--hot-hits`` mēģinājumiem. Atskaitē ir mēģinājuma
+vidējais laiks, izsekoto adrešu skaits beigās un atmiņas maksimums
+(``tracemalloc``).
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from observability_test_env import IpRateLimiter  # noqa: E402
+
+
+class LegacyIpRateLimiter:
+    """Iepriekšējā ``IpRateLimiter.allow``: saraksts tiek filtrēts katrā izsaukumā, adreses netiek dzēstas."""
+
+    def __init__(self, max_attempts: int, window_seconds: int) -> None:
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self.attempts: dict[str, list[datetime]] = {}
+
+    def allow(self, ip: str, now: datetime) -> bool:
+        history = self.attempts.get(ip, [])
+        window_start = now - timedelta(seconds=self.window_seconds)
+        fresh_history = [stamp for stamp in history if stamp >= window_start]
+        allowed = len(fresh_history) < self.max_attempts
+        if allowed:
+            fresh_history.append(now)
+        self.attempts[ip] = fresh_history
+        return allowed
+
+
+def workload(ips: int, hits: int, hot_hits: int, window_seconds: int):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # Adreses nāk viena pēc otras; viss vilnis aizņem ~10 logus.
+    step = timedelta(seconds=window_seconds * 10 / (ips * hits))
+    now = start
+    for number in range(ips):
+        ip = f"10.{number >> 16 & 255}.{number >> 8 & 255}.{number & 255}"
+        for _ in range(hits):
+            now += step
+            yield ip, now
+    for _ in range(hot_hits):
+        now += timedelta(milliseconds=1)
+        yield "203.0.113.10", now
+
+
+def measure(limiter, events: list) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    for ip, now in events:
+        limiter.allow(ip, now)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"per_call_us": elapsed / len(events) * 1_000_000, "keys": len(limiter.attempts), "peak_mb": peak / 1_048_576}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ips", type=int, default=100_000)
+    parser.add_argument("--hits", type=int, default=3)
+    parser.add_argument("--hot-hits", type=int, default=20_000)
+    parser.add_argument("--max-attempts", type=int, default=600)
+    parser.add_argument("--window", type=int, default=60)
+    parser.add_argument("--max-keys", type=int, default=50_000)
+    args = parser.parse_args()
+
+    events = list(workload(args.ips, args.hits, args.hot_hits, args.window))
+    print(f"Adreses: {args.ips}, mēģinājumi: {len(events)}, limits: {args.max_attempts}/{args.window} s")
+    print(f"{'':10} {'µs/mēģ.':>9} {'adreses':>9} {'atmiņa MB':>10}")
+    for label, limiter in (
+        ("legacy", LegacyIpRateLimiter(args.max_attempts, args.window)),
+        ("deque", IpRateLimiter(max_attempts=args.max_attempts, window_seconds=args.window, max_keys=args.max_keys)),
+    ):
+        result = measure(limiter, events)
+        print(f"{label:10} {result['per_call_us']:9.2f} {result['keys']:9} {result['peak_mb']:10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,130 @@
+"""Lietotāju glabātuves salīdzinājums: viens šifrēts fails pret šifrētām rindām.
+
+Lietošana:
+    python scripts/bench_user_store.py [--users 10000 100000] [--runs 20]
+
+Vecā forma katrai darbībai atšifrē, parsē, serializē un šifrē visu lietotāju
+failu; pašreizējā ``SecureUserStore`` atšifrē un pārraksta tikai vienu rindu.
+Paroles jaucējfunkcija (PBKDF2) abās pusēs ir vienāda, tāpēc mērījumā netiek
+iekļauta: lietotāji tiek ielādēti ar gataviem ierakstiem, un mēra darbības
+ierakstu (žurnāla pievienojums) un ieraksta nolasīšanu pēc e-pasta pēc žurnāla
+sapludināšanas.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import app  # noqa: E402
+
+
+def synthetic_users(store: app.SecureUserStore, count: int) -> dict[str, dict]:
+    salt = "c2FsdHNhbHRzYWx0c2FsdA=="
+    users = {}
+    for number in range(count):
+        email = f"user{number}@example.com"
+        activity = store._empty_activity()
+        activity["viewed_article_ids"] = list(range(number % 50))
+        users[email] = {
+            "email": email,
+            "display_name": f"Lietotājs {number}",
+            "salt": salt,
+            "password_hash": "x" * 44,
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "last_login_at": None,
+            "activity": activity,
+        }
+    return users
+
+
+def legacy_record_activity(store: app.SecureUserStore, path: str, email: str, article_id: int) -> None:
+    """Iepriekšējā pieeja: viss fails tiek atšifrēts un pārrakstīts."""
+    with open(path, "rb") as file:
+        users = json.loads(store.fernet.decrypt(file.read()).decode("utf-8"))
+    viewed = users[email]["activity"]["viewed_article_ids"]
+    if article_id not in viewed:
+        viewed.append(article_id)
+    with open(path, "wb") as file:
+        file.write(store.fernet.encrypt(json.dumps(users, ensure_ascii=False, indent=2).encode("utf-8")))
+
+
+def legacy_lookup(store: app.SecureUserStore, path: str, email: str) -> dict:
+    with open(path, "rb") as file:
+        return json.loads(store.fernet.decrypt(file.read()).decode("utf-8"))[email]
+
+
+def current_lookup(store: app.SecureUserStore, email: str) -> dict:
+    conn = store._connect()
+    try:
+        return store._get(conn, email)
+    finally:
+        conn.close()
+
+
+def measure(runs: int, func) -> float:
+    timings = []
+    for run in range(runs):
+        started = time.perf_counter()
+        func(run)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'lietotāji':>10} {'darbība':16} {'viens fails':>14} {'rindas':>12} {'attiecība':>10}")
+    for count in args.users:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            legacy_path = os.path.join(temp_dir, "legacy.enc")
+            key_path = os.path.join(temp_dir, "users.key")
+            store = app.SecureUserStore(os.path.join(temp_dir, "users.enc"), key_path)
+            users = synthetic_users(store, count)
+            with open(legacy_path, "wb") as file:
+                file.write(store.fernet.encrypt(json.dumps(users, ensure_ascii=False, indent=2).encode("utf-8")))
+            # Pašreizējā forma tiek aizpildīta caur vienreizējo migrāciju.
+            with open(store.data_file, "wb") as file:
+                file.write(store.fernet.encrypt(json.dumps(users, ensure_ascii=False).encode("utf-8")))
+            started = time.perf_counter()
+            store._connect().close()
+            migration_seconds = time.perf_counter() - started
+
+            email = f"user{count // 2}@example.com"
+            rows = {
+                "record_activity": (
+                    measure(args.runs, lambda run: legacy_record_activity(store, legacy_path, email, 10_000 + run)),
+                    measure(args.runs, lambda run: store.record_activity(email, "view_article", 10_000 + run)),
+                ),
+                "compact": (
+                    0.0,
+                    measure(1, lambda run: store.compact_activity_journal()),
+                ),
+                "lookup": (
+                    measure(args.runs, lambda run: legacy_lookup(store, legacy_path, email)),
+                    measure(args.runs, lambda run: current_lookup(store, email)),
+                ),
+            }
+            for name, (legacy, current) in rows.items():
+                if not legacy:
+                    print(f"{count:>10} {name:16} {'':>14} {current:9.2f} ms")
+                    continue
+                print(f"{count:>10} {name:16} {legacy:11.2f} ms {current:9.2f} ms {legacy / current:9.0f}x")
+            print(f"{count:>10} {'migrācija':16} {'':>14} {migration_seconds:10.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
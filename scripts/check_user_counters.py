@@ -0,0 +1,36 @@
+"""Profila skaitītāju (``user_counters``) konsekvences pārbaude.
+
+Lietošana:
+    python scripts/check_user_counters.py           # tikai parāda novirzes
+    python scripts/check_user_counters.py --repair  # novirzes arī izlabo
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import check_user_counters, init_db  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repair", action="store_true", help="pārrakstīt novirzes ar faktiskajām vērtībām")
+    args = parser.parse_args()
+
+    init_db()
+    drift = check_user_counters(repair=args.repair)
+    for user_id, differences in drift.items():
+        details = ", ".join(f"{column}: {stored} -> {actual}" for column, (stored, actual) in differences.items())
+        print(f"user_id={user_id}: {details}")
+    print("-" * 80)
+    print(f"Lietotāji ar novirzēm: {len(drift)}" + (" (izlabots)" if args.repair and drift else ""))
+    return 0 if args.repair or not drift else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,34 @@
+"""Pārrēķina tēmu sānjoslas rollup tabulu ``topic_buckets`` no ``articles``.
+
+Lietošana:
+    python scripts/rebuild_topic_buckets.py
+
+Parasti nav vajadzīgs: tabulu uztur trigeri. Noder pēc datu labošanas ar
+ārējiem rīkiem vai ja trigeri uz laiku bija atslēgti.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import get_db, init_db, rebuild_topic_buckets  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    init_db()
+    with get_db() as conn:
+        rows = rebuild_topic_buckets(conn)
+    print(f"topic_buckets rindas: {rows}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
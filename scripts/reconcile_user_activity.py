@@ -0,0 +1,49 @@
+"""Lietotāju darbību salīdzināšana: SQLite tabulas pret šifrēto glabātuvi.
+
+Lietošana:
+    python scripts/reconcile_user_activity.py [--fix]
+
+SQLite (``saved_articles``, ``ignored_articles``, ``ignored_sources``,
+``viewed_articles``) ir noteicošais avots. Skripts izdrukā katru kolekciju, kur
+``users_secure.db`` ieraksts atšķiras, un ar ``--fix`` pievieno glabātuves
+žurnālam trūkstošos notikumus. Bez ``--fix`` izejas kods ir 1, ja ir neatbilstības.
+
+``--fix`` jāizpilda, kad serveris ir apturēts: skripts nevar iztukšot servera
+procesu ``ActivityBuffer``, un tur gaidošie notikumi var nonākt glabātuvē pēc
+labojuma. Pārbaude bez ``--fix`` strādājošam serverim var uzrādīt īslaicīgas
+neatbilstības ``trūkst`` kolonnā (notikumi, kas vēl ir buferī).
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import app  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fix", action="store_true", help="pievienot trūkstošos notikumus glabātuvei")
+    args = parser.parse_args()
+
+    app.init_db()
+    mismatches = app.reconcile_user_activity(fix=args.fix)
+    for item in mismatches:
+        print(f"{item['email']:32} {item['collection']:28} trūkst {len(item['missing']):5}  lieki {len(item['extra']):5}")
+    if not mismatches:
+        print("Neatbilstību nav.")
+        return 0
+    if args.fix:
+        print(f"Izlabotas kolekcijas: {len(mismatches)}")
+        return 0
+    print(f"Neatbilstības: {len(mismatches)} (labošanai: --fix)")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,53 @@
+"""Avotu reģistra pārvaldība bez koda izmaiņām.
+
+Lietošana:
+    python scripts/sources.py list
+    python scripts/sources.py add "Nosaukums" https://example.com/rss [https://example.com/rss2 ...]
+    python scripts/sources.py disable "Nosaukums"
+    python scripts/sources.py enable "Nosaukums"
+
+Izmaiņas stājas spēkā nākamajā ielādē; filtra saraksts citos procesos
+atjaunojas pēc ``SOURCES_CACHE_TTL_SECONDS``. ``disable`` aptur tikai ielādi —
+jau ielādētie avota raksti paliek plūsmā un filtrā.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import init_db, list_source_registry, register_source, set_source_enabled  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="parādīt visus avotus")
+    add = commands.add_parser("add", help="pievienot vai atjaunot avotu")
+    add.add_argument("name")
+    add.add_argument("feed_urls", nargs="+")
+    for command in ("enable", "disable"):
+        commands.add_parser(command, help=f"{command} avotu").add_argument("name")
+    args = parser.parse_args()
+
+    init_db()
+    if args.command == "add":
+        register_source(args.name, args.feed_urls)
+    elif args.command in ("enable", "disable"):
+        if not set_source_enabled(args.name, args.command == "enable"):
+            print(f"Avots nav atrasts: {args.name}")
+            return 1
+
+    for row in list_source_registry():
+        status = "ieslēgts" if row["enabled"] else "atslēgts"
+        origin = "reģistrs" if row["feed_urls"] else "kods"
+        print(f"{row['name']:20} {status:9} {origin:8} raksti={row['article_count']:<6} pēdējo reizi={row['last_seen_at'] or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
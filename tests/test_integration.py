@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import json
 import sqlite3
+import subprocess
+import sys
 import tempfile
+import time
 import unittest
 from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
@@ -27,12 +31,12 @@ class IntegrationTests(unittest.TestCase):
         news_app.user_store = news_app.SecureUserStore(news_app.USERS_DATA_FILE, news_app.USERS_KEY_FILE)
 
         news_app.app.config.update(TESTING=True, SECRET_KEY="test-secret")
-        news_app.LOGIN_ATTEMPTS.clear()
-        news_app.LOGIN_LOCKED_UNTIL.clear()
         news_app.init_db()
+        news_app.reset_process_caches()
         self.client = news_app.app.test_client()
 
     def tearDown(self) -> None:
+        news_app.activity_buffer.flush()
         news_app.DB_PATH = self.original_db_path
         news_app.USERS_DATA_FILE = self.original_users_data_file
         news_app.USERS_KEY_FILE = self.original_users_key_file
@@ -56,16 +60,18 @@ class IntegrationTests(unittest.TestCase):
             session["preferred_theme"] = "light"
         return user_id
 
-    def _seed_article(self, title: str, source: str, url: str, summary: str = "Summary") -> int:
+    def _seed_article(
+        self,
+        title: str,
+        source: str,
+        url: str,
+        summary: str = "Summary",
+        published_at: datetime | None = None,
+        topic: str = "AI",
+    ) -> int:
+        published_at = published_at or datetime.now(timezone.utc)
         with self._db() as conn:
-            cursor = conn.execute(
-                """
-                INSERT INTO articles (title, summary, source, published_at, url, topic, location, image_url)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (title, summary, source, datetime.now(timezone.utc).isoformat(), url, "AI", None, None),
-            )
-            return int(cursor.lastrowid)
+            return news_app.insert_article(conn, title, summary, source, published_at, url, topic)
 
     def test_index_redirects_to_login_when_not_authenticated(self) -> None:
         response = self.client.get("/")
@@ -204,7 +210,11 @@ class IntegrationTests(unittest.TestCase):
         with self.client.session_transaction() as session:
             self.assertNotIn("user_email", session)
 
-        news_app.LOGIN_LOCKED_UNTIL[email] = datetime.now(timezone.utc) - timedelta(seconds=1)
+        with self._db() as conn:
+            conn.execute(
+                "UPDATE login_throttle SET locked_until = ? WHERE key = ?",
+                (int(datetime.now(timezone.utc).timestamp()) - 1, news_app.login_throttle.key("email", email)),
+            )
         success_response = self.client.post(
             "/login",
             data={"email": email, "password": "strongpass1"},
@@ -245,6 +255,46 @@ class IntegrationTests(unittest.TestCase):
             count = conn.execute("SELECT COUNT(*) AS c FROM articles").fetchone()["c"]
         self.assertEqual(int(count), 1)
 
+    def test_source_registry_drives_ingestion_and_filter(self) -> None:
+        self._login_session()
+        self._seed_article("Old", "Mock", "https://example.com/old")
+        self.assertIn("Mock", news_app.get_sources())
+
+        def fake_parse(url: str) -> SimpleNamespace:
+            return SimpleNamespace(
+                entries=[{"title": f"From {url}", "summary": "A", "link": f"{url}/item"}]
+            )
+
+        news_app.register_source("Runtime", ["https://runtime.example.com/rss"])
+        news_app.set_source_enabled("Mock", False)
+        with patch("app.DEFAULT_SOURCES", {"Mock": "https://mock.example.com/rss"}), patch(
+            "app.parse_feed", side_effect=fake_parse
+        ):
+            self.client.post("/refresh")
+
+        with self._db() as conn:
+            rows = {
+                row["name"]: row
+                for row in conn.execute("SELECT name, article_count, last_seen_at, enabled FROM sources")
+            }
+        self.assertEqual(rows["Runtime"]["article_count"], 1)
+        self.assertIsNotNone(rows["Runtime"]["last_seen_at"])
+        self.assertEqual(rows["Mock"]["article_count"], 1)
+        self.assertIsNone(rows["Mock"]["last_seen_at"])
+        # Atslēgts avots netiek ielādēts, bet tā esošie raksti paliek redzami un filtrējami.
+        self.assertEqual(news_app.get_sources(), ["Mock", "Runtime"])
+        with patch("app.upsert_articles", return_value=0):
+            body = self.client.get("/?source=Mock").data.decode("utf-8")
+        self.assertIn("Old", body)
+        self.assertIn('<option value="Mock" selected', body)
+
+        news_app.set_source_enabled("Mock", True)
+        self.assertEqual(news_app.get_sources(), ["Mock", "Runtime"])
+        with self._db() as conn:
+            conn.execute("DELETE FROM articles WHERE url = 'https://example.com/old'")
+            count = conn.execute("SELECT article_count FROM sources WHERE name = 'Mock'").fetchone()[0]
+        self.assertEqual(count, 0)
+
     def test_save_and_unsave_article_updates_saved_articles(self) -> None:
         user_id = self._login_session()
         article_id = self._seed_article("Save me", "BBC", "https://example.com/save")
@@ -286,6 +336,8 @@ class IntegrationTests(unittest.TestCase):
             ).fetchone()["c"]
         self.assertEqual(int(count), 1)
 
+        # Šifrētajā glabātuvē notikums nonāk fonā, partijā ar citiem.
+        news_app.activity_buffer.flush()
         stored_users = news_app.user_store._read()
         activity = stored_users[email]["activity"]
         self.assertIn(article_id, activity["saved_important_article_ids"])
@@ -344,9 +396,53 @@ class IntegrationTests(unittest.TestCase):
             ).fetchone()["c"]
         self.assertEqual(int(count), 1)
 
+        news_app.activity_buffer.flush()
         activity = news_app.user_store._read()[email]["activity"]
         self.assertEqual(activity["saved_later_article_ids"].count(article_id), 1)
 
+    def test_user_state_cache_is_invalidated_by_mutating_routes(self) -> None:
+        user_id = self._login_session()
+        article_id = self._seed_article("Stateful", "SourceA", "https://example.com/stateful")
+
+        with patch("app.upsert_articles", return_value=0):
+            before = self.client.get("/").data.decode("utf-8")
+            self.client.post("/save", data={"article_id": article_id, "tag": "later"})
+            self.client.get(f"/article/{article_id}")
+            news_app.activity_buffer.flush()
+            after = self.client.get("/").data.decode("utf-8")
+
+        self.assertNotIn("Skatīts", before)
+        self.assertIn('Noņemt no "lasīt vēlāk"', after)
+        self.assertIn("Skatīts", after)
+
+        state = news_app.load_user_state(user_id, [article_id, 999])
+        self.assertEqual(state.saved_later, {article_id})
+        self.assertEqual(state.saved_important, frozenset())
+        self.assertEqual(state.viewed, {article_id})
+
+    def test_user_state_cache_sees_writes_from_other_processes(self) -> None:
+        user_id = self._login_session()
+        article_id = self._seed_article("Shared", "SourceA", "https://example.com/shared")
+        self.assertEqual(news_app.load_user_state(user_id, [article_id]).saved_important, frozenset())
+
+        # Cits process raksta tieši datubāzē, neskarot šī procesa kešu.
+        with sqlite3.connect(news_app.DB_PATH) as conn:
+            conn.execute(
+                "INSERT INTO saved_articles (user_id, article_id, tag, created_at) VALUES (?, ?, 'important', ?)",
+                (user_id, article_id, datetime.now(timezone.utc).isoformat()),
+            )
+            conn.execute(
+                "INSERT INTO viewed_articles (user_id, article_id, viewed_at) VALUES (?, ?, ?)",
+                (user_id, article_id, datetime.now(timezone.utc).isoformat()),
+            )
+        state = news_app.load_user_state(user_id, [article_id])
+        self.assertEqual(state.saved_important, {article_id})
+        self.assertEqual(state.viewed, {article_id})
+
+        with sqlite3.connect(news_app.DB_PATH) as conn:
+            conn.execute("DELETE FROM saved_articles WHERE user_id = ?", (user_id,))
+        self.assertEqual(news_app.load_user_state(user_id, [article_id]).saved_important, frozenset())
+
     def test_ignore_source_hides_source_articles_from_index(self) -> None:
         self._login_session()
         self._seed_article("Alpha News", "SourceA", "https://example.com/a")
@@ -377,6 +473,24 @@ class IntegrationTests(unittest.TestCase):
         self.assertNotIn("Hide This One", body)
         self.assertIn("Keep This One", body)
 
+    def test_ignore_filters_are_scoped_to_the_user(self) -> None:
+        user_id = self._login_session()
+        other_id = news_app.get_or_create_user("other@example.com", "Other")
+        hidden_id = self._seed_article("Hidden For One", "SourceA", "https://example.com/one")
+        self._seed_article("Source Ignored", "SourceB", "https://example.com/two")
+        with self._db() as conn:
+            conn.executemany(
+                "INSERT INTO ignored_articles (user_id, article_id) VALUES (?, ?)",
+                [(user_id, hidden_id), *((user_id, 10_000 + number) for number in range(2_000))],
+            )
+            conn.execute("INSERT INTO ignored_sources (user_id, source) VALUES (?, ?)", (user_id, "SourceB"))
+
+        own, _ = news_app.fetch_articles(user_id, "", None, None)
+        other, _ = news_app.fetch_articles(other_id, "", None, None)
+
+        self.assertEqual(own, [])
+        self.assertEqual({row["title"] for row in other}, {"Hidden For One", "Source Ignored"})
+
     def test_open_article_redirects_and_marks_viewed(self) -> None:
         user_id = self._login_session()
         article_id = self._seed_article("Read Full", "SourceA", "https://example.com/full")
@@ -386,6 +500,7 @@ class IntegrationTests(unittest.TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertEqual(response.headers["Location"], "https://example.com/full")
 
+        news_app.activity_buffer.flush()
         with self._db() as conn:
             viewed_count = conn.execute(
                 "SELECT COUNT(*) AS c FROM viewed_articles WHERE user_id = ? AND article_id = ?",
@@ -393,6 +508,167 @@ class IntegrationTests(unittest.TestCase):
             ).fetchone()["c"]
         self.assertEqual(int(viewed_count), 1)
 
+    def test_activity_buffer_batches_writes_until_flush(self) -> None:
+        user_id = self._login_session()
+        article_id = self._seed_article("Buffered", "SourceA", "https://example.com/buffered")
+        buffer = news_app.ActivityBuffer(flush_seconds=3600, batch_size=10, max_pending=4)
+        self.addCleanup(buffer.stop)
+
+        with patch("app.activity_buffer", buffer):
+            self.client.get(f"/article/{article_id}")
+            news_app.record_search(user_id, "buffered")
+            # Skatījums SQLite tabulai un tā notikums šifrētajai glabātuvei, plus meklējums.
+            self.assertEqual(buffer.pending(), 3)
+            with self._db() as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM viewed_articles").fetchone()[0], 0)
+
+            news_app.record_search(user_id, "limit")
+            self.assertEqual(buffer.flush(), 4)
+            self.assertEqual(buffer.pending(), 0)
+
+        with self._db() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM viewed_articles").fetchone()[0], 1)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM search_history").fetchone()[0], 2)
+
+    def test_activity_buffer_is_bounded_and_never_raises_into_requests(self) -> None:
+        user_id = self._login_session()
+        article_id = self._seed_article("Bounded", "SourceA", "https://example.com/bounded")
+        buffer = news_app.ActivityBuffer(flush_seconds=3600, batch_size=100, max_pending=3)
+        self.addCleanup(buffer.stop)
+
+        with patch("app.activity_buffer", buffer), patch.object(
+            buffer, "_write", side_effect=sqlite3.OperationalError("database is locked")
+        ):
+            for number in range(5):
+                news_app.record_search(user_id, f"query {number}")
+            # Pievienošana nekad neraksta pati; virs robežas tiek izmesti vecākie notikumi.
+            self.assertEqual(buffer.stats(), {"pending": 3, "dropped": 2, "failures": 0})
+
+            with self.assertRaises(sqlite3.OperationalError):
+                buffer.flush()
+            response = self.client.get(f"/article/{article_id}")
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(buffer.stats(), {"pending": 3, "dropped": 4, "failures": 1})
+
+        self.assertEqual(buffer.flush(), 3)
+        with self._db() as conn:
+            queries = [row[0] for row in conn.execute("SELECT query FROM search_history ORDER BY query")]
+        self.assertEqual(queries, ["query 4"])
+
+    def test_activity_buffer_writes_through_without_flush_interval(self) -> None:
+        user_id = self._login_session()
+        buffer = news_app.ActivityBuffer(flush_seconds=0, batch_size=100, max_pending=10)
+
+        with patch("app.activity_buffer", buffer):
+            news_app.record_search(user_id, "instant")
+            self.assertEqual(buffer.pending(), 0)
+            self.assertIsNone(buffer._thread)
+            with self._db() as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM search_history").fetchone()[0], 1)
+
+            with patch.object(
+                buffer, "_write", side_effect=sqlite3.OperationalError("database is locked")
+            ), self.assertLogs(news_app.app.logger, "ERROR"):
+                news_app.record_search(user_id, "locked")
+            self.assertEqual(buffer.stats(), {"pending": 1, "dropped": 0, "failures": 1})
+
+            news_app.record_search(user_id, "retry")
+        self.assertEqual(buffer.pending(), 0)
+        with self._db() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM search_history").fetchone()[0], 3)
+
+    def test_activity_buffer_flushes_into_database_active_when_queued(self) -> None:
+        user_id = self._login_session()
+        buffer = news_app.ActivityBuffer(flush_seconds=3600, batch_size=100, max_pending=10)
+        self.addCleanup(buffer.stop)
+        other_db = self.temp_path / "other.db"
+
+        with patch("app.activity_buffer", buffer):
+            news_app.record_search(user_id, "pinned")
+            with patch("app.DB_PATH", str(other_db)):
+                self.assertEqual(buffer.flush(), 1)
+
+        self.assertFalse(other_db.exists())
+        with self._db() as conn:
+            self.assertEqual(conn.execute("SELECT query FROM search_history").fetchone()[0], "pinned")
+
+    def test_background_maintenance_starts_lazily_outside_main(self) -> None:
+        calls = []
+
+        def flaky() -> None:
+            calls.append(1)
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("database is locked")
+
+        task = news_app.PeriodicTask("test-maintenance", 0.01, flaky)
+        news_app.app.config["TESTING"] = False
+        try:
+            with patch("app.article_maintenance", task), patch("app.start_user_journal_compaction"), self.assertLogs(
+                news_app.app.logger, "ERROR"
+            ):
+                self.client.get("/login")
+                first_thread = task._thread
+                self.client.get("/login")
+                deadline = time.monotonic() + 2
+                while len(calls) < 3 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                # Viens pavediens procesā, kas pārdzīvo kļūdu.
+                self.assertIs(task._thread, first_thread)
+                self.assertTrue(first_thread.is_alive())
+        finally:
+            news_app.app.config["TESTING"] = True
+            task.stop()
+        self.assertGreaterEqual(len(calls), 3)
+        self.assertFalse(first_thread.is_alive())
+
+    def test_user_journal_is_compacted_without_main_block(self) -> None:
+        email = "journal@example.com"
+        news_app.user_store.create_user(email, "Journal", "Password12345")
+        news_app.user_store.record_activity(email, "save_later", 7)
+        task = news_app.PeriodicTask("test-journal", 0.01, news_app.compact_user_journal)
+
+        def journal_size() -> int:
+            conn = news_app.user_store._connect()
+            try:
+                return conn.execute("SELECT COUNT(*) FROM secure_activity_journal").fetchone()[0]
+            finally:
+                conn.close()
+
+        self.assertEqual(journal_size(), 1)
+        news_app.app.config["TESTING"] = False
+        try:
+            with patch("app.user_journal_compaction", task), patch("app.ARTICLE_MAINTENANCE_THREAD", False):
+                self.client.get("/login")
+                deadline = time.monotonic() + 2
+                while journal_size() and time.monotonic() < deadline:
+                    time.sleep(0.01)
+        finally:
+            news_app.app.config["TESTING"] = True
+            task.stop()
+        self.assertEqual(journal_size(), 0)
+        self.assertEqual(news_app.user_store.get_activity(email)["saved_later_article_ids"], [7])
+
+    def test_activity_buffer_thread_survives_unexpected_errors(self) -> None:
+        buffer = news_app.ActivityBuffer(flush_seconds=0.01, batch_size=10, max_pending=10)
+        calls = []
+
+        def flaky_flush() -> int:
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return 0
+
+        with patch.object(buffer, "flush", side_effect=flaky_flush), self.assertLogs(news_app.app.logger, "ERROR"):
+            buffer._ensure_thread()
+            deadline = time.monotonic() + 2
+            while len(calls) < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(buffer._thread.is_alive())
+            buffer._stopped.set()
+            buffer._wakeup.set()
+            buffer._thread.join(timeout=1)
+        self.assertGreaterEqual(len(calls), 3)
+
     def test_search_history_and_saved_search_lifecycle(self) -> None:
         user_id = self._login_session()
         self._seed_article("Climate Update", "SourceA", "https://example.com/climate", summary="climate summary")
@@ -401,6 +677,7 @@ class IntegrationTests(unittest.TestCase):
             index_response = self.client.get("/?q=climate")
         self.assertEqual(index_response.status_code, 200)
 
+        news_app.activity_buffer.flush()
         with self._db() as conn:
             history_count = conn.execute(
                 "SELECT COUNT(*) AS c FROM search_history WHERE user_id = ? AND query = ?",
@@ -428,6 +705,916 @@ class IntegrationTests(unittest.TestCase):
             ).fetchone()["c"]
         self.assertEqual(int(remaining), 0)
 
+    def test_index_paginates_with_cursor(self) -> None:
+        user_id = self._login_session()
+        for number in range(5):
+            self._seed_article(f"Paged News {number}", "SourceA", f"https://example.com/paged-{number}")
+
+        seen = []
+        cursor = None
+        with patch("app.PAGE_SIZE", 2), patch("app.upsert_articles", return_value=0):
+            for _ in range(3):
+                articles, cursor = news_app.fetch_articles(user_id, "", None, None, cursor)
+                seen.extend(article["title"] for article in articles)
+                if cursor is None:
+                    break
+
+            first_page = self.client.get("/").data.decode("utf-8")
+
+        self.assertEqual(seen, [f"Paged News {number}" for number in reversed(range(5))])
+        self.assertIsNone(cursor)
+        self.assertIn("Paged News 4", first_page)
+        self.assertNotIn("Paged News 2", first_page)
+        self.assertIn("cursor=", first_page)
+
+    def test_coverage_sort_pages_in_sql(self) -> None:
+        user_id = self._login_session()
+        now = datetime.now(timezone.utc)
+        topics = ["Sports", "AI", "AI", "Sports", "AI", "Kultūra", "Sports", "AI"]
+        for number, topic in enumerate(topics):
+            self._seed_article(
+                f"Coverage {number}",
+                "SourceA",
+                f"https://example.com/coverage-{number}",
+                published_at=now - timedelta(minutes=number),
+                topic=topic,
+            )
+
+        seen = []
+        cursor = None
+        for _ in range(5):
+            articles, cursor = news_app.fetch_articles(user_id, "", None, None, cursor, limit=3, sort="coverage")
+            seen.extend(article["title"] for article in articles)
+            if cursor is None:
+                break
+
+        self.assertEqual(
+            seen,
+            [f"Coverage {number}" for number in (1, 2, 4, 7, 0, 3, 6, 5)],
+        )
+        self.assertEqual(
+            news_app.fetch_topic_counts(user_id, "", None, None),
+            {"AI": 4, "Sports": 3, "Kultūra": 1},
+        )
+
+    def test_coverage_sort_counts_after_ignoring_a_majority_source(self) -> None:
+        user_id = self._login_session()
+        now = datetime.now(timezone.utc)
+        for number in range(20):
+            self._seed_article(
+                f"Dominant {number}", "BBC", f"https://example.com/dominant-{number}",
+                published_at=now - timedelta(minutes=number), topic="AI",
+            )
+        self._seed_article("Rare AI", "LSM", "https://example.com/rare-ai", published_at=now, topic="AI")
+        for number in range(3):
+            self._seed_article(
+                f"Rare Sports {number}", "LSM", f"https://example.com/rare-sports-{number}",
+                published_at=now - timedelta(hours=number + 1), topic="Sports",
+            )
+        self.client.post("/ignore-source", data={"source": "BBC"})
+
+        articles, cursor = news_app.fetch_articles(user_id, "", None, None, limit=5, sort="coverage")
+        # Atspoguļojums skaitīts bez ignorētā avota: Sports (3) pirms AI (1).
+        self.assertEqual(
+            [article["title"] for article in articles],
+            ["Rare Sports 0", "Rare Sports 1", "Rare Sports 2", "Rare AI"],
+        )
+        self.assertIsNone(cursor)
+        with patch("app.upsert_articles", return_value=0):
+            body = self.client.get("/?sort=coverage").data.decode("utf-8")
+        self.assertIn("Rare AI", body)
+        self.assertNotIn("Dominant", body)
+
+    def test_empty_page_with_cursor_still_offers_load_more(self) -> None:
+        self._login_session()
+        with patch("app.upsert_articles", return_value=0), patch("app.fetch_articles", return_value=([], "next")):
+            body = self.client.get("/").data.decode("utf-8")
+        self.assertIn("Ielādēt vairāk", body)
+        self.assertIn("cursor=next", body)
+        self.assertNotIn("Nav atrastu ziņu", body)
+
+    def test_compare_returns_newest_articles_per_source(self) -> None:
+        user_id = self._login_session()
+        now = datetime.now(timezone.utc)
+        for source, offset in (("SourceA", 0), ("SourceB", 1)):
+            for number in range(4):
+                self._seed_article(
+                    f"{source} {number}",
+                    source,
+                    f"https://example.com/{source}-{number}",
+                    published_at=now - timedelta(days=number * 3, hours=offset),
+                )
+        self._seed_article("Other topic", "SourceA", "https://example.com/other", topic="Sports")
+
+        articles = news_app.fetch_articles_by_topic(user_id, "AI", per_source=2)
+        self.assertEqual(
+            [article["title"] for article in articles],
+            ["SourceA 0", "SourceB 0", "SourceA 1", "SourceB 1"],
+        )
+        recent = news_app.fetch_articles_by_topic(user_id, "AI", per_source=2, days=2)
+        self.assertEqual([article["title"] for article in recent], ["SourceA 0", "SourceB 0"])
+
+    def test_topic_buckets_match_row_counts(self) -> None:
+        user_id = self._login_session()
+        now = datetime.now(timezone.utc)
+        ids = []
+        for number in range(24):
+            ids.append(
+                self._seed_article(
+                    f"Bucket {number}",
+                    ["SourceA", "SourceB", "SourceC"][number % 3],
+                    f"https://example.com/bucket-{number}",
+                    published_at=now - timedelta(hours=number * 7, minutes=number),
+                    topic=["AI", "Sports", "Kultūra", "Cits"][number % 4],
+                )
+            )
+        with self._db() as conn:
+            conn.execute("UPDATE articles SET topic_id = NULL WHERE id = ?", (ids[5],))
+            conn.execute("INSERT INTO ignored_articles (user_id, article_id) VALUES (?, ?)", (user_id, ids[1]))
+            conn.execute("INSERT INTO ignored_sources (user_id, source) VALUES (?, 'SourceC')", (user_id,))
+
+        for days in (None, 1, 3, 7):
+            for source in (None, "SourceA", "SourceB"):
+                with self.subTest(days=days, source=source):
+                    self.assertEqual(
+                        news_app.count_topics_in_buckets(user_id, days, source),
+                        news_app.count_topics_in_articles(user_id, "", days, source),
+                    )
+
+        with self._db() as conn:
+            stored = conn.execute("SELECT hour, topic_id, source_id, count FROM topic_buckets ORDER BY 1, 2, 3").fetchall()
+            self.assertGreater(news_app.rebuild_topic_buckets(conn), 0)
+            rebuilt = conn.execute(
+                "SELECT hour, topic_id, source_id, count FROM topic_buckets ORDER BY 1, 2, 3"
+            ).fetchall()
+        self.assertEqual(
+            [tuple(row) for row in stored if row["count"]],
+            [tuple(row) for row in rebuilt],
+        )
+
+    def test_feed_results_are_shared_and_filtered_per_user(self) -> None:
+        reader_id = self._login_session()
+        other_id = news_app.get_or_create_user("other@example.com", "Other")
+        now = datetime.now(timezone.utc)
+        ids = [
+            self._seed_article(
+                f"Shared {number}",
+                "SourceB" if number == 1 else "SourceA",
+                f"https://example.com/shared-{number}",
+                published_at=now - timedelta(minutes=number),
+            )
+            for number in range(6)
+        ]
+        with self._db() as conn:
+            conn.execute("INSERT INTO ignored_articles (user_id, article_id) VALUES (?, ?)", (other_id, ids[0]))
+            conn.execute("INSERT INTO ignored_sources (user_id, source) VALUES (?, 'SourceB')", (other_id,))
+
+        first, first_cursor = news_app.fetch_articles(reader_id, "", None, None, limit=2)
+        self.assertEqual(news_app.result_cache.stats()["misses"], 1)
+        filtered, filtered_cursor = news_app.fetch_articles(other_id, "", None, None, limit=2)
+        rest, rest_cursor = news_app.fetch_articles(other_id, "", None, None, filtered_cursor, limit=2)
+
+        self.assertEqual([row["title"] for row in first], ["Shared 0", "Shared 1"])
+        self.assertEqual([row["title"] for row in filtered], ["Shared 2", "Shared 3"])
+        self.assertEqual([row["title"] for row in rest], ["Shared 4", "Shared 5"])
+        self.assertIsNotNone(first_cursor)
+        self.assertIsNone(rest_cursor)
+        self.assertGreaterEqual(news_app.result_cache.stats()["hits"], 1)
+
+        fake_feed = SimpleNamespace(entries=[{"title": "Fresh", "summary": "AI", "link": "https://example.com/fresh"}])
+        with patch("app.DEFAULT_SOURCES", {"SourceA": "https://example.com/rss"}), patch(
+            "app.parse_feed", return_value=fake_feed
+        ):
+            news_app.upsert_articles()
+        refreshed, _ = news_app.fetch_articles(reader_id, "", None, None, limit=2)
+        self.assertEqual(refreshed[0]["title"], "Fresh")
+
+        # Pieteicies lietotājs bez iekšējā marķiera skaitītājus neredz.
+        self.assertEqual(self.client.get("/internal/cache-stats").status_code, 404)
+        with patch("app.INTERNAL_STATS_TOKEN", "stats-token"):
+            wrong = self.client.get("/internal/cache-stats", headers={"X-Internal-Token": "guess"})
+            stats = self.client.get("/internal/cache-stats", headers={"X-Internal-Token": "stats-token"}).get_json()
+        self.assertEqual(wrong.status_code, 404)
+        self.assertEqual(stats["ingestion_generation"], 1)
+        self.assertGreater(stats["results"]["misses"], 0)
+
+    def test_feed_cache_is_bounded_for_heavy_ignorers_and_normalized(self) -> None:
+        reader_id = self._login_session()
+        heavy_id = news_app.get_or_create_user("heavy@example.com", "Heavy")
+        now = datetime.now(timezone.utc)
+        for number in range(40):
+            self._seed_article(
+                f"Climate {number}",
+                "SourceA" if number % 10 == 9 else "SourceB",
+                f"https://example.com/heavy-{number}",
+                published_at=now - timedelta(minutes=number),
+            )
+        with self._db() as conn:
+            conn.execute("INSERT INTO ignored_sources (user_id, source) VALUES (?, 'SourceB')", (heavy_id,))
+
+        statements = []
+        original_get_db = news_app.get_db
+
+        def traced_get_db():
+            conn = original_get_db()
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        with patch("app.get_db", traced_get_db):
+            page, cursor = news_app.fetch_articles(heavy_id, "", None, None, limit=3)
+        self.assertEqual([row["title"] for row in page], ["Climate 9", "Climate 19", "Climate 29"])
+        self.assertIsNotNone(cursor)
+        # Ne vairāk kā FEED_CACHED_CHUNKS_PER_PAGE kopīgās daļas, tad viens personalizēts vaicājums.
+        self.assertEqual(news_app.result_cache.stats()["entries"], news_app.FEED_CACHED_CHUNKS_PER_PAGE)
+        self.assertFalse([sql for sql in statements if "SELECT source FROM ignored_sources" in sql])
+        rest, rest_cursor = news_app.fetch_articles(heavy_id, "", None, None, cursor, limit=3)
+        self.assertEqual([row["title"] for row in rest], ["Climate 39"])
+        self.assertIsNone(rest_cursor)
+
+        news_app.result_cache.clear()
+        news_app.fetch_articles(reader_id, "Climate", None, None, limit=3)
+        news_app.fetch_articles(reader_id, "  climate ", None, None, limit=3)
+        news_app.fetch_articles(reader_id, "climate", None, None, "junk.cursor", limit=3)
+        self.assertEqual(news_app.result_cache.stats()["misses"], 1)
+
+    def test_hot_index_matches_sqlite_results(self) -> None:
+        self._login_session()
+        now = datetime.now(timezone.utc)
+        words = ["Alpha news", "beta Report", "ALPHAbet soup", "gamma"]
+        for number in range(40):
+            self._seed_article(
+                f"{words[number % 4]} {number}",
+                "SourceA" if number % 3 else "SourceB",
+                f"https://example.com/hot-{number}",
+                summary=f"Kopsavilkums Ārzemes {number % 5}",
+                published_at=now - timedelta(hours=number * 12),
+                topic="AI" if number % 2 else "Sports",
+            )
+
+        def walk(query: str, days: int | None, source: str | None) -> list[int]:
+            seen: list[int] = []
+            cursor = None
+            with news_app.get_db() as conn:
+                while True:
+                    rows, cursor = news_app.query_article_page(conn, None, query, days, source, cursor, 4)
+                    seen.extend(row["id"] for row in rows)
+                    if cursor is None:
+                        return seen
+
+        for query in ("", "alpha", "ALP", "ārzemes", "Ārzemes", "news 1", "5%"):
+            for days in (None, 3, 10):
+                for source in (None, "SourceB"):
+                    with self.subTest(query=query, days=days, source=source):
+                        with patch("app.HOT_INDEX_DAYS", 0):
+                            expected = walk(query, days, source)
+                        self.assertEqual(walk(query, days, source), expected)
+
+        with patch("app.HOT_INDEX_DAYS", 0):
+            expected_compare = [row["id"] for row in news_app.fetch_articles_by_topic(1, "AI", per_source=2, days=5)]
+        news_app.result_cache.clear()
+        self.assertEqual(
+            [row["id"] for row in news_app.fetch_articles_by_topic(1, "AI", per_source=2, days=5)], expected_compare
+        )
+
+        with news_app.get_db() as conn:
+            before = news_app.get_hot_index(conn)
+            new_id = news_app.insert_article(conn, "Alpha fresh", "S", "SourceA", now, "https://example.com/hot-new", "AI")
+            news_app.bump_ingestion_generation(conn)
+            conn.commit()
+            after = news_app.get_hot_index(conn)
+        self.assertIsNot(before, after)
+        self.assertEqual(after.ids[0], new_id)
+        self.assertEqual(len(after.ids), len(before.ids) + 1)
+        self.assertIn(new_id, after._matching_ids("alpha"))
+
+    def test_hot_index_rebuilds_after_content_change_in_another_process(self) -> None:
+        article_id = self._seed_article("Content Change", "SourceA", "https://example.com/content", topic="AI")
+        with news_app.get_db() as conn:
+            before = news_app.get_hot_index(conn)
+            # Cits process pārrēķina tēmas: paaudze mainās, bet jaunu ID nav un šī procesa indekss netiek atmests.
+            conn.execute(
+                "UPDATE articles SET topic_id = ? WHERE id = ?", (news_app.lookup_id(conn, "topics", "Sports"), article_id)
+            )
+            news_app.bump_ingestion_generation(conn, content_changed=True)
+            conn.commit()
+            after = news_app.get_hot_index(conn)
+        self.assertIsNot(before, after)
+        self.assertEqual(after.rows[article_id]["topic"], "Sports")
+        self.assertEqual(after.topics[after.positions[article_id]], after.topic_ids["Sports"])
+
+    def test_invalid_cursor_falls_back_to_first_page(self) -> None:
+        self._login_session()
+        self._seed_article("Only Article", "SourceA", "https://example.com/only")
+
+        with patch("app.upsert_articles", return_value=0):
+            response = self.client.get("/?cursor=not-a-cursor")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Only Article", response.data.decode("utf-8"))
+
+    def test_cursor_with_wrong_value_types_falls_back_to_first_page(self) -> None:
+        email = "cursor@example.com"
+        self._login_session(email=email)
+        article_id = self._seed_article("Only Article", "SourceA", "https://example.com/only")
+        self.client.post("/save", data={"article_id": article_id, "tag": "later"})
+        self.client.get(f"/article/{article_id}")
+        news_app.activity_buffer.flush()
+
+        # Parakstīti, bet ar nepareiziem tipiem.
+        crafted = news_app.encode_cursor
+        with patch("app.upsert_articles", return_value=0):
+            for path, cursor in (
+                ("/", crafted({"a": 1}, 2)),
+                ("/", crafted(True, 2)),
+                ("/?sort=coverage", crafted({"a": 1}, 2, 3)),
+                ("/saved", crafted({"a": 1}, 2)),
+                ("/history", crafted(["x"], 2)),
+            ):
+                separator = "&" if "?" in path else "?"
+                response = self.client.get(f"{path}{separator}cursor={cursor}")
+                self.assertEqual(response.status_code, 200, path)
+                self.assertIn("Only Article", response.data.decode("utf-8"), path)
+
+    def _trace_writes(self):
+        statements = []
+        original_get_db = news_app.get_db
+
+        def traced_get_db():
+            conn = original_get_db()
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        writes = lambda: [
+            sql for sql in statements if sql.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE", "REPLACE"))
+        ]
+        return patch("app.get_db", traced_get_db), writes
+
+    def test_read_only_pages_do_not_write(self) -> None:
+        self._login_session()
+        self._seed_article("Read Only", "SourceA", "https://example.com/read-only")
+        self.client.get("/profile")
+
+        tracer, writes = self._trace_writes()
+        with tracer, patch("app.upsert_articles", return_value=0):
+            for path in ["/", "/saved", "/important", "/history", "/profile", "/compare?topic=AI"]:
+                with self.subTest(path=path):
+                    self.assertEqual(self.client.get(path).status_code, 200)
+
+        self.assertEqual(writes(), [])
+
+    def test_index_ingestion_writes_only_for_new_articles_or_stale_sources(self) -> None:
+        self._login_session()
+        fake_feed = SimpleNamespace(entries=[{"title": "Known", "summary": "AI", "link": "https://example.com/known"}])
+        sources = {"SourceA": "https://example.com/rss"}
+        with patch("app.DEFAULT_SOURCES", sources), patch("app.parse_feed", return_value=fake_feed):
+            self.client.get("/")
+            self.client.get("/profile")
+
+            tracer, writes = self._trace_writes()
+            with tracer:
+                self.assertEqual(self.client.get("/").status_code, 200)
+            self.assertEqual(writes(), [])
+
+            stale = (datetime.now(timezone.utc) - timedelta(seconds=news_app.SOURCE_LAST_SEEN_REFRESH_SECONDS + 60))
+            with self._db() as conn:
+                conn.execute("UPDATE sources SET last_seen_at = ? WHERE name = 'SourceA'", (stale.isoformat(),))
+            tracer, writes = self._trace_writes()
+            with tracer:
+                self.client.get("/")
+            self.assertEqual(len(writes()), 1)
+            self.assertIn("last_seen_at", writes()[0])
+
+    def test_get_or_create_user_only_writes_changed_display_name(self) -> None:
+        user_id = news_app.get_or_create_user("sync@example.com", "Sync")
+
+        tracer, writes = self._trace_writes()
+        with tracer:
+            self.assertEqual(news_app.get_or_create_user("sync@example.com", "Sync"), user_id)
+            self.assertEqual(writes(), [])
+            news_app.get_or_create_user("sync@example.com", "Sync Renamed")
+            self.assertEqual(len(writes()), 1)
+
+    def test_user_counters_follow_activity_and_repair_drift(self) -> None:
+        user_id = self._login_session()
+        first = self._seed_article("Counted One", "SourceA", "https://example.com/counted-1")
+        second = self._seed_article("Counted Two", "SourceB", "https://example.com/counted-2")
+
+        for _ in range(2):
+            self.client.post("/save", data={"article_id": first, "tag": "later"})
+        self.client.post("/save", data={"article_id": second, "tag": "important"})
+        self.client.post("/unsave", data={"article_id": second, "tag": "important"})
+        self.client.post("/ignore-article", data={"article_id": second})
+        self.client.post("/ignore-source", data={"source": "SourceB"})
+        self.client.get(f"/article/{first}")
+        self.client.get(f"/article/{first}")
+        news_app.activity_buffer.flush()
+
+        expected = {
+            "saved_later": 1,
+            "saved_important": 0,
+            "ignored_articles": 1,
+            "ignored_sources": 1,
+            "viewed_articles": 1,
+        }
+        self.assertEqual(news_app.get_user_stats(user_id), expected)
+        self.assertEqual(news_app.check_user_counters(), {})
+
+        with self._db() as conn:
+            conn.execute("UPDATE user_counters SET saved_later = 42 WHERE user_id = ?", (user_id,))
+        self.assertEqual(news_app.check_user_counters(repair=True), {user_id: {"saved_later": (42, 1)}})
+        self.assertEqual(news_app.get_user_stats(user_id), expected)
+
+    def test_search_history_is_aggregated_and_capped(self) -> None:
+        user_id = self._login_session()
+        with patch("app.upsert_articles", return_value=0):
+            for path in ["/?q=Climate", "/?q=climate%20%20", "/?q=climate&days=7", "/?q=climate&cursor=abc"]:
+                self.client.get(path)
+        with patch("app.SEARCH_HISTORY_PER_USER", 2):
+            for query in ["one", "two", "three"]:
+                news_app.record_search(user_id, query)
+            news_app.activity_buffer.flush()
+
+        with self._db() as conn:
+            rows = conn.execute(
+                "SELECT query_key, count FROM search_history WHERE user_id = ? ORDER BY last_seen DESC",
+                (user_id,),
+            ).fetchall()
+        self.assertEqual([(row["query_key"], row["count"]) for row in rows], [("three", 1), ("two", 1)])
+
+    def test_legacy_search_history_is_compacted(self) -> None:
+        with self._db() as conn:
+            conn.execute("DROP TABLE search_history")
+            conn.execute(
+                "CREATE TABLE search_history (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, query TEXT NOT NULL, created_at TEXT NOT NULL)"
+            )
+            conn.executemany(
+                "INSERT INTO search_history (user_id, query, created_at) VALUES (?, ?, ?)",
+                [
+                    (1, "AI", "2026-01-01T10:00:00+00:00"),
+                    (1, "ai ", "2026-01-02T10:00:00+00:00"),
+                    (1, "Klimats", "2026-01-03T10:00:00+00:00"),
+                    (2, "AI", "2026-01-04T10:00:00+00:00"),
+                ],
+            )
+
+        news_app.init_db()
+
+        with self._db() as conn:
+            rows = conn.execute(
+                "SELECT user_id, query_key, query, count, first_seen, last_seen FROM search_history ORDER BY user_id, query_key"
+            ).fetchall()
+        self.assertEqual(
+            [tuple(row) for row in rows],
+            [
+                (1, "ai", "ai ", 2, "2026-01-01T10:00:00+00:00", "2026-01-02T10:00:00+00:00"),
+                (1, "klimats", "Klimats", 1, "2026-01-03T10:00:00+00:00", "2026-01-03T10:00:00+00:00"),
+                (2, "ai", "AI", 1, "2026-01-04T10:00:00+00:00", "2026-01-04T10:00:00+00:00"),
+            ],
+        )
+
+    def test_archived_articles_leave_feed_but_still_resolve(self) -> None:
+        user_id = self._login_session()
+        old_published = datetime.now(timezone.utc) - timedelta(days=news_app.ARTICLE_RETENTION_DAYS + 40)
+        old_id = self._seed_article("Old Saved", "SourceA", "https://example.com/old", published_at=old_published)
+        self._seed_article("Fresh", "SourceA", "https://example.com/fresh")
+        self.client.post("/save", data={"article_id": old_id, "tag": "later"})
+
+        moved = news_app.archive_old_articles()
+
+        archive_table = "articles_archive_" + old_published.strftime("%Y%m")
+        self.assertEqual(moved, {archive_table: 1})
+        articles, _ = news_app.fetch_articles(user_id, "", None, None)
+        self.assertEqual([row["title"] for row in articles], ["Fresh"])
+        self.assertIn("Old Saved", self.client.get("/saved").data.decode("utf-8"))
+        self.assertEqual(self.client.get(f"/article/{old_id}").headers["Location"], "https://example.com/old")
+
+        partitions = {item["table"]: item for item in news_app.describe_article_partitions()}
+        self.assertEqual(partitions["articles"]["rows"], 1)
+        self.assertEqual(partitions[archive_table]["rows"], 1)
+        self.assertEqual(news_app.archive_old_articles(), {})
+
+    def test_archive_keeps_hot_row_when_month_already_holds_its_url(self) -> None:
+        self._login_session()
+        old_published = datetime.now(timezone.utc) - timedelta(days=news_app.ARTICLE_RETENTION_DAYS + 40)
+        self._seed_article("First Copy", "SourceA", "https://example.com/again", published_at=old_published)
+        archive_table = "articles_archive_" + old_published.strftime("%Y%m")
+        self.assertEqual(news_app.archive_old_articles(), {archive_table: 1})
+
+        reingested_id = self._seed_article(
+            "Second Copy", "SourceA", "https://example.com/again", published_at=old_published
+        )
+        self.client.post("/save", data={"article_id": reingested_id, "tag": "later"})
+
+        with self.assertLogs(news_app.app.logger, "WARNING"):
+            self.assertEqual(news_app.archive_old_articles(), {archive_table: 0})
+        with self._db() as conn:
+            titles = [row[0] for row in conn.execute("SELECT title FROM all_articles ORDER BY id")]
+        self.assertEqual(titles, ["First Copy", "Second Copy"])
+        self.assertIn("Second Copy", self.client.get("/saved").data.decode("utf-8"))
+
+    def _install_legacy_articles(self, rows: list[tuple]) -> None:
+        with self._db() as conn:
+            conn.execute("DROP VIEW IF EXISTS all_articles")
+            conn.execute("DROP VIEW IF EXISTS article_feed")
+            conn.execute("DROP TABLE articles")
+            conn.execute(
+                """
+                CREATE TABLE articles (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    summary TEXT,
+                    source TEXT NOT NULL,
+                    published_at TEXT NOT NULL,
+                    url TEXT UNIQUE NOT NULL,
+                    topic TEXT,
+                    location TEXT,
+                    image_url TEXT
+                )
+                """
+            )
+            conn.executemany(
+                "INSERT INTO articles (id, title, summary, source, published_at, url, topic) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("UPDATE sqlite_sequence SET seq = 42 WHERE name = 'articles'")
+
+    def test_legacy_article_layout_is_migrated_in_place(self) -> None:
+        user_id = self._login_session()
+        self._install_legacy_articles(
+            [
+                (3, "Older", "S", "LSM", "2024-05-01T10:00:00+00:00", "https://example.com/a", "AI"),
+                (7, "Newer", "S", "BBC", "2024-05-02T10:00:00.250000+00:00", "https://example.com/b", None),
+            ]
+        )
+
+        news_app.init_db()
+
+        articles, _ = news_app.fetch_articles(user_id, "", None, None)
+        self.assertEqual([(row["id"], row["source"]) for row in articles], [(7, "BBC"), (3, "LSM")])
+        self.assertEqual(articles[1]["published_at"], "2024-05-01T10:00:00+00:00")
+        self.assertEqual(articles[1]["topic"], "AI")
+        with self._db() as conn:
+            self.assertIsNone(news_app.insert_article(
+                conn, "Dup", "S", "LSM", datetime.now(timezone.utc), "https://example.com/a", "AI"
+            ))
+            self.assertEqual(
+                news_app.insert_article(conn, "New", "S", "LSM", datetime.now(timezone.utc), "https://example.com/c", "AI"),
+                43,
+            )
+
+    def test_legacy_migration_rejects_collisions_and_keeps_undated_articles(self) -> None:
+        self._install_legacy_articles(
+            [
+                (3, "One", "S", "LSM", "2024-05-01T10:00:00+00:00", "https://example.com/a", "AI"),
+                (7, "Two", "S", "BBC", "2024-05-02T10:00:00+00:00", "https://example.com/b", None),
+            ]
+        )
+        with patch("app.url_fingerprint", return_value=1), self.assertRaisesRegex(RuntimeError, "3,7"):
+            news_app.init_db()
+        with self._db() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0], 2)
+
+        self._install_legacy_articles(
+            [(9, "Undated", "S", "LSM", "vakar", "https://example.com/c", "AI")]
+        )
+        with self.assertLogs(news_app.app.logger, "WARNING"):
+            news_app.init_db()
+        with self._db() as conn:
+            published_ts = conn.execute("SELECT published_ts FROM articles WHERE id = 9").fetchone()[0]
+        self.assertLess(abs(published_ts - time.time()), 60)
+        self.assertEqual(news_app.archive_old_articles(), {})
+
+    def test_legacy_user_blob_is_migrated_to_records(self) -> None:
+        store = news_app.user_store
+        legacy = {
+            "old@example.com": {
+                "email": "old@example.com",
+                "display_name": "Old",
+                "salt": "c2FsdHNhbHRzYWx0c2FsdA==",
+                "password_hash": store._hash_password("OldPassword123", "c2FsdHNhbHRzYWx0c2FsdA=="),
+                "created_at": "2024-01-01T00:00:00+00:00",
+                "last_login_at": None,
+                "activity": {**store._empty_activity(), "ignored_sources": ["BBC"]},
+            }
+        }
+        with open(news_app.USERS_DATA_FILE, "wb") as file:
+            file.write(store.fernet.encrypt(json.dumps(legacy).encode("utf-8")))
+
+        store = news_app.SecureUserStore(news_app.USERS_DATA_FILE, news_app.USERS_KEY_FILE)
+        self.assertIsNotNone(store.authenticate("OLD@example.com", "OldPassword123"))
+        self.assertFalse(Path(news_app.USERS_DATA_FILE).exists())
+        self.assertTrue(Path(news_app.USERS_DATA_FILE + ".migrated").exists())
+
+        store.record_activity("old@example.com", "save_later", 5)
+        activity = store._read()["old@example.com"]["activity"]
+        self.assertEqual(activity["ignored_sources"], ["BBC"])
+        self.assertEqual(activity["saved_later_article_ids"], [5])
+
+        with sqlite3.connect(store.db_file) as conn:
+            stored = b"".join(bytes(row[0]) + row[1].encode() for row in conn.execute("SELECT record, email_key FROM secure_users"))
+        self.assertNotIn(b"old@example.com", stored)
+
+    def test_activity_journal_is_merged_on_read_and_compacted(self) -> None:
+        store = news_app.user_store
+        store.create_user("journal@example.com", "Journal", "Password12345")
+        store.record_activity("journal@example.com", "save_later", 7)
+        store.record_activity("journal@example.com", "save_important", 8)
+        store.record_activity("journal@example.com", "unsave_later", 7)
+        store.record_activity("missing@example.com", "ignore_source", "BBC")
+
+        with sqlite3.connect(store.db_file) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM secure_activity_journal").fetchone()[0], 4)
+        expected = {**store._empty_activity(), "saved_important_article_ids": [8]}
+        self.assertEqual(store._read()["journal@example.com"]["activity"], expected)
+        self.assertEqual(store.authenticate("journal@example.com", "Password12345")["activity"], expected)
+
+        self.assertEqual(store.compact_activity_journal(batch_size=2), 2)
+        self.assertEqual(store.compact_activity_journal(), 2)
+        self.assertEqual(store.compact_activity_journal(), 0)
+        with sqlite3.connect(store.db_file) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM secure_activity_journal").fetchone()[0], 0)
+        record = store._read()["journal@example.com"]
+        self.assertEqual(record["activity"], expected)
+        self.assertIsNotNone(record["last_login_at"])
+        self.assertEqual(list(store._read()), ["journal@example.com"])
+
+    def test_journal_compaction_between_record_and_tail_reads_is_not_lost(self) -> None:
+        store = news_app.user_store
+        store.create_user("snapshot@example.com", "Snapshot", "Password12345")
+        store.record_activity("snapshot@example.com", "save_later", 7)
+        store.record_activity("snapshot@example.com", "ignore_source", "BBC")
+        store.record_cache.clear()
+
+        original_load = store._load_record
+        compacted = []
+
+        def load_then_compact(encrypted: bytes):
+            record = original_load(encrypted)
+            if not compacted:
+                # Cits darbinieks sapludina žurnālu starp ieraksta un astes nolasīšanu.
+                compacted.append(None)
+                compacted[0] = store.compact_activity_journal()
+            return record
+
+        with patch.object(store, "_load_record", side_effect=load_then_compact):
+            activity = store.get_activity("snapshot@example.com")
+        self.assertEqual(compacted, [2])
+        self.assertEqual(activity["saved_later_article_ids"], [7])
+        self.assertEqual(activity["ignored_sources"], ["BBC"])
+        self.assertEqual(store.get_activity("snapshot@example.com"), activity)
+
+    def test_user_record_cache_skips_decryption_until_version_changes(self) -> None:
+        store = news_app.user_store
+        store.create_user("cache@example.com", "Cache", "Password12345")
+        store._read()
+
+        with patch.object(store, "_decrypt", wraps=store._decrypt) as decrypt:
+            store._read()
+            store.username_exists("Someone Else")
+            self.assertEqual(decrypt.call_count, 0)
+
+            store.record_activity("cache@example.com", "save_later", 3)
+            self.assertEqual(store._read()["cache@example.com"]["activity"]["saved_later_article_ids"], [3])
+            # Tikai jaunais žurnāla notikums, ne pats ieraksts.
+            self.assertEqual(decrypt.call_count, 1)
+
+            other_process = news_app.SecureUserStore(news_app.USERS_DATA_FILE, news_app.USERS_KEY_FILE)
+            other_process.authenticate("cache@example.com", "Password12345")
+            other_process.compact_activity_journal()
+            decrypt.reset_mock()
+            record = store._read()["cache@example.com"]
+            self.assertEqual(decrypt.call_count, 1)
+            self.assertIsNotNone(record["last_login_at"])
+            self.assertEqual(record["activity"]["saved_later_article_ids"], [3])
+
+        record["activity"]["saved_later_article_ids"].append(99)
+        self.assertEqual(store._read()["cache@example.com"]["activity"]["saved_later_article_ids"], [3])
+
+    def test_activity_collections_are_compact_and_bounded(self) -> None:
+        store = news_app.user_store
+        store.create_user("sets@example.com", "Sets", "Password12345")
+        saved = list(range(5000, 5400, 2))
+        with patch.object(news_app, "USER_VIEWED_HISTORY_LIMIT", 3):
+            for article_id in reversed(saved):
+                store.record_activity("sets@example.com", "save_important", article_id)
+                store.record_activity("sets@example.com", "save_important", article_id)
+            for article_id in (1, 2, 3, 1, 4):
+                store.record_activity("sets@example.com", "view_article", article_id)
+            store.record_activity("sets@example.com", "unsave_important", saved[0])
+            store.compact_activity_journal()
+
+        activity = store._read()["sets@example.com"]["activity"]
+        self.assertEqual(activity["viewed_article_ids"], [3, 1, 4])
+        self.assertEqual(activity["saved_important_article_ids"], saved[1:])
+
+        with sqlite3.connect(store.db_file) as conn:
+            stored = store._decrypt(conn.execute("SELECT record FROM secure_users").fetchone()[0])
+        self.assertEqual(stored["activity"]["saved_important_article_ids"], {"delta": [saved[1]] + [2] * (len(saved) - 2)})
+
+    def test_user_store_writes_are_safe_across_processes(self) -> None:
+        store = news_app.user_store
+        store.create_user("multi@example.com", "Multi", "Password12345")
+        with sqlite3.connect(store.db_file) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+        # Optimistiska pārbaude: novecojusi versija netiek pārrakstīta.
+        conn = store._connect()
+        try:
+            email_key = store._email_key("multi@example.com")
+            snapshot, version = store._get_snapshot(conn, email_key)
+            other_process = news_app.SecureUserStore(news_app.USERS_DATA_FILE, news_app.USERS_KEY_FILE)
+            self.assertIsNotNone(other_process.authenticate("multi@example.com", "Password12345"))
+            snapshot["display_name"] = "Lost update"
+            self.assertFalse(store._put(conn, snapshot, version))
+        finally:
+            conn.close()
+        self.assertEqual(store._read()["multi@example.com"]["display_name"], "Multi")
+
+        worker = (
+            "import sys\n"
+            f"sys.path.insert(0, {str(Path(news_app.__file__).resolve().parent)!r})\n"
+            "import app\n"
+            f"store = app.SecureUserStore({news_app.USERS_DATA_FILE!r}, {news_app.USERS_KEY_FILE!r})\n"
+            "offset = int(sys.argv[1])\n"
+            "for number in range(25):\n"
+            "    store.record_activity('multi@example.com', 'save_later', offset + number)\n"
+            "    if number % 10 == 0:\n"
+            "        assert store.authenticate('multi@example.com', 'Password12345')\n"
+            "        store.compact_activity_journal()\n"
+        )
+        processes = [
+            subprocess.Popen([sys.executable, "-c", worker, str(offset)], cwd=self.temp_path)
+            for offset in (1000, 2000, 3000)
+        ]
+        self.assertEqual([process.wait(timeout=60) for process in processes], [0, 0, 0])
+        store.compact_activity_journal()
+        saved = store._read()["multi@example.com"]["activity"]["saved_later_article_ids"]
+        self.assertEqual(saved, [offset + number for offset in (1000, 2000, 3000) for number in range(25)])
+
+    def test_login_throttle_is_shared_windowed_and_bounded(self) -> None:
+        worker_a = news_app.LoginThrottle(3, 30, ip_max_attempts=5, ip_window_seconds=10, max_keys=4)
+        worker_b = news_app.LoginThrottle(3, 30, ip_max_attempts=5, ip_window_seconds=10, max_keys=4)
+        start = 1_000_000.0
+
+        # IP: 5 mēģinājumi logā, neatkarīgi no tā, kurš process tos reģistrē.
+        results = [(worker_a if offset % 2 else worker_b).allow_ip("203.0.113.10", start + offset) for offset in range(7)]
+        self.assertEqual(results, [True] * 5 + [False] * 2)
+        self.assertTrue(worker_a.allow_ip("198.51.100.5", start + 7))
+        # Nākamā loga vidū iepriekšējais logs vēl sver pusi (5 * 0.5 = 2.5 < 5).
+        self.assertTrue(worker_a.allow_ip("203.0.113.10", start + 15))
+        self.assertTrue(worker_a.allow_ip("203.0.113.10", start + 40))
+
+        # E-pasts: AuthGuard semantika ar bloķējumu un atjaunošanos.
+        self.assertFalse(worker_a.record_failure("victim@example.com", start))
+        self.assertFalse(worker_b.record_failure("victim@example.com", start + 1))
+        self.assertTrue(worker_a.record_failure("victim@example.com", start + 2))
+        self.assertEqual(worker_b.locked_for("victim@example.com", start + 5), 27)
+        self.assertEqual(worker_b.locked_for("victim@example.com", start + 33), 0)
+        self.assertFalse(worker_b.record_failure("victim@example.com", start + 33))
+        worker_a.record_success("victim@example.com")
+        self.assertEqual(worker_a.locked_for("victim@example.com", start + 34), 0)
+
+        for number in range(10):
+            worker_a.record_failure(f"spray{number}@example.com", start + 40 + number)
+        worker_a.sweep(start + 60)
+        with self._db() as conn:
+            keys = conn.execute("SELECT COUNT(*) FROM login_throttle").fetchone()[0]
+            newest = conn.execute(
+                "SELECT 1 FROM login_throttle WHERE key = ?", (worker_a.key("email", "spray9@example.com"),)
+            ).fetchone()
+        self.assertEqual(keys, 4)
+        self.assertIsNotNone(newest)
+        self.assertEqual(worker_a.sweep(start + 10_000), 4)
+
+    def test_login_failures_expire_without_a_sweep(self) -> None:
+        throttle = news_app.LoginThrottle(5, 60, ip_max_attempts=5, ip_window_seconds=10, max_keys=100)
+        three_days_ago = 1_000_000.0
+        today = three_days_ago + 3 * 24 * 3600
+
+        for offset in range(4):
+            self.assertFalse(throttle.record_failure("slow@example.com", three_days_ago + offset))
+        # Rinda novecojusi, bet ``sweep`` to vēl nav izdzēsis: vecās neveiksmes netiek skaitītas.
+        self.assertFalse(throttle.record_failure("slow@example.com", today))
+        self.assertEqual(throttle.locked_for("slow@example.com", today), 0)
+        with self._db() as conn:
+            failures = conn.execute("SELECT failures FROM login_throttle WHERE key LIKE 'email:%'").fetchone()[0]
+        self.assertEqual(failures, 1)
+
+    def test_activity_events_reach_store_with_retry_and_reconcile(self) -> None:
+        email = "events@example.com"
+        news_app.user_store.create_user(email, "Events", "Password12345")
+        user_id = self._login_session(email=email, display_name="Events")
+        first = self._seed_article("First", "BBC", "https://example.com/events-1")
+        second = self._seed_article("Second", "LSM", "https://example.com/events-2")
+
+        self.client.post("/save", data={"article_id": first, "tag": "later"})
+        self.client.post("/ignore-source", data={"source": "LSM"})
+        self.client.get(f"/article/{second}")
+
+        with patch.object(news_app.user_store, "record_activities", side_effect=sqlite3.OperationalError("locked")):
+            with self.assertRaises(sqlite3.OperationalError):
+                news_app.activity_buffer.flush()
+        # SQLite daļa ir ierakstīta; atkārtojumā paliek tikai glabātuves notikumi.
+        self.assertEqual(news_app.activity_buffer.pending(), 3)
+        self.assertEqual(news_app.activity_buffer.flush(), 3)
+        with self._db() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM viewed_articles").fetchone()[0], 1)
+
+        activity = news_app.user_store.get_activity(email)
+        self.assertEqual(activity["saved_later_article_ids"], [first])
+        self.assertEqual(activity["ignored_sources"], ["LSM"])
+        self.assertEqual(activity["viewed_article_ids"], [second])
+        self.assertEqual(news_app.reconcile_user_activity(), [])
+
+        # Glabātuvē pietrūkst SQLite ieraksta, un tajā ir lieks saglabājums.
+        with self._db() as conn:
+            conn.execute(
+                "INSERT INTO saved_articles (user_id, article_id, tag, created_at) VALUES (?, ?, 'important', ?)",
+                (user_id, second, datetime.now(timezone.utc).isoformat()),
+            )
+        news_app.user_store.record_activity(email, "save_later", 999)
+        mismatches = news_app.reconcile_user_activity(fix=True)
+        self.assertEqual(
+            {(item["collection"], tuple(item["missing"]), tuple(item["extra"])) for item in mismatches},
+            {("saved_important_article_ids", (second,), ()), ("saved_later_article_ids", (), (999,))},
+        )
+        self.assertEqual(news_app.reconcile_user_activity(), [])
+
+    def test_store_events_from_two_workers_apply_in_sql_order(self) -> None:
+        email = "two-workers@example.com"
+        news_app.user_store.create_user(email, "Two", "Password12345")
+        user_id = self._login_session(email=email, display_name="Two")
+        article_id = self._seed_article("Toggled", "SourceA", "https://example.com/toggled")
+        worker_a = news_app.ActivityBuffer(flush_seconds=3600, batch_size=100, max_pending=100)
+        worker_b = news_app.ActivityBuffer(flush_seconds=3600, batch_size=100, max_pending=100)
+        self.addCleanup(worker_a.stop)
+        self.addCleanup(worker_b.stop)
+
+        with patch("app.activity_buffer", worker_a):
+            news_app.record_user_activity(user_id, email, "save_later", article_id)
+        with patch("app.activity_buffer", worker_b):
+            news_app.record_user_activity(user_id, email, "unsave_later", article_id)
+        # Otrā darbinieka notikums žurnālā nonāk pirmais, un tas tiek arī sapludināts pirms vēlā.
+        worker_b.flush()
+        news_app.user_store.compact_activity_journal()
+        worker_a.flush()
+
+        self.assertEqual(news_app.user_store.get_activity(email)["saved_later_article_ids"], [])
+        self.assertEqual(news_app.reconcile_user_activity(), [])
+        news_app.user_store.compact_activity_journal()
+        self.assertEqual(news_app.user_store.get_activity(email)["saved_later_article_ids"], [])
+        self.assertNotIn("activity_versions", news_app.user_store._read()[email])
+
+    def test_failing_user_store_does_not_break_activity_routes(self) -> None:
+        email = "flaky-store@example.com"
+        news_app.user_store.create_user(email, "Flaky", "Password12345")
+        self._login_session(email=email, display_name="Flaky")
+        article_id = self._seed_article("Flaky", "SourceA", "https://example.com/flaky")
+        buffer = news_app.ActivityBuffer(flush_seconds=3600, batch_size=100, max_pending=100)
+        self.addCleanup(buffer.stop)
+
+        with patch("app.activity_buffer", buffer), patch.object(
+            news_app.user_store, "record_activities", side_effect=sqlite3.OperationalError("database is locked")
+        ):
+            statuses = [self.client.get(f"/article/{article_id}").status_code for _ in range(6)]
+            statuses.append(self.client.post("/save", data={"article_id": article_id, "tag": "later"}).status_code)
+            with self.assertRaises(sqlite3.OperationalError):
+                buffer.flush()
+            # Skatījumi ir SQLite; visi 7 glabātuves notikumi gaida atkārtojumu.
+            self.assertEqual(buffer.pending(), 7)
+
+        self.assertEqual(statuses, [302] * 7)
+        self.assertEqual(buffer.flush(), 7)
+        activity = news_app.user_store.get_activity(email)
+        self.assertEqual(activity["viewed_article_ids"], [article_id])
+        self.assertEqual(activity["saved_later_article_ids"], [article_id])
+        self.assertEqual(news_app.reconcile_user_activity(), [])
+
+    def test_reconcile_fix_rechecks_before_correcting(self) -> None:
+        email = "racy@example.com"
+        news_app.user_store.create_user(email, "Racy", "Password12345")
+        self._login_session(email=email, display_name="Racy")
+        article_id = self._seed_article("Racy", "SourceA", "https://example.com/racy")
+        self.client.post("/save", data={"article_id": article_id, "tag": "later"})
+        news_app.activity_buffer.flush()
+
+        # Pirmais SQLite nolasījums ir vecāks par glabātuvi (saglabājums notika starp tiem).
+        original = news_app.sqlite_user_activity
+        calls = []
+
+        def stale_first(conn, user_id):
+            calls.append(user_id)
+            activity = original(conn, user_id)
+            if len(calls) == 1:
+                activity["saved_later_article_ids"] = []
+            return activity
+
+        with patch("app.sqlite_user_activity", side_effect=stale_first):
+            mismatches = news_app.reconcile_user_activity(fix=True)
+        self.assertEqual([item["extra"] for item in mismatches], [[article_id]])
+        self.assertEqual(news_app.user_store.get_activity(email)["saved_later_article_ids"], [article_id])
+        self.assertEqual(news_app.reconcile_user_activity(), [])
+
     def test_profile_update_persists_display_name_and_theme(self) -> None:
         user_id = self._login_session(email="profile@example.com", display_name="Before")
 
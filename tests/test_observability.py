@@ -4,6 +4,7 @@ import unittest
 
 from observability_test_env import (
     DataEvent,
+    IpRateLimiter,
     build_report,
     find_sensitive_keys,
     generate_sample_events,
@@ -86,6 +87,22 @@ class ObservabilityTests(unittest.TestCase):
         self.assertIn("meta.api_key", findings)
         self.assertIn("meta.credentials.password", findings)
 
+    def test_ip_rate_limiter_sweeps_idle_ips_and_bounds_keys(self) -> None:
+        now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        limiter = IpRateLimiter(max_attempts=2, window_seconds=10, max_keys=3, sweep_interval=1000)
+
+        self.assertEqual([limiter.allow("203.0.113.1", now + timedelta(seconds=offset)) for offset in range(3)], [True, True, False])
+        self.assertTrue(limiter.allow("203.0.113.1", now + timedelta(seconds=10, milliseconds=1)))
+
+        for number in range(5):
+            limiter.allow(f"198.51.100.{number}", now + timedelta(seconds=11))
+        self.assertEqual(len(limiter.attempts), 3)
+        self.assertNotIn("203.0.113.1", limiter.attempts)
+
+        limiter.allow("192.0.2.1", now + timedelta(seconds=30))
+        self.assertEqual(limiter.sweep(now + timedelta(seconds=30)), 2)
+        self.assertEqual(list(limiter.attempts), ["192.0.2.1"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import tempfile
+import threading
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 import app as news_app
 
@@ -21,9 +23,11 @@ class SecurityHardeningTests(unittest.TestCase):
         news_app.user_store = news_app.SecureUserStore(news_app.USERS_DATA_FILE, news_app.USERS_KEY_FILE)
         news_app.app.config.update(TESTING=True, SECRET_KEY="test-secret")
         news_app.init_db()
+        news_app.reset_process_caches()
         self.client = news_app.app.test_client()
 
     def tearDown(self) -> None:
+        news_app.activity_buffer.flush()
         news_app.DB_PATH = self.original_db_path
         news_app.USERS_DATA_FILE = self.original_users_data_file
         news_app.USERS_KEY_FILE = self.original_users_key_file
@@ -54,6 +58,74 @@ class SecurityHardeningTests(unittest.TestCase):
         response = self.client.post("/remove-saved-search", data={"search_id": "1 OR 1=1"})
         self.assertEqual(response.status_code, 302)
 
+    def test_legacy_password_hash_is_upgraded_on_login(self) -> None:
+        store = news_app.user_store
+        with patch.object(news_app, "PASSWORD_HASH_PARAMS", news_app.LEGACY_PASSWORD_HASH_PARAMS):
+            store.create_user("legacy@example.com", "Legacy", "Password12345")
+        old_hash = store._read()["legacy@example.com"]["password_hash"]
+
+        self.assertIsNone(store.authenticate("legacy@example.com", "wrong-password"))
+        self.assertIsNotNone(store.authenticate("legacy@example.com", "Password12345"))
+        record = store._read()["legacy@example.com"]
+        self.assertEqual(record["password_params"], news_app.PASSWORD_HASH_PARAMS)
+        self.assertNotEqual(record["password_hash"], old_hash)
+        self.assertIsNotNone(store.authenticate("legacy@example.com", "Password12345"))
+        self.assertIsNone(store.authenticate("legacy@example.com", "wrong-password"))
+
+    def test_password_hasher_rejects_when_queue_is_full(self) -> None:
+        hasher = news_app.PasswordHasher(workers=1, queue_limit=0)
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow() -> str:
+            started.set()
+            release.wait(5)
+            return "done"
+
+        worker = threading.Thread(target=hasher.run, args=(slow,))
+        worker.start()
+        started.wait(5)
+        with self.assertRaises(news_app.PasswordHashingBusy):
+            hasher.run(lambda: "rejected")
+        release.set()
+        worker.join(5)
+        self.assertEqual(hasher.run(lambda: "ok"), "ok")
+        self.assertEqual(hasher.stats()["rejected"], 1)
+
+    def test_login_returns_try_again_when_hashing_is_saturated(self) -> None:
+        news_app.user_store.create_user("busy@example.com", "Busy", "Password12345")
+        with patch.object(news_app.password_hasher, "run", side_effect=news_app.PasswordHashingBusy):
+            response = self.client.post("/login", data={"email": "busy@example.com", "password": "Password12345"})
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Mēģini vēlreiz", response.get_data(as_text=True))
+        with news_app.get_db() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM login_throttle WHERE key LIKE 'email:%'").fetchone()[0], 0)
+
+    def test_requests_over_ip_limit_get_429(self) -> None:
+        limiter = news_app.IpRateLimiter(max_attempts=3, window_seconds=60)
+        with patch.object(news_app, "request_rate_limiter", limiter), patch.object(news_app, "REQUEST_RATE_LIMIT", 3):
+            statuses = [self.client.get("/login").status_code for _ in range(4)]
+            static_status = self.client.get("/static/does-not-exist.css").status_code
+        self.assertEqual(statuses, [200, 200, 200, 429])
+        self.assertEqual(static_status, 404)
+
+    def test_rate_limit_uses_forwarded_client_behind_trusted_proxy(self) -> None:
+        limiter = news_app.IpRateLimiter(max_attempts=1, window_seconds=60)
+        original_wsgi_app = news_app.app.wsgi_app
+        news_app.trust_proxies(1)
+        try:
+            with patch.object(news_app, "request_rate_limiter", limiter), patch.object(news_app, "REQUEST_RATE_LIMIT", 1):
+                first = self.client.get("/login", headers={"X-Forwarded-For": "203.0.113.1"}).status_code
+                other = self.client.get("/login", headers={"X-Forwarded-For": "203.0.113.2"}).status_code
+                # Klienta pievienotā viltotā adrese priekšā netiek ņemta vērā.
+                spoofed = self.client.get(
+                    "/login", headers={"X-Forwarded-For": "198.51.100.9, 203.0.113.1"}
+                ).status_code
+        finally:
+            news_app.app.wsgi_app = original_wsgi_app
+        self.assertEqual([first, other, spoofed], [200, 200, 429])
+        self.assertEqual(set(limiter.attempts), {"203.0.113.1", "203.0.113.2"})
+
     def test_csrf_blocks_post_when_not_testing(self) -> None:
         news_app.app.config["TESTING"] = False
         try:
@@ -21,3 +21,38 @@ def test_secure_user_store_rejects_duplicate_display_names(tmp_path):
     created, message = store.create_user("second@example.com", "  karlis  ", "password123")
     assert created is False
     assert "lietotājvārds" in message.lower()
+
+
+def test_username_index_matches_normalization_and_is_rebuilt(tmp_path):
+    import sqlite3
+    from unittest.mock import patch
+
+    from app import SecureUserStore
+
+    store = SecureUserStore(str(tmp_path / "users.enc"), str(tmp_path / "users.key"))
+    names = ["  Anna   Bērziņa ", "Straße", "ÉMILE", "Jānis\tOzols"]
+    for number, name in enumerate(names):
+        assert store.create_user(f"user{number}@example.com", name, "password123")[0] is True
+
+    candidates = names + ["anna bērziņa", "STRASSE", "émile", "jānis ozols", "Anna", "Strase", "Emile", ""]
+    with patch.object(store, "_read", side_effect=AssertionError("username_exists must not scan")):
+        for candidate in candidates:
+            normalized = SecureUserStore._normalize_username(candidate)
+            expected = any(SecureUserStore._normalize_username(name) == normalized for name in names) and bool(normalized)
+            assert store.username_exists(candidate) is expected, candidate
+
+    with sqlite3.connect(store.db_file) as conn:
+        conn.execute("DROP INDEX idx_secure_users_username")
+        conn.execute("UPDATE secure_users SET username_key = NULL")
+
+    reopened = SecureUserStore(str(tmp_path / "users.enc"), str(tmp_path / "users.key"))
+    assert reopened.username_exists("anna bērziņa") is True
+    assert reopened.username_exists("nobody") is False
+    created, message = reopened.create_user("dup@example.com", "straße", "password123")
+    assert created is False
+    assert "lietotājvārds" in message.lower()
+    with sqlite3.connect(store.db_file) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM secure_users WHERE username_key IS NULL").fetchone()[0] == 0
+        assert conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'idx_secure_users_username'"
+        ).fetchone() is not None